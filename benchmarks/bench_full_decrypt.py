@@ -0,0 +1,85 @@
+"""
+Ciphertext lookup cost of full decryption as the board grows.
+
+For every partial decryption, full decryption fetches the tagged
+ciphertext with the same index. Scanning the list, as the removed
+Teller.multi_dim_index did, makes that O(n^2) over a tally; the map of
+Teller.index_ciphertexts makes it O(n). This times both joins on boards
+shaped like the tally's and prints the time per ballot: flat for the
+map, growing linearly for the scan. tests/test_hyperion_parties.py
+checks that both joins find the same rows.
+
+    python benchmarks/bench_full_decrypt.py --sizes 1000,2000,4000,8000
+"""
+import argparse
+import random
+import time
+
+
+def point(rng):
+    return {"x": rng.getrandbits(256), "y": rng.getrandbits(256), "curve": "P-256"}
+
+
+def tagged_board(n, rng):
+    """
+    [index, [c1, c2], [c1, c2]] rows as built by Teller.tag_ciphertexts.
+    """
+    return [[i, [point(rng), point(rng)], [point(rng), point(rng)]] for i in range(n)]
+
+
+def partial_decryptions(n, rng):
+    # Mixed and split across workers, so the order differs from the board
+    indices = list(range(n))
+    rng.shuffle(indices)
+    return [[i, None] for i in indices]
+
+
+def scan(board, index):
+    # The lookup full decryption used before the index map
+    for item in board:
+        if item[0] == index:
+            return item
+    return None
+
+
+def index_ciphertexts(board):
+    # As Teller.index_ciphertexts
+    return {item[0]: item for item in board}
+
+
+def time_scan(board, pds):
+    start = time.perf_counter()
+    for item in pds:
+        scan(board, item[0])
+    return time.perf_counter() - start
+
+
+def time_index(board, pds):
+    start = time.perf_counter()
+    ciphertexts = index_ciphertexts(board)
+    for item in pds:
+        ciphertexts[item[0]]
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,2000,4000,8000",
+                        help="comma-separated ballot counts")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"{'ballots':>8} {'scan (s)':>10} {'us/ballot':>10} {'index (s)':>10} {'us/ballot':>10}")
+    for n in (int(v) for v in args.sizes.split(",") if v):
+        board = tagged_board(n, rng)
+        pds = partial_decryptions(n, rng)
+        scanned = min(time_scan(board, pds) for _ in range(args.repeat))
+        indexed = min(time_index(board, pds) for _ in range(args.repeat))
+        print(f"{n:>8} {scanned:>10.4f} {scanned / n * 1e6:>10.2f} "
+              f"{indexed:>10.4f} {indexed / n * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
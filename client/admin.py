@@ -1,8 +1,339 @@
-import httpx, asyncio
+"""
+Admin API client and headless command line.
 
-SERVER = "http://127.0.0.1:8000"
+    python -m client.admin run --voters 200 --tellers 5 --threshold 3 --out runs/200
+    python -m client.admin sweep --voters 50,100,200 --repeat 3 --csv timings.csv
+    python -m client.admin bb --out bb.json --encoding compressed
+    python -m client.admin cancel <job_id>
 
-async def run_hyperion():
-    async with httpx.AsyncClient() as client:
-        r = await client.post(f"{SERVER}/hyperion")
-        print("[HYPERION]", r.json())
+Runs go through the job API, so progress is reported as the protocol
+moves through its phases. `sweep` runs every combination of the given
+parameters. With several --server URLs the runs are spread over them
+and execute concurrently. --parallel N runs N at a time per server,
+each in its own election.
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+import httpx
+from .utils import ApiClient, SERVER
+
+# Protocol runs can take many minutes; only connecting should time out.
+RUN_TIMEOUT = httpx.Timeout(30.0, read=None)
+
+class AdminClient:
+    """
+    Admin-side API calls over a shared, pooled ApiClient.
+
+    With `election_id` the calls go to that election's endpoints
+    (/elections/<id>/...) instead of the default election.
+    """
+    def __init__(self, api=None, election_id=None):
+        self.api = api or ApiClient()
+        self.election_id = election_id
+
+    def path(self, path):
+        if self.election_id:
+            return f"/elections/{self.election_id}{path}"
+        return path
+
+    async def run_hyperion(self, voters=50, tellers=3, threshold=2, max_votes=2, **options):
+        r = await self.api.post(self.path("/hyperion"), timeout=RUN_TIMEOUT, json={
+            "voters": voters,
+            "tellers": tellers,
+            "threshold": threshold,
+            "max_votes": max_votes,
+            **options,
+        })
+        return r.json()
+
+    async def start_job(self, voters=50, tellers=3, threshold=2, max_votes=2, **options):
+        """
+        Start a run in the background; poll it with get_job.
+        """
+        r = await self.api.post(self.path("/jobs"), json={
+            "voters": voters,
+            "tellers": tellers,
+            "threshold": threshold,
+            "max_votes": max_votes,
+            **options,
+        })
+        r.raise_for_status()
+        return r.json()
+
+    async def get_job(self, job_id):
+        r = await self.api.get(f"/jobs/{job_id}")
+        r.raise_for_status()
+        return r.json()
+
+    async def cancel_job(self, job_id):
+        r = await self.api.request("DELETE", f"/jobs/{job_id}")
+        return r.json()
+
+    async def wait_job(self, job_id, on_progress=None, interval=1.0):
+        """
+        Poll a job until it ends and return its final status.
+        """
+        while True:
+            job = await self.get_job(job_id)
+            if on_progress:
+                on_progress(job)
+            if job["status"] not in ("queued", "running"):
+                return job
+            await asyncio.sleep(interval)
+
+    async def get_bb(self, offset=0, limit=None, encoding="json"):
+        params = {"offset": offset, "encoding": encoding}
+        if limit is not None:
+            params["limit"] = limit
+        r = await self.api.get(self.path("/bb"), params=params)
+        return r.json()
+
+    async def download_bb(self, encoding="json", page_size=5000):
+        """
+        The whole bulletin board, fetched page by page.
+        """
+        rows = []
+        while True:
+            res = await self.get_bb(len(rows), page_size, encoding)
+            if res.get("status") != "ok":
+                return rows
+            rows.extend(res["bb"])
+            if not res["bb"] or len(rows) >= res.get("total", len(rows)):
+                return rows
+
+    async def get_history(self, limit=None):
+        params = {} if limit is None else {"limit": limit}
+        r = await self.api.get("/history", params=params)
+        return r.json()
+
+    async def get_tally(self):
+        r = await self.api.get(self.path("/tally_results"))
+        return r.json()
+
+    async def aclose(self):
+        await self.api.aclose()
+
+# Shared client behind the module-level helpers
+client = AdminClient()
+
+async def run_hyperion(**params):
+    res = await client.run_hyperion(**params)
+    print("[HYPERION]", res)
+    return res
+
+# ---------- Command line ----------
+# Seconds between retries while a server is busy with another run
+BUSY_RETRY = 5.0
+
+def int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+def run_configs(voters, tellers, thresholds, max_votes, repeat=1):
+    """
+    Every parameter combination, `repeat` times each; skips threshold > tellers.
+    """
+    configs = []
+    for v, t, k, m in itertools.product(voters, tellers, thresholds, max_votes):
+        if k <= t:
+            configs.extend({"voters": v, "tellers": t, "threshold": k, "max_votes": m}
+                           for _ in range(repeat))
+    return configs
+
+def timing_row(server, params, job):
+    """
+    One flat export row: run parameters, status, per-phase seconds and peak RSS.
+    """
+    row = {"server": server, "job_id": job.get("job_id"), "status": job["status"], **params}
+    result = job.get("result") or {}
+    for phase, seconds in result.get("timings", {}).items():
+        row[phase] = seconds
+    for phase, mem in result.get("memory", {}).items():
+        row[f"{phase} peak_rss_mb"] = mem["peak_rss_mb"]
+    row["finished"] = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(job.get("finished") or time.time()))
+    return row
+
+def write_csv(rows, path):
+    columns = []
+    for row in rows:
+        columns.extend(k for k in row if k not in columns)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def write_json(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def save_run(job, out_dir):
+    """
+    Write the result, board, console log and timings of a finished job.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    result = job.get("result") or {}
+    write_json(job, os.path.join(out_dir, "job.json"))
+    write_json(result.get("tally", []), os.path.join(out_dir, "bb.json"))
+    with open(os.path.join(out_dir, "hyperion.log"), "w") as f:
+        f.write(result.get("raw_output", ""))
+    write_json(result.get("timings", {}), os.path.join(out_dir, "timings.json"))
+
+def progress_printer(label, quiet=False):
+    last = {}
+
+    def report(job):
+        phase = job.get("phase") or job["status"]
+        if quiet or last.get("phase") == phase:
+            return
+        last["phase"] = phase
+        print(f"[{label}] {job['progress'] * 100:5.1f}%  {phase}", file=sys.stderr)
+    return report
+
+async def run_job(admin, params, label="run", quiet=False, interval=1.0):
+    """
+    Start a job, waiting while the server is busy, and follow it to the end.
+    """
+    while True:
+        try:
+            started = await admin.start_job(**params)
+            break
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 409:
+                raise
+            await asyncio.sleep(BUSY_RETRY)
+    return await admin.wait_job(started["job_id"], progress_printer(label, quiet), interval)
+
+async def sweep(servers, configs, options, quiet=False, out_dir=None, parallel=1, election_id=None):
+    """
+    Run all configs over the servers.
+
+    Each server gets `parallel` workers. Every worker uses its own
+    election, so its runs do not wait for the other workers' runs.
+    """
+    queue = asyncio.Queue()
+    for index, params in enumerate(configs):
+        queue.put_nowait((index, params))
+    rows = [None] * len(configs)
+
+    async def worker(server, slot):
+        election = election_id
+        if parallel > 1:
+            election = f"{election_id or 'sweep'}-{slot}"
+        async with ApiClient(base_url=server) as api:
+            admin = AdminClient(api, election)
+            while not queue.empty():
+                index, params = queue.get_nowait()
+                label = f"{index + 1}/{len(configs)} v={params['voters']} t={params['tellers']} k={params['threshold']}"
+                try:
+                    job = await run_job(admin, {**params, **options}, label, quiet)
+                except httpx.HTTPError as e:
+                    job = {"status": "failed", "error": str(e)}
+                rows[index] = timing_row(server, params, job)
+                if out_dir and job.get("result"):
+                    save_run(job, os.path.join(out_dir, f"run-{index + 1:03d}"))
+
+    await asyncio.gather(*(worker(server, slot) for server in servers for slot in range(parallel)))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run and export Hyperion protocol runs without the GUI.")
+    parser.add_argument("--server", action="append", help="server URL (repeat to spread sweeps over servers)")
+    parser.add_argument("--election", help="election id (default: the server's default election)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_run_options(p, multi):
+        kind = int_list if multi else int
+        p.add_argument("--voters", type=kind, default=[50] if multi else 50)
+        p.add_argument("--tellers", type=kind, default=[3] if multi else 3)
+        p.add_argument("--threshold", type=kind, default=[2] if multi else 2)
+        p.add_argument("--max-votes", type=kind, default=[2] if multi else 2)
+        p.add_argument("--profile", choices=["cprofile", "sampling"])
+        p.add_argument("--tracemalloc", action="store_true")
+        p.add_argument("--priority", type=int, help="lower runs first (default: by size)")
+        p.add_argument("--quiet", action="store_true", help="no progress output")
+
+    run = commands.add_parser("run", help="run the protocol once and save its outputs")
+    add_run_options(run, multi=False)
+    run.add_argument("--out", metavar="DIR", help="write job.json, bb.json, hyperion.log and timings.json here")
+    run.add_argument("--checkpoint", action="store_true", help="store phase outputs so the run can be resumed")
+    run.add_argument("--resume", metavar="RUN_ID", help="continue a checkpointed run")
+    run.add_argument("--rerun-phase", metavar="PHASE", help="with --resume: recompute from this phase on")
+
+    sweep_cmd = commands.add_parser("sweep", help="run every combination of comma-separated parameters")
+    add_run_options(sweep_cmd, multi=True)
+    sweep_cmd.add_argument("--repeat", type=int, default=1)
+    sweep_cmd.add_argument("--parallel", type=int, default=1,
+                           help="concurrent runs per server, each in its own election")
+    sweep_cmd.add_argument("--csv", metavar="PATH", help="export timings as CSV")
+    sweep_cmd.add_argument("--json", metavar="PATH", help="export timings as JSON")
+    sweep_cmd.add_argument("--out", metavar="DIR", help="save each run's outputs under DIR/run-NNN")
+
+    bb = commands.add_parser("bb", help="download the current bulletin board")
+    bb.add_argument("--out", metavar="PATH", required=True)
+    bb.add_argument("--encoding", choices=["json", "compressed"], default="json")
+
+    cancel = commands.add_parser("cancel", help="cancel a running job")
+    cancel.add_argument("job_id")
+
+    args = parser.parse_args(argv)
+    servers = args.server or [SERVER]
+    options = {}
+    if getattr(args, "profile", None):
+        options["profile"] = args.profile
+    if getattr(args, "tracemalloc", False):
+        options["tracemalloc"] = True
+    if getattr(args, "priority", None) is not None:
+        options["priority"] = args.priority
+    if getattr(args, "checkpoint", False):
+        options["checkpoint"] = True
+    if getattr(args, "resume", None):
+        options["resume"] = args.resume
+    if getattr(args, "rerun_phase", None):
+        options["rerun_phase"] = args.rerun_phase
+
+    async def command():
+        if args.command == "sweep":
+            configs = run_configs(args.voters, args.tellers, args.threshold, args.max_votes, args.repeat)
+            rows = await sweep(servers, configs, options, args.quiet, args.out, args.parallel, args.election)
+            if args.csv:
+                write_csv(rows, args.csv)
+            if args.json:
+                write_json(rows, args.json)
+            for row in rows:
+                print(json.dumps(row))
+            return 0 if all(row["status"] == "done" for row in rows) else 1
+
+        async with ApiClient(base_url=servers[0]) as api:
+            admin = AdminClient(api, args.election)
+            if args.command == "run":
+                params = {"voters": args.voters, "tellers": args.tellers,
+                          "threshold": args.threshold, "max_votes": args.max_votes, **options}
+                job = await run_job(admin, params, quiet=args.quiet)
+                if args.out:
+                    save_run(job, args.out)
+                checkpoint = (job.get("result") or {}).get("checkpoint")
+                if checkpoint:
+                    print(f"[run] checkpoint {checkpoint['run_id']}", file=sys.stderr)
+                if job["status"] != "done":
+                    print(f"[run] {job['status']}: {job.get('error')}", file=sys.stderr)
+                    return 1
+                print(json.dumps(job["result"]["timings"], indent=2))
+                return 0
+            if args.command == "bb":
+                rows = await admin.download_bb(args.encoding)
+                write_json(rows, args.out)
+                print(f"{len(rows)} rows written to {args.out}")
+                return 0
+            if args.command == "cancel":
+                print(await admin.cancel_job(args.job_id))
+                return 0
+
+    return asyncio.run(command())
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,17 @@
 import sys
-import asyncio
 import re
+import time
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QTabWidget, QHBoxLayout,
-    QPushButton, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QTextEdit,
-    QSpinBox, QFormLayout, QGroupBox, QMessageBox
+    QPushButton, QLabel, QTableWidget, QTableWidgetItem, QHeaderView,
+    QSpinBox, QFormLayout, QGroupBox, QMessageBox, QCheckBox, QProgressBar,
+    QComboBox
 )
-import httpx
-
-SERVER = "http://127.0.0.1:8000"
+from .admin import AdminClient
+from .utils import EventLoopThread
+from .workers import ApiCallWorker, JobWorker
+from .charts import TimingChart
+from .table_models import Column, PagedTableModel, build_table_view
 
 
 # --- Helper functions ---
@@ -36,24 +39,49 @@ def format_vote_display(vote_str):
     return vote_str
 
 
-# --- API helpers ---
-async def run_hyperion(voters=50, tellers=3, threshold=2, max_votes=2):
-    async with httpx.AsyncClient() as client:
-        r = await client.post(
-            f"{SERVER}/hyperion",
-            json={
-                "voters": voters,
-                "tellers": tellers,
-                "threshold": threshold,
-                "max_votes": max_votes
-            }
-        )
-        return r.json()
+def format_vote_point(row):
+    """
+    Vote cell of a structured bulletin board row.
 
-async def get_bb():
-    async with httpx.AsyncClient() as client:
-        r = await client.get(f"{SERVER}/bb")
-        return r.json()
+    Falls back to parsing the vote string for servers that do not send
+    the point fields.
+    """
+    if row.get("x") is None:
+        return format_vote_display(row.get("vote", ""))
+    return f"x: {row['x']}\ny: {row['y']}\ncurve: {row.get('curve') or 'P-256'}"
+
+
+def format_memory_tooltip(mem):
+    """
+    Tooltip text for one phase of the run's memory figures.
+    """
+    lines = [
+        f"Peak RSS (largest process): {mem['peak_rss_mb']:.1f} MB",
+        f"Sum over {mem['processes']} process(es): {mem['total_rss_mb']:.1f} MB",
+    ]
+    if "traced_peak_mb" in mem:
+        lines.append(f"tracemalloc peak: {mem['traced_peak_mb']:.1f} MB")
+        for top in mem.get("top_allocators", []):
+            lines.append(f"  {top['size_mb']:.2f} MB  {top['where']}")
+    return "\n".join(lines)
+
+
+BB_COLUMNS = [
+    Column("Voter ID", None),
+    Column("Vote", format_vote_point),
+    Column("Commitment", "commitment"),
+]
+
+
+def build_bb_view(model):
+    """
+    Filterable view over a bulletin board model; returns (layout, view).
+    """
+    layout, view = build_table_view(model, row_height=80)
+    view.horizontalHeader().setSectionResizeMode(0, QHeaderView.Interactive)
+    view.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+    view.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+    return layout, view
 
 
 # --- Admin GUI ---
@@ -63,6 +91,18 @@ class AdminApp(QWidget):
         self.setWindowTitle("Hyperion Admin")
         self.resize(1100, 700)
 
+        # One pooled client and event loop for all requests of this window
+        self.api = AdminClient()
+        self.loop = EventLoopThread()
+        self.job_worker = None
+
+        # Both tables page through GET /bb; cells are formatted on display
+        self.model_tally = PagedTableModel(BB_COLUMNS, self.fetch_bb_page, parent=self)
+        self.model_bb = PagedTableModel(BB_COLUMNS, self.fetch_bb_page, parent=self)
+        self.model_bb.failed.connect(self.on_bb_failed)
+        self.history = {"runs": [], "phases": []}
+        self.history_worker = None
+
         layout = QVBoxLayout()
         self.tabs = QTabWidget()
 
@@ -76,7 +116,12 @@ class AdminApp(QWidget):
         self.tab_bb.setLayout(self.build_bb_tab())
         self.tabs.addTab(self.tab_bb, "Bulletin Board")
 
-        # Tab 3: PQC Mapping --> TBD: DELETE
+        # Tab 3: Performance history
+        self.tab_history = QWidget()
+        self.tab_history.setLayout(self.build_history_tab())
+        self.tabs.addTab(self.tab_history, "Performance History")
+
+        # Tab 4: PQC Mapping --> TBD: DELETE
         self.tab_pqc_map = QWidget()
         self.tab_pqc_map.setLayout(self.build_pqc_tab())
         self.tabs.addTab(self.tab_pqc_map, "PQC Mapping")
@@ -125,11 +170,15 @@ class AdminApp(QWidget):
         self.spin_max_votes.setMaximum(100)
         self.spin_max_votes.setValue(2)
         settings_layout.addRow("Max Vote Value:", self.spin_max_votes)
+
+        # Allocation tracking (slows the run down)
+        self.check_tracemalloc = QCheckBox("Track top allocators (tracemalloc, slower)")
+        settings_layout.addRow("Memory:", self.check_tracemalloc)
         
         settings_group.setLayout(settings_layout)
         layout.addWidget(settings_group)
         
-        btn_tally = QPushButton("Run Hyperion Protocol")
+        self.btn_tally = btn_tally = QPushButton("Run Hyperion Protocol")
         btn_tally.clicked.connect(self.do_tally)
 
         btn_tally.setToolTip(
@@ -138,30 +187,37 @@ class AdminApp(QWidget):
             "PQC alternative: ML-KEM (encryption) + ML-DSA (signatures)."
         )
 
-        self.table_tally = QTableWidget()
-        self.table_tally.setColumnCount(3)
-        self.table_tally.setHorizontalHeaderLabels(["Voter ID", "Vote", "Commitment"])
-        self.table_tally.verticalHeader().setVisible(False)
-        self.table_tally.horizontalHeader().setStretchLastSection(True)
-        self.table_tally.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        self.table_tally.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
-        self.table_tally.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        tally_layout, self.table_tally = build_bb_view(self.model_tally)
+
+        # Run progress: current phase and a cancel button
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.label_phase = QLabel("")
+        self.btn_cancel = QPushButton("Cancel")
+        self.btn_cancel.clicked.connect(self.do_cancel)
+        self.btn_cancel.setEnabled(False)
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.label_phase)
+        progress_layout.addWidget(self.btn_cancel)
 
         layout.addWidget(btn_tally)
-        layout.addWidget(self.table_tally)
+        layout.addLayout(progress_layout)
+        layout.addLayout(tally_layout)
         
         # Timing Statistics Table
-        self.stats_label = QLabel("Performance Statistics (seconds)")
+        self.stats_label = QLabel("Performance Statistics")
         self.stats_label.hide()
         layout.addWidget(self.stats_label)
         
         self.table_stats = QTableWidget()
-        self.table_stats.setRowCount(1)
-        self.table_stats.setVerticalHeaderLabels(["Time (seconds)"])
+        self.table_stats.setRowCount(2)
+        self.table_stats.setVerticalHeaderLabels(["Time (seconds)", "Peak RSS (MB)"])
         self.table_stats.verticalHeader().setVisible(True)
         self.table_stats.horizontalHeader().setStretchLastSection(True)
-        self.table_stats.setFixedHeight(60) 
+        self.table_stats.setFixedHeight(90) 
         self.table_stats.setRowHeight(0, 30) 
+        self.table_stats.setRowHeight(1, 30) 
         self.table_stats.hide()
         layout.addWidget(self.table_stats)
 
@@ -180,23 +236,55 @@ class AdminApp(QWidget):
             "PQC alternative: ML-KEM or lattice-based commitments."
         )
 
-        self.table_bb = QTableWidget()
-        self.table_bb.setColumnCount(3)
-        self.table_bb.setHorizontalHeaderLabels(
-            ["Voter ID", "Vote", "Commitment"]
-        )
-        self.table_bb.verticalHeader().setVisible(False)  
-        self.table_bb.horizontalHeader().setStretchLastSection(True)
-        self.table_bb.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        self.table_bb.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
-        self.table_bb.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        bb_layout, self.table_bb = build_bb_view(self.model_bb)
 
         layout.addWidget(btn_refresh)
-        layout.addWidget(self.table_bb)
+        layout.addLayout(bb_layout)
 
         return layout
 
     
+    def build_history_tab(self):
+        layout = QVBoxLayout()
+
+        controls = QHBoxLayout()
+        self.combo_x_axis = QComboBox()
+        self.combo_x_axis.addItem("Voter count", "voters")
+        self.combo_x_axis.addItem("Date", "date")
+        self.combo_x_axis.currentIndexChanged.connect(self.show_history)
+        self.combo_phase = QComboBox()
+        self.combo_phase.addItem("All phases", None)
+        self.combo_phase.currentIndexChanged.connect(self.show_history)
+        self.spin_history = QSpinBox()
+        self.spin_history.setRange(10, 10000)
+        self.spin_history.setValue(200)
+        btn_history = QPushButton("Load History")
+        btn_history.clicked.connect(self.do_load_history)
+        controls.addWidget(QLabel("X axis:"))
+        controls.addWidget(self.combo_x_axis)
+        controls.addWidget(QLabel("Phase:"))
+        controls.addWidget(self.combo_phase)
+        controls.addWidget(QLabel("Last runs:"))
+        controls.addWidget(self.spin_history)
+        controls.addWidget(btn_history)
+        layout.addLayout(controls)
+
+        self.chart_history = TimingChart()
+        layout.addWidget(self.chart_history, stretch=3)
+
+        # Phases that took notably longer than earlier runs of the same setup
+        layout.addWidget(QLabel("Regressions"))
+        self.table_regressions = QTableWidget()
+        self.table_regressions.setColumnCount(6)
+        self.table_regressions.setHorizontalHeaderLabels(
+            ["Date", "Voters", "Tellers", "Phase", "Seconds (baseline)", "Change"]
+        )
+        self.table_regressions.verticalHeader().setVisible(False)
+        self.table_regressions.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.table_regressions, stretch=1)
+
+        return layout
+
     def build_pqc_tab(self): # TBD: DELETE
         layout = QVBoxLayout()
         layout.addWidget(QLabel("Mapping of Classical → Post-Quantum Components"))
@@ -241,6 +329,7 @@ class AdminApp(QWidget):
         tellers = self.spin_tellers.value()
         threshold = self.spin_threshold.value()
         max_votes = self.spin_max_votes.value()
+        tracemalloc = self.check_tracemalloc.isChecked()
 
         # Validate threshold <= tellers
         if threshold > tellers:
@@ -248,39 +337,66 @@ class AdminApp(QWidget):
                               f"Threshold ({threshold}) cannot be greater than number of tellers ({tellers})")
             return
 
-        try:
-            res = asyncio.run(run_hyperion(voters, tellers, threshold, max_votes))
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error running Hyperion protocol: {e}")
-            return
-        
+        # Run as a server-side job; the worker polls it off the GUI thread
+        params = {
+            "voters": voters,
+            "tellers": tellers,
+            "threshold": threshold,
+            "max_votes": max_votes,
+            "tracemalloc": tracemalloc,
+        }
+        self.job_worker = JobWorker(self.loop, self.api, params, self)
+        self.job_worker.progress.connect(self.on_job_progress)
+        self.job_worker.finished.connect(self.on_job_finished)
+        self.job_worker.failed.connect(self.on_job_failed)
+        self.btn_tally.setEnabled(False)
+        self.btn_cancel.setEnabled(True)
+        self.progress_bar.setValue(0)
+        self.label_phase.setText("Starting...")
+        self.job_worker.start()
+
+    def do_cancel(self):
+        if self.job_worker is not None:
+            self.btn_cancel.setEnabled(False)
+            self.label_phase.setText("Cancelling...")
+            self.job_worker.cancel()
+
+    def on_job_progress(self, job):
+        self.progress_bar.setValue(int(job.get("progress", 0) * 100))
+        self.label_phase.setText(job.get("phase") or job.get("status", ""))
+
+    def on_job_finished(self, res):
+        self.end_job()
+        self.progress_bar.setValue(100)
+        self.label_phase.setText("Done")
+        self.show_result(res)
+        self.do_load_history()
+
+    def on_job_failed(self, error):
+        self.end_job()
+        self.label_phase.setText("")
+        QMessageBox.critical(self, "Error", f"Error running Hyperion protocol: {error}")
+
+    def end_job(self):
+        self.job_worker = None
+        self.btn_tally.setEnabled(True)
+        self.btn_cancel.setEnabled(False)
+
+    def show_result(self, res):
+        """
+        Fill the tally, bulletin board and statistics tables from a run result.
+        """
         if res.get("status") != "ok":
             QMessageBox.critical(self, "Error", f"Error running Hyperion protocol:\n{res}")
             return
 
-        # Populate tally table
-        tally_rows = res.get("tally", [])
-        self.table_tally.setRowCount(len(tally_rows))
-        for row_idx, row in enumerate(tally_rows):
-            self.table_tally.setItem(row_idx, 0, QTableWidgetItem(str(row_idx + 1)))
-            vote_str = format_vote_display(row.get("vote", ""))
-            vote_item = QTableWidgetItem(vote_str)
-            self.table_tally.setRowHeight(row_idx, 80)
-            self.table_tally.setItem(row_idx, 1, vote_item)
-            self.table_tally.setItem(row_idx, 2, QTableWidgetItem(row.get("commitment", "")))
-
-        # Populate Bulletin Board
-        self.table_bb.setRowCount(len(tally_rows))
-        for row_idx, row in enumerate(tally_rows):
-            self.table_bb.setItem(row_idx, 0, QTableWidgetItem(str(row_idx + 1)))
-            vote_str = format_vote_display(row.get("vote", ""))
-            vote_item = QTableWidgetItem(vote_str)
-            self.table_bb.setRowHeight(row_idx, 80)
-            self.table_bb.setItem(row_idx, 1, vote_item)
-            self.table_bb.setItem(row_idx, 2, QTableWidgetItem(row.get("commitment", "")))
+        # Tally and Bulletin Board tables page in the new board from /bb
+        self.model_tally.reload()
+        self.model_bb.reload()
 
         # Populate Timing Statistics table
         timings = res.get("timings", {})
+        memory = res.get("memory", {})
         if timings:
             timing_phases = [
                 ("Setup", "Setup"),
@@ -310,9 +426,20 @@ class AdminApp(QWidget):
                         formatted_value = str(value)
                     
                     self.table_stats.setItem(0, col_idx, QTableWidgetItem(formatted_value))
+
+                    # Memory row: largest process peak, with the summed
+                    # worker peaks and top allocators in the tooltip
+                    mem = memory.get(key)
+                    if mem:
+                        mem_item = QTableWidgetItem(f"{mem['peak_rss_mb']:.1f}")
+                        mem_item.setToolTip(format_memory_tooltip(mem))
+                    else:
+                        mem_item = QTableWidgetItem("-")
+                    self.table_stats.setItem(1, col_idx, mem_item)
                 
                 self.table_stats.setRowHeight(0, 30)
-                self.table_stats.setFixedHeight(60) 
+                self.table_stats.setRowHeight(1, 30)
+                self.table_stats.setFixedHeight(90) 
                 
                 self.stats_label.show()
                 self.table_stats.show()
@@ -327,25 +454,69 @@ class AdminApp(QWidget):
         """
         Trigger GET /bb -> refresh Bulletin Board table
         """
-        try:
-            res = asyncio.run(get_bb())
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error fetching bulletin board: {e}")
+        self.model_bb.reload()
+
+    def fetch_bb_page(self, offset, limit):
+        return self.loop.submit(self.api.get_bb(offset, limit))
+
+    def on_bb_failed(self, error):
+        QMessageBox.critical(self, "Error", f"Error fetching bulletin board: {error}")
+
+
+    def do_load_history(self):
+        """
+        Trigger GET /history -> refresh chart and regressions table
+        """
+        if self.history_worker is not None:
             return
-        
+        self.history_worker = ApiCallWorker(self.loop, self.api.get_history(self.spin_history.value()), self)
+        self.history_worker.finished.connect(self.on_history_loaded)
+        self.history_worker.failed.connect(self.on_history_failed)
+        self.history_worker.start()
+
+    def on_history_loaded(self, res):
+        self.history_worker = None
         if res.get("status") != "ok":
-            QMessageBox.critical(self, "Error", f"Error fetching bulletin board:\n{res}")
+            QMessageBox.critical(self, "Error", f"Error loading run history:\n{res}")
             return
-
-        bb = res.get("bb", [])
-        self.table_bb.setRowCount(len(bb))
-        for row_idx, row in enumerate(bb):
-            self.table_bb.setItem(row_idx, 0, QTableWidgetItem(str(row_idx + 1)))
-            vote_str = format_vote_display(row.get("vote", ""))
-            vote_item = QTableWidgetItem(vote_str)
-            self.table_bb.setRowHeight(row_idx, 80)
-            self.table_bb.setItem(row_idx, 1, vote_item)
-            self.table_bb.setItem(row_idx, 2, QTableWidgetItem(row.get("commitment", "")))
+        self.history = res
+        current = self.combo_phase.currentData()
+        self.combo_phase.blockSignals(True)
+        self.combo_phase.clear()
+        self.combo_phase.addItem("All phases", None)
+        for phase in res["phases"]:
+            self.combo_phase.addItem(phase, phase)
+        self.combo_phase.setCurrentIndex(max(0, self.combo_phase.findData(current)))
+        self.combo_phase.blockSignals(False)
+        self.show_history()
+
+    def on_history_failed(self, error):
+        self.history_worker = None
+        QMessageBox.critical(self, "Error", f"Error loading run history: {error}")
+
+    def show_history(self):
+        phase = self.combo_phase.currentData()
+        phases = [phase] if phase else self.history["phases"]
+        runs = self.history["runs"]
+        self.chart_history.set_data(runs, phases, self.combo_x_axis.currentData())
+
+        regressions = [
+            (run, r) for run in reversed(runs) for r in run.get("regressions", [])
+            if r["phase"] in phases
+        ]
+        self.table_regressions.setRowCount(len(regressions))
+        for row_idx, (run, r) in enumerate(regressions):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["at"]))
+            cells = [
+                when,
+                str(run["params"]["voters"]),
+                str(run["params"]["tellers"]),
+                r["phase"],
+                f"{r['seconds']:.3f} ({r['baseline']:.3f})",
+                f"+{r['change'] * 100:.0f}%",
+            ]
+            for col_idx, text in enumerate(cells):
+                self.table_regressions.setItem(row_idx, col_idx, QTableWidgetItem(text))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+import time
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from PyQt5.QtGui import QColor, QPainter, QPen
+from PyQt5.QtWidgets import QWidget
+
+# One color per protocol phase, in timing-table order
+PHASE_COLORS = [
+    "#1f77b4", "#ff7f0e", "#2ca02c", "#9467bd",
+    "#8c564b", "#e377c2", "#17becf", "#bcbd22",
+]
+REGRESSION_COLOR = "#d62728"
+
+
+class TimingChart(QWidget):
+    """
+    Line chart of per-phase timings over the run history.
+
+    The x axis is the voter count or the run date; runs flagged as
+    regressions for a phase are drawn as red rings on that phase's line.
+    Painted with QPainter, so it needs nothing beyond PyQt5.
+    """
+    MARGIN = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.runs = []
+        self.phases = []
+        self.x_axis = "voters"
+        self.setMinimumHeight(300)
+
+    def set_data(self, runs, phases, x_axis="voters"):
+        self.runs = runs
+        self.phases = phases
+        self.x_axis = x_axis
+        self.update()
+
+    def x_value(self, run):
+        return run["params"]["voters"] if self.x_axis == "voters" else run["at"]
+
+    def x_label(self, value):
+        if self.x_axis == "voters":
+            return str(int(value))
+        return time.strftime("%m-%d %H:%M", time.localtime(value))
+
+    def series(self):
+        """
+        {phase: [(x, seconds, regressed)]} sorted by x.
+        """
+        series = {}
+        for run in self.runs:
+            regressed = {r["phase"] for r in run.get("regressions", [])}
+            for phase in self.phases:
+                if phase in run["timings"]:
+                    series.setdefault(phase, []).append(
+                        (self.x_value(run), run["timings"][phase], phase in regressed)
+                    )
+        return {phase: sorted(points) for phase, points in series.items()}
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(self.rect(), Qt.white)
+        series = self.series()
+        if not series:
+            painter.drawText(self.rect(), Qt.AlignCenter, "No run history yet.")
+            return
+
+        points = [p for values in series.values() for p in values]
+        x_min = min(p[0] for p in points)
+        x_max = max(p[0] for p in points)
+        y_max = max(p[1] for p in points) or 1.0
+        if x_max == x_min:
+            x_min, x_max = x_min - 1, x_max + 1
+        plot = QRectF(self.MARGIN, 10, self.width() - self.MARGIN - 170, self.height() - self.MARGIN - 10)
+
+        def to_screen(x, y):
+            return QPointF(
+                plot.left() + (x - x_min) / (x_max - x_min) * plot.width(),
+                plot.bottom() - y / y_max * plot.height(),
+            )
+
+        # Axes with min/max labels
+        painter.setPen(QPen(Qt.black))
+        painter.drawLine(plot.bottomLeft(), plot.bottomRight())
+        painter.drawLine(plot.bottomLeft(), plot.topLeft())
+        painter.drawText(QPointF(plot.left(), plot.bottom() + 15), self.x_label(x_min))
+        painter.drawText(QPointF(plot.right() - 60, plot.bottom() + 15), self.x_label(x_max))
+        painter.drawText(QPointF(plot.center().x() - 30, plot.bottom() + 35),
+                         "voters" if self.x_axis == "voters" else "date")
+        painter.drawText(QPointF(5, plot.top() + 10), f"{y_max:.2f}s")
+        painter.drawText(QPointF(5, plot.bottom()), "0s")
+
+        for i, phase in enumerate(self.phases):
+            if phase not in series:
+                continue
+            color = QColor(PHASE_COLORS[i % len(PHASE_COLORS)])
+            painter.setPen(QPen(color, 2))
+            screen = [to_screen(x, y) for x, y, _ in series[phase]]
+            for a, b in zip(screen, screen[1:]):
+                painter.drawLine(a, b)
+            for point, (_, _, regressed) in zip(screen, series[phase]):
+                painter.setBrush(color)
+                painter.drawEllipse(point, 3, 3)
+                if regressed:
+                    painter.setBrush(Qt.NoBrush)
+                    painter.setPen(QPen(QColor(REGRESSION_COLOR), 2))
+                    painter.drawEllipse(point, 7, 7)
+                    painter.setPen(QPen(color, 2))
+
+            # Legend
+            y = plot.top() + 15 * i
+            painter.fillRect(QRectF(plot.right() + 15, y, 10, 10), color)
+            painter.setPen(QPen(Qt.black))
+            painter.drawText(QPointF(plot.right() + 30, y + 10), phase)
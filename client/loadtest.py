@@ -0,0 +1,216 @@
+"""
+Load generator simulating many concurrent voters against a Hyperion server.
+
+Each simulated voter runs the voter flow from client/voter.py
+(keys -> register -> cast -> notify). Voters arrive as a Poisson
+process at --rate voters per second, and at most --concurrency of them
+are in flight at once. The report gives throughput and p50/p95/p99
+latency per endpoint, and can be written as JSON for release gating:
+
+    python -m client.loadtest --voters 5000 --rate 200 --json load.json \\
+        --max-p99-ms 250 --max-error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from .utils import ApiClient, SERVER
+from .voter import VoterClient, VoterKeys
+
+
+def percentile(sorted_values, p):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LoadStats:
+    """
+    Latencies and outcomes per endpoint.
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, seconds, status):
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][str(status)] += 1
+        if status is None or status >= 400:
+            self.errors[endpoint] += 1
+
+    def report(self, duration):
+        endpoints = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[endpoint] = {
+                "requests": len(values),
+                "errors": self.errors[endpoint],
+                "error_rate": self.errors[endpoint] / len(values),
+                "statuses": dict(self.statuses[endpoint]),
+                "throughput_rps": len(values) / duration if duration else 0.0,
+                "mean_ms": 1000 * sum(values) / len(values),
+                "p50_ms": 1000 * percentile(values, 50),
+                "p95_ms": 1000 * percentile(values, 95),
+                "p99_ms": 1000 * percentile(values, 99),
+                "max_ms": 1000 * values[-1],
+            }
+        requests = sum(e["requests"] for e in endpoints.values())
+        errors = sum(e["errors"] for e in endpoints.values())
+        return {
+            "duration_s": duration,
+            "requests": requests,
+            "errors": errors,
+            "error_rate": errors / requests if requests else 0.0,
+            "throughput_rps": requests / duration if duration else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+class TimedApiClient(ApiClient):
+    """
+    ApiClient that records the latency and status of every call.
+    """
+
+    def __init__(self, stats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def request(self, method, path, **kwargs):
+        # Group parametrised paths such as /notify/<voter_id>
+        endpoint = f"{method} /{path.strip('/').split('/')[0]}"
+        start = time.perf_counter()
+        try:
+            r = await super().request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(endpoint, time.perf_counter() - start, None)
+            raise
+        self.stats.record(endpoint, time.perf_counter() - start, r.status_code)
+        return r
+
+
+async def simulate_voter(client, index, notify=True):
+    voter_id = f"load-{index}"
+    keys = VoterKeys()
+    try:
+        await client.register(voter_id, keys.pk_voter, keys.h)
+        await client.cast(voter_id, random.choice(["YES", "NO"]), keys.h, keys)
+        if notify:
+            await client.notify(voter_id)
+    except (httpx.HTTPError, ValueError):
+        # Already recorded by TimedApiClient; keep the other voters going.
+        pass
+
+
+async def run_load(server=SERVER, voters=1000, rate=100.0, concurrency=200,
+                   notify=True, timeout=30.0, transport=None):
+    """
+    Drive `voters` simulated voters and return the load report.
+    """
+    stats = LoadStats()
+    api = TimedApiClient(
+        stats,
+        base_url=server,
+        timeout=timeout,
+        max_connections=concurrency,
+        max_keepalive=concurrency,
+        transport=transport,
+    )
+    client = VoterClient(api)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def voter(index):
+        async with slots:
+            await simulate_voter(client, index, notify)
+
+    start = time.perf_counter()
+    tasks = []
+    for index in range(voters):
+        tasks.append(asyncio.create_task(voter(index)))
+        if rate > 0:
+            await asyncio.sleep(random.expovariate(rate))
+    await asyncio.gather(*tasks)
+    duration = time.perf_counter() - start
+    await api.aclose()
+
+    report = stats.report(duration)
+    report["config"] = {
+        "server": server,
+        "voters": voters,
+        "rate": rate,
+        "concurrency": concurrency,
+        "notify": notify,
+    }
+    return report
+
+
+def check_gates(report, max_p99_ms=None, max_error_rate=None):
+    """
+    Return the list of violated gates (empty when the run passes).
+    """
+    failures = []
+    for endpoint, stats in report["endpoints"].items():
+        if max_p99_ms is not None and stats["p99_ms"] > max_p99_ms:
+            failures.append(f"{endpoint}: p99 {stats['p99_ms']:.1f} ms > {max_p99_ms} ms")
+    if max_error_rate is not None and report["error_rate"] > max_error_rate:
+        failures.append(f"error rate {report['error_rate']:.3f} > {max_error_rate}")
+    return failures
+
+
+def print_report(report):
+    print(f"{report['requests']} requests in {report['duration_s']:.2f} s "
+          f"({report['throughput_rps']:.1f} req/s, {report['errors']} errors)")
+    print(f"{'endpoint':<16}{'req':>8}{'err':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for endpoint, s in report["endpoints"].items():
+        print(f"{endpoint:<16}{s['requests']:>8}{s['errors']:>6}{s['throughput_rps']:>9.1f}"
+              f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent voters against a Hyperion server.")
+    parser.add_argument("--server", default=SERVER)
+    parser.add_argument("--voters", type=int, default=1000, help="number of simulated voters")
+    parser.add_argument("--rate", type=float, default=100.0,
+                        help="mean voter arrivals per second (0 = all at once)")
+    parser.add_argument("--concurrency", type=int, default=200, help="max voters in flight")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--no-notify", action="store_true", help="skip the /notify step")
+    parser.add_argument("--json", metavar="PATH", help="write the report as JSON")
+    parser.add_argument("--max-p99-ms", type=float, help="fail if any endpoint's p99 exceeds this")
+    parser.add_argument("--max-error-rate", type=float, help="fail if the overall error rate exceeds this")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load(
+        server=args.server,
+        voters=args.voters,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        notify=not args.no_notify,
+        timeout=args.timeout,
+    ))
+    failures = check_gates(report, args.max_p99_ms, args.max_error_rate)
+    report["gate_failures"] = failures
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    for failure in failures:
+        print("[GATE FAILED]", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+from collections import OrderedDict
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, pyqtSignal
+)
+from PyQt5.QtWidgets import QHeaderView, QLineEdit, QTableView, QVBoxLayout
+
+# Rows fetched from the server per request
+PAGE_SIZE = 500
+# Formatted cells kept around for repaints
+CELL_CACHE_SIZE = 5000
+
+
+class Column:
+    """
+    One table column: header, row key and an optional display formatter.
+    A key of None shows the 1-based row number; a callable key computes
+    the value from the whole row.
+    """
+
+    def __init__(self, header, key, fmt=None):
+        self.header = header
+        self.key = key
+        self.fmt = fmt
+
+    def value(self, row, index):
+        if self.key is None:
+            return index
+        if callable(self.key):
+            return self.key(row)
+        return row.get(self.key, "")
+
+    def display(self, row, index):
+        if self.key is None:
+            return str(index + 1)
+        value = self.value(row, index)
+        if self.fmt is not None:
+            return self.fmt(value)
+        return "" if value is None else str(value)
+
+
+class PagedTableModel(QAbstractTableModel):
+    """
+    Table model over a server-side list fetched page by page.
+
+    `fetch_page(offset, limit)` must return a concurrent.futures.Future
+    resolving to a response like {"bb": [...], "total": n}, for example
+    EventLoopThread.submit(api.get_bb(offset, limit)). Views ask for more
+    rows through canFetchMore/fetchMore as they scroll, and cells are
+    formatted only when a view displays them.
+    """
+    page_loaded = pyqtSignal(int, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, columns, fetch_page=None, rows_key="bb", page_size=PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.fetch_page = fetch_page
+        self.rows_key = rows_key
+        self.page_size = page_size
+        self.rows = []
+        self.total = 0
+        self.loading = False
+        # Bumped on reset so pages of a previous board are dropped
+        self.generation = 0
+        self._cells = OrderedDict()
+        self.page_loaded.connect(self._append_page)
+
+    def reload(self):
+        """
+        Drop the loaded rows and start again from the first page.
+        """
+        self.beginResetModel()
+        self.generation += 1
+        self.rows = []
+        self.total = None if self.fetch_page else 0
+        self.loading = False
+        self._cells.clear()
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def refresh(self):
+        """
+        Look for rows added on the server since the last page, keeping
+        the loaded ones.
+        """
+        if self.fetch_page is None or self.loading:
+            return
+        self.total = None
+        self.fetchMore(QModelIndex())
+
+    def set_rows(self, rows):
+        """
+        Show an already loaded list instead of fetching from the server.
+        """
+        self.beginResetModel()
+        self.generation += 1
+        self.rows = rows
+        self.total = len(rows)
+        self.loading = False
+        self._cells.clear()
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        """
+        Add rows at the end, e.g. from an incremental sync.
+        """
+        if not rows:
+            return
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self.rows.extend(rows)
+        self.total = len(self.rows)
+        self.endInsertRows()
+
+    # --- Qt model interface ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        column = self.columns[index.column()]
+        if role == Qt.DisplayRole:
+            return self._display(index.row(), index.column(), row, column)
+        if role == Qt.UserRole:
+            # Raw value, used for sorting and filtering
+            value = column.value(row, index.row())
+            return value if isinstance(value, (int, float)) else str(value)
+        if role == Qt.ToolTipRole:
+            return self._display(index.row(), index.column(), row, column)
+        return None
+
+    def _display(self, r, c, row, column):
+        key = (r, c)
+        if key in self._cells:
+            self._cells.move_to_end(key)
+            return self._cells[key]
+        text = column.display(row, r)
+        self._cells[key] = text
+        if len(self._cells) > CELL_CACHE_SIZE:
+            self._cells.popitem(last=False)
+        return text
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.loading or self.fetch_page is None:
+            return False
+        return self.total is None or len(self.rows) < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.loading = True
+        generation = self.generation
+        future = self.fetch_page(len(self.rows), self.page_size)
+        future.add_done_callback(lambda f: self._page_done(generation, f))
+
+    def _page_done(self, generation, future):
+        # Runs on the event loop thread; hand the page to the GUI thread.
+        try:
+            self.page_loaded.emit(generation, future.result())
+        except Exception as e:
+            self.page_loaded.emit(generation, None)
+            self.failed.emit(str(e))
+
+    def _append_page(self, generation, res):
+        if generation != self.generation:
+            return
+        self.loading = False
+        if not res or res.get("status") != "ok":
+            # Stop fetching; reload() starts over.
+            self.total = len(self.rows)
+            if res:
+                self.failed.emit(str(res.get("detail", res)))
+            return
+        page = res.get(self.rows_key, [])
+        self.total = res.get("total", len(self.rows) + len(page))
+        if not page:
+            self.total = len(self.rows)
+            return
+        start = len(self.rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+
+class TableFilterModel(QSortFilterProxyModel):
+    """
+    Sorting and substring filtering over any column, on the raw row
+    values, without copying the source rows.
+    """
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source)
+        self.setSortRole(Qt.UserRole)
+        self.setFilterRole(Qt.UserRole)
+        self.setFilterKeyColumn(-1)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+
+def build_table_view(model, row_height=None):
+    """
+    Sortable table view with a filter box over `model`.
+
+    Returns (layout, view). With `row_height` all rows get that fixed
+    height, so the view never measures cells it does not display.
+    """
+    layout = QVBoxLayout()
+    proxy = TableFilterModel(model, parent=model)
+    search = QLineEdit()
+    search.setPlaceholderText("Filter rows...")
+    search.textChanged.connect(proxy.setFilterFixedString)
+
+    view = QTableView()
+    view.setModel(proxy)
+    view.setSortingEnabled(True)
+    view.sortByColumn(0, Qt.AscendingOrder)
+    view.verticalHeader().setVisible(False)
+    if row_height:
+        view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        view.verticalHeader().setDefaultSectionSize(row_height)
+    view.horizontalHeader().setStretchLastSection(True)
+
+    layout.addWidget(search)
+    layout.addWidget(view)
+    return layout, view
@@ -0,0 +1,136 @@
+import asyncio
+import random
+import threading
+
+import httpx
+
+SERVER = "http://127.0.0.1:8000"
+
+# Gateway errors worth retrying; everything else is returned as is.
+RETRY_STATUS = {502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class ApiClient:
+    """
+    Shared async HTTP client for the Hyperion server.
+
+    Keeps one pooled httpx.AsyncClient with keep-alive connections, so
+    repeated calls reuse TCP connections instead of opening a new one per
+    request. Failed requests are retried with exponential backoff and
+    jitter: connection failures always (the request never reached the
+    server), other transport errors and gateway errors only for
+    idempotent methods unless `retry=True` is passed.
+
+    http2=True needs the optional h2 package (pip install "httpx[http2]").
+    `transport` replaces the network, e.g. an httpx.MockTransport in tests.
+    """
+
+    def __init__(self, base_url=SERVER, timeout=30.0, retries=3, backoff=0.2,
+                 http2=False, max_connections=100, max_keepalive=20, transport=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+        )
+        self.transport = transport
+        self._client = None
+        self._loop = None
+
+    async def client(self):
+        """
+        The pooled client of the running event loop.
+        """
+        # httpx connections belong to the event loop that opened them, so
+        # start a fresh pool if we are called from another loop, and
+        # close the old one.
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            await self._close(self._client, self._loop)
+            self._client = None
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self.transport,
+            )
+            self._loop = loop
+        return self._client
+
+    async def _close(self, client, loop):
+        if loop is not asyncio.get_running_loop() and loop.is_running():
+            # Its loop still runs on another thread; close it there
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        try:
+            await client.aclose()
+        except RuntimeError:
+            # Its loop is closed, and its connections with it
+            pass
+
+    async def request(self, method, path, retry=None, **kwargs):
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                client = await self.client()
+                r = await client.request(method, path, **kwargs)
+                if not retry or last or r.status_code not in RETRY_STATUS:
+                    return r
+            except httpx.ConnectError:
+                if last:
+                    raise
+            except httpx.TransportError:
+                if not retry or last:
+                    raise
+            await asyncio.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    async def get(self, path, **kwargs):
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request("POST", path, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._close(self._client, self._loop)
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+class EventLoopThread:
+    """
+    A long-lived asyncio loop on a daemon thread.
+
+    GUIs submit coroutines here instead of calling asyncio.run per click,
+    so the shared ApiClient keeps its connections between calls.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        """
+        Schedule `coro` and return a concurrent.futures.Future.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro):
+        """
+        Run `coro` on the loop and wait for its result.
+        """
+        return self.submit(coro).result()
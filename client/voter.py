@@ -1,52 +1,217 @@
-import httpx, asyncio, secrets, hashlib
+import secrets, hashlib
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import ECC
+from Crypto.Signature import DSS
+from .utils import ApiClient
 
-SERVER = "http://127.0.0.1:8000"
+# Same curve and encodings as server/validation.py, which checks the ballots
+CURVE = "P-256"
+ORDER = int(ECC._curves[CURVE].order)
+
+def encode_point(key):
+    return key.public_key().export_key(format="SEC1", compress=True).hex()
 
 def gen_trapdoor():
     """
-    PoC: generate secret x, and h = sha256(x).
-    In real scheme: h = g^x in a group.
+    Generate the secret x and the commitment h = x*G (compressed, hex).
     """
-    x = secrets.token_hex(16)
-    h = hashlib.sha256(x.encode()).hexdigest()
-    return x, h
+    x = secrets.randbelow(ORDER - 1) + 1
+    return x, encode_point(ECC.construct(curve=CURVE, d=x))
 
-async def register(voter_id, pk_voter, h):
-    async with httpx.AsyncClient() as client:
-        r = await client.post(f"{SERVER}/register", json={
+def ballot_message(voter_id, h, enc_vote, proofs):
+    out = bytearray(b"hyperion-ballot")
+    for field in (voter_id, h, enc_vote, proofs):
+        data = field.encode()
+        out += len(data).to_bytes(4, "big") + data
+    return bytes(out)
+
+class VoterKeys:
+    """
+    A voter's signing key and trapdoor.
+
+    `seal` returns the signature and trapdoor proof of a ballot: an ECDSA
+    signature over the ballot, and a Schnorr proof of knowledge of x bound
+    to the voter and the vote.
+    """
+    def __init__(self):
+        self.signing_key = ECC.generate(curve=CURVE)
+        self.x, self.h = gen_trapdoor()
+
+    @property
+    def pk_voter(self):
+        return encode_point(self.signing_key)
+
+    def prove_trapdoor(self, voter_id, enc_vote):
+        k = secrets.randbelow(ORDER - 1) + 1
+        commitment = encode_point(ECC.construct(curve=CURVE, d=k))
+        message = b"hyperion-trapdoor" + ballot_message(voter_id, self.h, enc_vote, commitment)
+        c = int.from_bytes(hashlib.sha256(message).digest(), "big") % ORDER
+        z = (k + c * self.x) % ORDER
+        return commitment + z.to_bytes(32, "big").hex()
+
+    def seal(self, voter_id, enc_vote):
+        proofs = self.prove_trapdoor(voter_id, enc_vote)
+        message = ballot_message(voter_id, self.h, enc_vote, proofs)
+        signature = DSS.new(self.signing_key, "fips-186-3").sign(SHA256.new(message))
+        return signature.hex(), proofs
+
+class VoterClient:
+    """
+    Voter-side API calls over a shared, pooled ApiClient.
+
+    With `election_id` the calls go to that election's endpoints
+    (/elections/<id>/...) instead of the default election.
+    """
+    def __init__(self, api=None, election_id=None):
+        self.api = api or ApiClient()
+        self.election_id = election_id
+
+    def path(self, path):
+        if self.election_id:
+            return f"/elections/{self.election_id}{path}"
+        return path
+
+    async def register(self, voter_id, pk_voter, h):
+        r = await self.api.post(self.path("/register"), json={
             "voter_id": voter_id,
             "pk_voter": pk_voter,
             "h": h,
             "proof": "zkp-placeholder"
         })
-        print("[REGISTER]", r.json())
         return r.json()
 
-async def cast(voter_id, enc_vote, h):
-    async with httpx.AsyncClient() as client:
-        r = await client.post(f"{SERVER}/cast", json={
+    async def cast(self, voter_id, enc_vote, h, keys=None):
+        # Without the voter's keys the ballot is sent unsigned and the
+        # server marks it invalid.
+        signed_ballot, proofs = "sig_placeholder", "proofs-placeholder"
+        if keys is not None:
+            signed_ballot, proofs = keys.seal(voter_id, enc_vote)
+        r = await self.api.post(self.path("/cast"), json={
             "voter_id": voter_id,
-            "signed_ballot": "sig_placeholder",
+            "signed_ballot": signed_ballot,
             "enc_vote": enc_vote,
             "h": h,
-            "proofs": "proofs-placeholder"
+            "proofs": proofs
         })
-        print("[CAST]", r.json())
         return r.json()
 
-async def notify(voter_id):
-    async with httpx.AsyncClient() as client:
-        r = await client.get(f"{SERVER}/notify/{voter_id}")
-        print("[NOTIFY]", r.json())
+    async def notify(self, voter_id):
+        r = await self.api.get(self.path(f"/notify/{voter_id}"))
         return r.json()
 
-async def show_bb():
-    async with httpx.AsyncClient() as client:
-        r = await client.get(f"{SERVER}/bb")
-        print("[BULLETIN BOARD]", r.json())
+    async def show_bb(self, offset=0, limit=None, encoding="json"):
+        params = {"offset": offset, "encoding": encoding}
+        if limit is not None:
+            params["limit"] = limit
+        r = await self.api.get(self.path("/bb"), params=params)
         return r.json()
 
-async def get_tally():
-    async with httpx.AsyncClient() as client:
-        r = await client.get(f"{SERVER}/tally_results")  
+    async def get_ballots(self, since=0, limit=None):
+        params = {"since": since}
+        if limit is not None:
+            params["limit"] = limit
+        r = await self.api.get(self.path("/ballots"), params=params)
+        return r.json()
+
+    async def get_ballot(self, row_id):
+        r = await self.api.get(self.path(f"/ballots/{row_id}"))
+        return r.json()
+
+    async def get_tally(self):
+        r = await self.api.get(self.path("/tally_results"))
         return r.json()
+
+    async def aclose(self):
+        await self.api.aclose()
+
+class BallotCache:
+    """
+    Local copy of the cast ballots, synced incrementally.
+
+    `sync_page` fetches the rows appended since the last cursor, one page
+    at a time; `page` serves a PagedTableModel from it, so the GUI only
+    fetches the pages its view scrolls to. Rows are kept in board order,
+    so a row's `seq` is its position.
+    """
+    PAGE_SIZE = 1000
+
+    def __init__(self):
+        self.rows = []
+        self.cursor = 0
+        self.total = 0
+        self.by_id = {}
+
+    async def sync_page(self, client, limit=None):
+        """
+        Fetch one page of rows after the cursor; returns the response.
+        """
+        res = await client.get_ballots(self.cursor, limit or self.PAGE_SIZE)
+        page = res.get("ballots", [])
+        for row in page:
+            self.by_id[row["row_id"]] = len(self.rows)
+            self.rows.append(row)
+        self.cursor = res.get("cursor", self.cursor + len(page))
+        self.total = res.get("total", self.cursor)
+        return res
+
+    async def sync(self, client):
+        """
+        Fetch all new rows and return them.
+        """
+        new = []
+        while True:
+            res = await self.sync_page(client)
+            page = res.get("ballots", [])
+            new.extend(page)
+            if not page or self.cursor >= res.get("total", self.cursor):
+                return new
+
+    async def page(self, client, offset, limit=None):
+        """
+        Rows from `offset` as a /ballots response, for a PagedTableModel
+        with rows_key="ballots". Syncs up to `offset + limit` first, then
+        serves the window from the cache.
+        """
+        limit = limit or self.PAGE_SIZE
+        while self.cursor < offset + limit:
+            res = await self.sync_page(client, offset + limit - self.cursor)
+            if not res.get("ballots") or self.cursor >= res.get("total", self.cursor):
+                break
+        return {
+            "status": "ok",
+            "ballots": self.rows[offset:offset + limit],
+            "cursor": min(offset + limit, self.cursor),
+            "total": max(self.total, self.cursor),
+        }
+
+    def find(self, row_id):
+        """
+        Position of `row_id` in the cache, or None if not synced yet.
+        """
+        return self.by_id.get(row_id)
+
+# Shared client behind the module-level helpers
+client = VoterClient()
+
+async def register(voter_id, pk_voter, h):
+    res = await client.register(voter_id, pk_voter, h)
+    print("[REGISTER]", res)
+    return res
+
+async def cast(voter_id, enc_vote, h, keys=None):
+    res = await client.cast(voter_id, enc_vote, h, keys)
+    print("[CAST]", res)
+    return res
+
+async def notify(voter_id):
+    res = await client.notify(voter_id)
+    print("[NOTIFY]", res)
+    return res
+
+async def show_bb():
+    res = await client.show_bb()
+    print("[BULLETIN BOARD]", res)
+    return res
+
+async def get_tally():
+    return await client.get_tally()
@@ -1,18 +1,13 @@
 import sys
-import asyncio
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QTextEdit, QLineEdit, QLabel, QComboBox, QTabWidget,
-    QTableWidget, QTableWidgetItem, QHeaderView
+    QHeaderView
 )
-<<<<<<< HEAD
-import voter 
-=======
 from . import voter 
->>>>>>> hyperion-gui
-import httpx
-
-SERVER = "http://127.0.0.1:8000"
+from .utils import EventLoopThread
+from .workers import ApiCallWorker
+from .table_models import Column, PagedTableModel, build_table_view
 
 class VoterApp(QWidget):
     def __init__(self):
@@ -21,8 +16,33 @@ class VoterApp(QWidget):
         self.resize(900, 600)
 
         self.voter_id = "alice"
-        self.pk_voter = "pk_alice"
-        self.x, self.h = voter.gen_trapdoor()
+        self.keys = voter.VoterKeys()
+
+        # One pooled client and event loop for all requests of this window
+        self.api = voter.VoterClient()
+        self.loop = EventLoopThread()
+        self.tally_worker = None
+        self.find_worker = None
+        self.voter_worker = None
+        self.own_row_id = None
+
+        # Local copy of the cast ballots. The table pulls pages from it as
+        # it scrolls, and refresh fetches only rows cast since.
+        self.ballots = voter.BallotCache()
+        self.model_bb = PagedTableModel([
+            Column("Row ID", "row_id"),
+            Column("Voter ID", "voter_id"),
+            Column("h", "h"),
+            Column("Encrypted Vote", "enc_vote"),
+            Column("Signed Ballot", "signed_ballot"),
+        ], fetch_page=self.fetch_bb_page, rows_key="ballots", parent=self)
+        self.model_bb.page_loaded.connect(self.on_bb_page)
+        self.model_bb.failed.connect(self.on_bb_failed)
+        self.model_tally = PagedTableModel([
+            Column("Row ID", "row_id"),
+            Column("Vote", "vote"),
+            Column("h_r", "h_r"),
+        ], parent=self)
 
         layout = QVBoxLayout()
         self.tabs = QTabWidget()
@@ -44,6 +64,8 @@ class VoterApp(QWidget):
 
         layout.addWidget(self.tabs)
         self.setLayout(layout)
+        # First page only; the view fetches more as it scrolls
+        self.model_bb.refresh()
 
     # --- Voter tab ---
     def build_voter_tab(self):
@@ -91,16 +113,19 @@ class VoterApp(QWidget):
         btn_refresh = QPushButton("Refresh Bulletin Board")
         btn_refresh.clicked.connect(self.do_show_bb)
 
-        self.table_bb = QTableWidget()
-        self.table_bb.setColumnCount(5)
-        self.table_bb.setHorizontalHeaderLabels(
-            ["Row ID", "Voter ID", "h", "Encrypted Vote", "Signed Ballot"]
-        )
-        self.table_bb.horizontalHeader().setStretchLastSection(True)
+        btn_find = QPushButton("Find My Ballot")
+        btn_find.clicked.connect(self.do_find_ballot)
+        self.label_bb = QLabel("")
+
+        bb_layout, self.table_bb = build_table_view(self.model_bb, row_height=30)
         self.table_bb.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
-        layout.addWidget(btn_refresh)
-        layout.addWidget(self.table_bb)
+        buttons = QHBoxLayout()
+        buttons.addWidget(btn_refresh)
+        buttons.addWidget(btn_find)
+        layout.addLayout(buttons)
+        layout.addWidget(self.label_bb)
+        layout.addLayout(bb_layout)
 
         return layout
 
@@ -111,14 +136,11 @@ class VoterApp(QWidget):
         btn_refresh = QPushButton("Refresh Tally Results")
         btn_refresh.clicked.connect(self.do_show_tally)
 
-        self.table_tally = QTableWidget()
-        self.table_tally.setColumnCount(3)
-        self.table_tally.setHorizontalHeaderLabels(["Row ID", "Vote", "h_r"])
-        self.table_tally.horizontalHeader().setStretchLastSection(True)
+        tally_layout, self.table_tally = build_table_view(self.model_tally, row_height=30)
         self.table_tally.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
         layout.addWidget(btn_refresh)
-        layout.addWidget(self.table_tally)
+        layout.addLayout(tally_layout)
 
         return layout
 
@@ -129,41 +151,87 @@ class VoterApp(QWidget):
     # --- Actions ---
     def do_register(self):
         voter_id = self.input_voter_id.text()
-        res = asyncio.run(voter.register(voter_id, self.pk_voter, self.h))
-        self.log_voter(f"[REGISTER] {res}")
+        self.voter_worker = ApiCallWorker(
+            self.loop, self.api.register(voter_id, self.keys.pk_voter, self.keys.h), self)
+        self.voter_worker.finished.connect(lambda res: self.log_voter(f"[REGISTER] {res}"))
+        self.voter_worker.failed.connect(lambda e: self.log_voter(f"[REGISTER] {e}"))
+        self.voter_worker.start()
 
     def do_cast(self):
         voter_id = self.input_voter_id.text()
         choice = self.vote_choice.currentText()
-        res = asyncio.run(voter.cast(voter_id, choice, self.h))
+        self.voter_worker = ApiCallWorker(
+            self.loop, self.api.cast(voter_id, choice, self.keys.h, self.keys), self)
+        self.voter_worker.finished.connect(lambda res: self.on_cast(choice, res))
+        self.voter_worker.failed.connect(lambda e: self.log_voter(f"[CAST {choice}] {e}"))
+        self.voter_worker.start()
+
+    def on_cast(self, choice, res):
+        self.own_row_id = res.get("row_id")
         self.log_voter(f"[CAST {choice}] {res}")
 
     def do_notify(self):
         voter_id = self.input_voter_id.text()
-        res = asyncio.run(voter.notify(voter_id))
-        self.log_voter(f"[NOTIFY] {res}")
+        self.voter_worker = ApiCallWorker(self.loop, self.api.notify(voter_id), self)
+        self.voter_worker.finished.connect(lambda res: self.log_voter(f"[NOTIFY] {res}"))
+        self.voter_worker.failed.connect(lambda e: self.log_voter(f"[NOTIFY] {e}"))
+        self.voter_worker.start()
 
-    def do_show_bb(self):
-        res = asyncio.run(voter.show_bb())
-        bb = res.get("bb", [])
+    def fetch_bb_page(self, offset, limit):
+        return self.loop.submit(self.ballots.page(self.api, offset, limit))
 
-        self.table_bb.setRowCount(len(bb))
-        for row_idx, row in enumerate(bb):
-            self.table_bb.setItem(row_idx, 0, QTableWidgetItem(row.get("row_id", "")))
-            self.table_bb.setItem(row_idx, 1, QTableWidgetItem(row.get("voter_id", "")))
-            self.table_bb.setItem(row_idx, 2, QTableWidgetItem(row.get("h", "")))
-            self.table_bb.setItem(row_idx, 3, QTableWidgetItem(row.get("enc_vote", "")))
-            self.table_bb.setItem(row_idx, 4, QTableWidgetItem(row.get("signed_ballot", "")))
+    def do_show_bb(self):
+        self.model_bb.refresh()
+
+    def on_bb_page(self, generation, res):
+        self.label_bb.setText(f"{len(self.model_bb.rows)} of {self.ballots.total} ballots loaded")
+
+    def on_bb_failed(self, error):
+        self.label_bb.setText(f"Sync failed: {error}")
+
+    def do_find_ballot(self):
+        """
+        Select the voter's own ballot, from the cache or by row id lookup.
+        """
+        if not self.own_row_id:
+            self.label_bb.setText("Cast a vote first.")
+            return
+        pos = self.ballots.find(self.own_row_id)
+        if pos is not None:
+            self.select_bb_row(pos)
+            return
+        self.find_worker = ApiCallWorker(self.loop, self.api.get_ballot(self.own_row_id), self)
+        self.find_worker.finished.connect(self.on_ballot_found)
+        self.find_worker.failed.connect(self.on_bb_failed)
+        self.find_worker.start()
+
+    def on_ballot_found(self, res):
+        ballot = res.get("ballot")
+        if not ballot:
+            self.label_bb.setText(f"Ballot {self.own_row_id} is not on the board.")
+            return
+        self.label_bb.setText(f"Your ballot is row {ballot['seq'] + 1}; scroll down to load it.")
+        self.log_voter(f"[MY BALLOT] {ballot}")
+
+    def select_bb_row(self, pos):
+        proxy = self.table_bb.model()
+        index = proxy.mapFromSource(self.model_bb.index(pos, 0))
+        if not index.isValid():
+            self.label_bb.setText("Your ballot is hidden by the filter.")
+            return
+        self.table_bb.selectRow(index.row())
+        self.table_bb.scrollTo(index)
+        self.label_bb.setText(f"Your ballot is row {pos + 1}.")
 
     def do_show_tally(self):
-        res = asyncio.run(voter.get_tally())
-        tally = res.get("tally", [])
-
-        self.table_tally.setRowCount(len(tally))
-        for row_idx, row in enumerate(tally):
-            self.table_tally.setItem(row_idx, 0, QTableWidgetItem(row.get("row_id", "")))
-            self.table_tally.setItem(row_idx, 1, QTableWidgetItem(row.get("vote", "")))
-            self.table_tally.setItem(row_idx, 2, QTableWidgetItem(row.get("h_r", "")))
+        self.tally_worker = ApiCallWorker(self.loop, self.api.get_tally(), self)
+        self.tally_worker.finished.connect(self.show_tally)
+        self.tally_worker.failed.connect(lambda e: self.log_voter(f"[TALLY] {e}"))
+        self.tally_worker.start()
+
+    def show_tally(self, res):
+        # Cells are formatted only when the view shows them
+        self.model_tally.set_rows(res.get("tally", []))
 
 
 if __name__ == "__main__":
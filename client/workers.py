@@ -0,0 +1,86 @@
+import asyncio
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# Seconds between job status polls
+POLL_INTERVAL = 0.5
+
+
+class ApiCallWorker(QObject):
+    """
+    Runs one API coroutine on the GUI's EventLoopThread.
+
+    The result (or the exception) comes back through a signal, so slots
+    run on the GUI thread and the window stays responsive meanwhile.
+    """
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, loop, coro, parent=None):
+        super().__init__(parent)
+        self.loop = loop
+        self.coro = coro
+
+    def start(self):
+        future = self.loop.submit(self.coro)
+        future.add_done_callback(self._done)
+
+    def _done(self, future):
+        try:
+            self.finished.emit(future.result())
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class JobWorker(QObject):
+    """
+    Starts a Hyperion job and polls it until it ends.
+
+    `progress` is emitted with the job status on every poll, `finished`
+    with the run result, `failed` with an error message (also when the
+    job was cancelled).
+    """
+    progress = pyqtSignal(dict)
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, loop, api, params, parent=None):
+        super().__init__(parent)
+        self.loop = loop
+        self.api = api
+        self.params = params
+        self.job_id = None
+        self._cancelled = False
+
+    def start(self):
+        future = self.loop.submit(self._poll())
+        future.add_done_callback(self._done)
+
+    def cancel(self):
+        self._cancelled = True
+        if self.job_id is not None:
+            self.loop.submit(self.api.cancel_job(self.job_id))
+
+    async def _poll(self):
+        res = await self.api.start_job(**self.params)
+        self.job_id = res["job_id"]
+        if self._cancelled:
+            await self.api.cancel_job(self.job_id)
+        while True:
+            job = await self.api.get_job(self.job_id)
+            self.progress.emit(job)
+            if job["status"] not in ("queued", "running"):
+                return job
+            await asyncio.sleep(POLL_INTERVAL)
+
+    def _done(self, future):
+        try:
+            job = future.result()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        if job["status"] == "done":
+            self.finished.emit(job["result"])
+        elif job["status"] == "cancelled":
+            self.failed.emit("Run cancelled.")
+        else:
+            self.failed.emit(job.get("error") or f"Run {job['status']}.")
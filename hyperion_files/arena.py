@@ -0,0 +1,77 @@
+"""
+Shared-memory arrays of points for the Teller's worker processes.
+
+A PointArena is a multiprocessing.shared_memory block of fixed-width
+slots. Each slot holds `width` points in pointcodec's 64-byte raw
+encoding. The parent writes the inputs once, and each worker reads and
+writes only its own index range in place. Only the block's name crosses
+the process boundary, so the points themselves are never pickled. Arenas
+pickle as their name and shape, so they can be passed as task arguments.
+"""
+import os
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from Crypto.PublicKey import ECC
+
+import pointcodec
+
+SLOT = pointcodec.RAW_SIZE
+
+
+class PointArena:
+    def __init__(self, count, width=1, name=None):
+        self.count = count
+        self.width = width
+        self.owner = name is None
+        if self.owner:
+            self.shm = SharedMemory(create=True, size=max(1, count * width * SLOT))
+        else:
+            self.shm = SharedMemory(name=name)
+            # Only the creating process unlinks the block; keep the
+            # resource tracker from unlinking it when a worker exits.
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.pid = os.getpid()
+
+    def __reduce__(self):
+        return PointArena, (self.count, self.width, self.shm.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _offset(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return index * self.width * SLOT
+
+    def write_xy(self, index, coords):
+        """
+        Store `width` (x, y) pairs in slot `index`.
+        """
+        offset = self._offset(index)
+        self.shm.buf[offset:offset + self.width * SLOT] = b"".join(
+            pointcodec.encode_xy(x, y) for x, y in coords
+        )
+
+    def write(self, index, points):
+        self.write_xy(index, ((p.x, p.y) for p in points))
+
+    def read_xy(self, index, count=None):
+        """
+        The first `count` (default: all) (x, y) pairs of slot `index`.
+        """
+        offset = self._offset(index)
+        buf = self.shm.buf
+        return [pointcodec.decode_xy(buf[offset + i * SLOT:offset + (i + 1) * SLOT])
+                for i in range(self.width if count is None else count)]
+
+    def read(self, index, count=None):
+        return [ECC.EccPoint(x, y, pointcodec.CURVE) for x, y in self.read_xy(index, count)]
+
+    def close(self):
+        self.shm.close()
+        if self.owner and self.pid == os.getpid():
+            self.shm.unlink()
@@ -0,0 +1,70 @@
+"""
+Batch verification of Schnorr-style equations.
+
+Each equation states that sum(k_i * P_i) is the point at infinity. A
+Schnorr or Chaum-Pedersen check "s * G == R + c * Y" becomes the terms
+(G, s), (R, -1), (Y, -c). A batch scales every equation by its own
+random WEIGHT_BITS-bit weight and checks the sum of all of them with one
+ecops.msm. If any equation fails, the weighted sum is the point at
+infinity only with probability about 2^-WEIGHT_BITS. Points that several
+equations share, such as the generator or the teller key, are merged
+into one term.
+
+A failed batch says only that some equation is wrong. Equations are
+added with a tag, such as the ballot they belong to, and failures()
+then checks each tag's equations on their own to name the wrong ones.
+"""
+import secrets
+
+import ecops
+
+WEIGHT_BITS = 128
+
+
+class BatchVerifier:
+    def __init__(self):
+        self.equations = []  # (points, scalars, tag)
+
+    def __len__(self):
+        return len(self.equations)
+
+    def add(self, points, scalars, tag=None):
+        """
+        Queue the equation sum(k * P for P, k in zip(points, scalars)) == infinity.
+        """
+        self.equations.append((list(points), [int(k) for k in scalars], tag))
+
+    def verify(self):
+        """
+        Whether all queued equations hold, with a single multi-scalar
+        multiplication. An empty batch holds.
+        """
+        return _holds(self.equations)
+
+    def failures(self):
+        """
+        Tags whose equations do not all hold, in the order they were
+        first added; one multi-scalar multiplication per tag.
+        """
+        groups = {}
+        for equation in self.equations:
+            groups.setdefault(equation[2], []).append(equation)
+        return [tag for tag, equations in groups.items() if not _holds(equations)]
+
+
+def _holds(equations):
+    # Random odd weight per equation; points shared by several are merged
+    terms = {}  # id(point) -> [point, combined scalar]
+    for points, scalars, _ in equations:
+        weight = secrets.randbits(WEIGHT_BITS) | 1
+        for point, k in zip(points, scalars):
+            term = terms.get(id(point))
+            if term is None:
+                terms[id(point)] = [point, weight * k]
+            else:
+                term[1] += weight * k
+    if not terms:
+        return True
+    points = [term[0] for term in terms.values()]
+    scalars = [term[1] for term in terms.values()]
+    return ecops.msm(points, scalars).is_point_at_infinity()
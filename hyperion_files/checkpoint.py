@@ -0,0 +1,172 @@
+"""
+Checkpoints of protocol phase outputs, so a failed run can resume.
+
+When HYPERION_CHECKPOINT_DIR is set, every call of a function decorated
+with @checkpointed stores its outputs there: threshold keys, the voters'
+keys and signed ballots, raise_h_chunk outputs, mixnet outputs and proofs,
+and partial decryptions. A later run with the same directory replays the
+stored outputs instead of recomputing them, so it continues after the
+last completed call. Set HYPERION_CHECKPOINT_RERUN to a phase (e.g.
+"tallying-mixing") to recompute that phase and all later ones on the
+frozen inputs of the earlier phases, e.g. to re-benchmark one phase.
+
+Each process appends length-prefixed, zlib-compressed pickle records to
+its own log file; points are stored as coordinates (see pool.py). Calls
+are identified by the function, its party (voter id or key share) and a
+digest of its inputs in the canonical Transcript encoding, so points
+and keys match by value in a resumed run rather than by the object
+addresses str() would show.
+"""
+import functools
+import glob
+import os
+import pickle
+import struct
+import threading
+import zlib
+
+import instrument
+import pool  # noqa: F401 - makes points and keys picklable
+from transcript import Transcript
+
+CHECKPOINT_DIR = os.environ.get("HYPERION_CHECKPOINT_DIR")
+RERUN_PHASE = os.environ.get("HYPERION_CHECKPOINT_RERUN")
+
+# Phases in protocol order, for HYPERION_CHECKPOINT_RERUN
+PHASE_ORDER = [
+    instrument.SETUP,
+    instrument.VOTING,
+    instrument.MIXING,
+    instrument.DECRYPTION,
+    instrument.NOTIFICATION,
+    instrument.VERIFICATION,
+    instrument.INDIVIDUAL_VIEWS,
+]
+
+_HEADER = struct.Struct("<II")  # key length, record length
+_records = None  # key -> compressed record, loaded on first use
+_lock = threading.Lock()
+
+
+def dumps(value):
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+
+def loads(data):
+    return pickle.loads(zlib.decompress(data))
+
+
+def rerun(phase):
+    """
+    Whether calls in `phase` must be recomputed rather than replayed.
+    """
+    if not RERUN_PHASE:
+        return False
+    slugs = [instrument.phase_slug(p) for p in PHASE_ORDER]
+    if RERUN_PHASE not in slugs or phase not in PHASE_ORDER:
+        return False
+    return PHASE_ORDER.index(phase) >= slugs.index(RERUN_PHASE)
+
+
+def _load():
+    # Newer logs win, so a rerun phase replaces the older records
+    records = {}
+    paths = glob.glob(os.path.join(CHECKPOINT_DIR, "*.log"))
+    for path in sorted(paths, key=os.path.getmtime):
+        with open(path, "rb") as f:
+            data = f.read()
+        pos = 0
+        while pos + _HEADER.size <= len(data):
+            key_size, size = _HEADER.unpack_from(data, pos)
+            pos += _HEADER.size
+            if pos + key_size + size > len(data):
+                break  # Torn write of a crashed process
+            key = data[pos:pos + key_size].decode("UTF-8")
+            pos += key_size
+            # Records stay compressed until a call replays them
+            records[key] = data[pos:pos + size]
+            pos += size
+    return records
+
+
+def lookup(key):
+    global _records
+    with _lock:
+        if _records is None:
+            _records = _load()
+        return _records.get(key)
+
+
+def save(key, value):
+    key_bytes = key.encode("UTF-8")
+    record = dumps(value)
+    path = os.path.join(CHECKPOINT_DIR, f"{os.getpid()}.log")
+    with _lock:
+        with open(path, "ab") as f:
+            f.write(_HEADER.pack(len(key_bytes), len(record)) + key_bytes + record)
+
+
+def input_key(values):
+    """
+    Hex digest of `values` in the canonical Transcript encoding.
+    """
+    return Transcript("checkpoint").append(values).digest().hex()
+
+
+def checkpointed(phase, party=None, inputs=None, state=False):
+    """
+    Decorator storing a call's outputs and replaying them on resume.
+
+    `party(self)` and `inputs(*args)` identify the call; the default
+    input key is the arguments themselves. Either way the key is hashed
+    with input_key. With state=True, attributes the call sets on `self`
+    are stored and restored as well.
+    """
+
+    def decorate(func):
+        label = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            if CHECKPOINT_DIR is None:
+                return func(*args)
+            self = args[0] if party or state else None
+            in_args = args[1:] if self is not None else args
+            key = "|".join((
+                label,
+                str(party(self)) if party else "",
+                input_key(inputs(*in_args) if inputs else in_args),
+            ))
+
+            record = None if rerun(phase) else lookup(key)
+            if record is not None:
+                result, attrs = loads(record)
+                if attrs:
+                    self.__dict__.update(attrs)
+                return result
+
+            before = dict(self.__dict__) if state else {}
+            result = func(*args)
+            attrs = {}
+            if state:
+                attrs = {
+                    name: value for name, value in self.__dict__.items()
+                    if before.get(name) is not value and name != "curve"
+                }
+            save(key, (result, attrs))
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def _reset_after_fork():
+    # Children share the loaded records but not the lock
+    global _lock
+    _lock = threading.Lock()
+
+
+if CHECKPOINT_DIR is not None:
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,208 @@
+"""
+Faster elliptic-curve operations for repeated bases and sums of products.
+
+FixedBaseTable precomputes the multiples d * 2^(w*i) * Q of a point Q
+for every window digit d. A scalar multiplication then costs one
+table-entry addition per w-bit window, instead of a full double-and-add
+ladder. ElGamal encryption to a teller key repeats k * Q for every
+ballot in Voter.encrypt_vote and Teller.raise_h; those calls go through
+elgamal_encrypt. The table for a key is built once that key has been
+used TABLE_AFTER times, counting every object with its coordinates. Forked workers inherit tables built before they
+start.
+
+The generator is left alone: pycryptodome already keeps precomputed
+tables for the P-256 base point.
+
+msm computes sum(k_i * P_i) with Straus' interleaved windows for a few
+points and Pippenger's bucket method for many, so the proofs of
+(partial) decryption cost additions rather than n full multiplications.
+
+All of this works with in-place additions on clones: EccPoint.copy()
+goes through the coordinates and an on-curve check and costs about as
+much as half a scalar multiplication, while clone() copies the C point.
+"""
+import math
+import os
+import threading
+
+from Crypto.PublicKey import ECC
+
+WINDOW = int(os.environ.get("HYPERION_FIXED_BASE_WINDOW", "4"))
+# Multiplications by a point before it gets a table; building one costs
+# about as much as this many plain multiplications.
+TABLE_AFTER = int(os.environ.get("HYPERION_FIXED_BASE_AFTER", "256"))
+
+# Up to this many points msm uses Straus, beyond it Pippenger
+STRAUS_MAX = 64
+STRAUS_WINDOW = 4
+
+_tables = {}  # (curve, x, y) -> table or use count
+_lock = threading.Lock()
+
+
+def clone(point):
+    """
+    Independent copy of `point`, without EccPoint.copy()'s round trip
+    through the coordinates.
+    """
+    new = ECC.EccPoint.__new__(ECC.EccPoint)
+    new._curve = point._curve
+    new._curve_name = point._curve_name
+    return new.set(point)
+
+
+class FixedBaseTable:
+    def __init__(self, point, window=WINDOW):
+        self.point = point
+        self.window = window
+        self.mask = (1 << window) - 1
+        self.order = int(ECC._curves[point._curve_name].order)
+        rows = -(-self.order.bit_length() // window)
+        # rows[i][d - 1] = d * 2^(w*i) * point; += works in place, so
+        # every entry starts as a copy.
+        self.rows = []
+        base = clone(point)
+        for _ in range(rows):
+            entries = [clone(base)]
+            for _ in range(2, 1 << window):
+                entry = clone(entries[-1])
+                entry += base
+                entries.append(entry)
+            self.rows.append(entries)
+            base = clone(entries[-1])
+            base += entries[0]
+
+    def multiply(self, k):
+        k = int(k) % self.order
+        result = None
+        shift = 0
+        for entries in self.rows:
+            digit = (k >> shift) & self.mask
+            if digit:
+                if result is None:
+                    result = clone(entries[digit - 1])
+                else:
+                    result += entries[digit - 1]
+            shift += self.window
+        if result is None:
+            return self.point * 0
+        return result
+
+
+def _key(point):
+    # Equal points share a table, whichever object they come in
+    x, y = point.xy
+    return point._curve_name, int(x), int(y)
+
+
+def multiply(point, k):
+    """
+    k * point, through a fixed-base table once `point` is used often.
+    """
+    key = _key(point)
+    with _lock:
+        table = _tables.get(key, 0)
+        if not isinstance(table, FixedBaseTable):
+            if table + 1 < TABLE_AFTER:
+                _tables[key] = table + 1
+                # Reduced like the table does, so negative k work too
+                return point * (int(k) % _order(point))
+            table = _tables[key] = FixedBaseTable(point)
+    return table.multiply(k)
+
+
+def precompute(point):
+    """
+    Build the table for `point` now rather than after TABLE_AFTER uses.
+    """
+    key = _key(point)
+    with _lock:
+        if not isinstance(_tables.get(key), FixedBaseTable):
+            _tables[key] = FixedBaseTable(point)
+
+
+def elgamal_encrypt(curve, public_key, message):
+    """
+    ElGamal encryption of the point `message` to `public_key`, as
+    ElGamalEncryption.encrypt: [r * P, message + r * public_key, r].
+    """
+    r = curve.get_random()
+    shared = multiply(public_key, r)
+    shared += message
+    return [curve.raise_p(r), shared, r]
+
+
+def _order(point):
+    return int(ECC._curves[point._curve_name].order)
+
+
+def _infinity(point):
+    result = clone(point)
+    result += -point
+    return result
+
+
+def msm(points, scalars):
+    """
+    sum(k * P for P, k in zip(points, scalars)); the point at infinity
+    for no points.
+    """
+    points = list(points)
+    if not points:
+        return ECC.EccPoint(0, 0, "P-256")
+    order = _order(points[0])
+    scalars = [int(k) % order for k in scalars]
+    if len(points) <= STRAUS_MAX:
+        return _straus(points, scalars, order.bit_length())
+    return _pippenger(points, scalars, order.bit_length())
+
+
+def _straus(points, scalars, bits, window=STRAUS_WINDOW):
+    # Multiples 1..2^w-1 of every point; then one shared doubling chain,
+    # adding each point's table entry for its digit of the window.
+    tables = []
+    for point in points:
+        entries = [clone(point)]
+        for _ in range(2, 1 << window):
+            entry = clone(entries[-1])
+            entry += point
+            entries.append(entry)
+        tables.append(entries)
+    mask = (1 << window) - 1
+    result = _infinity(points[0])
+    for shift in range(window * (-(-bits // window) - 1), -1, -window):
+        for _ in range(window):
+            result.double()
+        for entries, k in zip(tables, scalars):
+            digit = (k >> shift) & mask
+            if digit:
+                result += entries[digit - 1]
+    return result
+
+
+def _pippenger(points, scalars, bits):
+    # Per c-bit window, add each point into the bucket of its digit; the
+    # window sum is sum(d * bucket[d]), built from running sums.
+    c = max(2, int(math.log2(len(points))) - 2)
+    mask = (1 << c) - 1
+    infinity = _infinity(points[0])
+    buckets = [clone(infinity) for _ in range(mask)]
+    running = clone(infinity)
+    window_sum = clone(infinity)
+    result = clone(infinity)
+    for shift in range(c * (-(-bits // c) - 1), -1, -c):
+        for _ in range(c):
+            result.double()
+        for bucket in buckets:
+            bucket.set(infinity)
+        for point, k in zip(points, scalars):
+            digit = (k >> shift) & mask
+            if digit:
+                buckets[digit - 1] += point
+        running.set(infinity)
+        window_sum.set(infinity)
+        for bucket in reversed(buckets):
+            running += bucket
+            window_sum += running
+        result += window_sum
+    return result
@@ -0,0 +1,497 @@
+"""
+Lightweight tracing, profiling and memory accounting for the Hyperion
+protocol processes.
+
+Spans are buffered per process and written as Chrome trace events
+(one JSON object per line, one file per pid) into the directory named by
+the HYPERION_TRACE_DIR environment variable. The server merges these files
+into a single trace after the run.
+
+When HYPERION_PROFILE_DIR is set, every process also profiles itself,
+either with cProfile or with a sampling profiler (HYPERION_PROFILE_MODE),
+keeping one profile per protocol phase. When HYPERION_MEMORY_DIR is set,
+every process records its peak RSS per phase, plus the tracemalloc peak
+and top allocators when HYPERION_TRACEMALLOC=1. With
+HYPERION_PHASE_EVENTS=1, the first entry of each process into a phase is
+reported on stderr so the server can show live progress. Nothing is
+recorded when the variables are unset, so the decorators are free in
+normal runs.
+"""
+import atexit
+import collections
+import cProfile
+import functools
+import json
+import os
+import pstats
+import re
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+TRACE_DIR = os.environ.get("HYPERION_TRACE_DIR")
+PROFILE_DIR = os.environ.get("HYPERION_PROFILE_DIR")
+PROFILE_MODE = os.environ.get("HYPERION_PROFILE_MODE", "cprofile")
+SAMPLE_INTERVAL = float(os.environ.get("HYPERION_PROFILE_INTERVAL", "0.005"))
+MEMORY_DIR = os.environ.get("HYPERION_MEMORY_DIR")
+TRACEMALLOC = os.environ.get("HYPERION_TRACEMALLOC") == "1"
+TOP_ALLOCATORS = 10
+WATCH_INTERVAL = 0.05
+PHASE_EVENTS = os.environ.get("HYPERION_PHASE_EVENTS") == "1"
+# Must match EVENT_PREFIX in server/hyperion_runner.py
+EVENT_PREFIX = "@@hyperion-event "
+
+# Phase names match the columns of the Hyperion timing table.
+SETUP = "Setup"
+VOTING = "Voting (avg.)"
+MIXING = "Tallying (Mixing)"
+DECRYPTION = "Tallying (Decryption)"
+NOTIFICATION = "Notification"
+VERIFICATION = "Verification (avg.)"
+INDIVIDUAL_VIEWS = "Individual Views"
+# Profiles collect time spent outside any phase under this name.
+MAIN = "main"
+
+_events = []
+_lock = threading.Lock()
+_collectors = []
+_announced = set()
+
+
+def phase_slug(phase):
+    """
+    File-name friendly form of a phase name, e.g. "tallying-mixing".
+    """
+    return re.sub(r"[^a-z0-9]+", "-", phase.lower()).strip("-")
+
+
+class _PhaseStacks:
+    """
+    Phase stack of each thread, so phases run concurrently on several
+    threads (e.g. TellerProcess targets) are attributed to the thread
+    that runs them. The thread that started the collector is always
+    tracked; other threads only while they are inside a phase.
+    """
+
+    def __init__(self):
+        self.stacks = {}  # thread ident -> phases, outermost first
+
+    def start_stacks(self):
+        self.main = threading.get_ident()
+        self.stacks[self.main] = [MAIN]
+
+    def push(self, phase):
+        """
+        Enter `phase` on the current thread; returns the phase it was in.
+        """
+        stack = self.stacks.setdefault(threading.get_ident(), [MAIN])
+        top = stack[-1]
+        stack.append(phase)
+        return top
+
+    def pop(self):
+        """
+        Leave the current thread's phase; returns it and the phase now active.
+        """
+        ident = threading.get_ident()
+        stack = self.stacks[ident]
+        phase = stack.pop()
+        if len(stack) == 1 and ident != self.main:
+            del self.stacks[ident]
+        return phase, stack[-1]
+
+    def active(self):
+        """
+        The innermost phase of every tracked thread.
+        """
+        return {stack[-1] for stack in list(self.stacks.values())}
+
+
+class _CProfiler(_PhaseStacks):
+    """
+    One cProfile.Profile per phase and thread, merged per phase when
+    dumped. Only the innermost phase of a thread is enabled, so nested
+    phase calls are attributed to the inner phase. Threads other than
+    the main one are profiled only inside phases.
+    """
+
+    suffix = "pstats"
+
+    def __init__(self):
+        super().__init__()
+        self.profiles = {}  # (thread ident, phase) -> Profile
+
+    def _enable(self, phase):
+        profile = self.profiles.setdefault((threading.get_ident(), phase), cProfile.Profile())
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process; calls
+            # of this thread then land in the one already enabled.
+            pass
+
+    def _disable(self, phase):
+        profile = self.profiles.get((threading.get_ident(), phase))
+        if profile is not None:
+            profile.disable()
+
+    def start(self):
+        self.start_stacks()
+        self._enable(MAIN)
+
+    def stop(self):
+        stack = self.stacks.get(threading.get_ident())
+        if stack is not None:
+            self._disable(stack[-1])
+
+    def enter(self, phase):
+        top = self.push(phase)
+        if phase != top:
+            self._disable(top)
+            self._enable(phase)
+
+    def exit(self):
+        phase, top = self.pop()
+        if phase != top:
+            self._disable(phase)
+            if threading.get_ident() in self.stacks:
+                self._enable(top)
+
+    def dump(self):
+        # Stats disables the profiles it reads, so re-enable the active
+        # one of this thread afterwards.
+        by_phase = collections.defaultdict(list)
+        for (_, phase), profile in list(self.profiles.items()):
+            by_phase[phase].append(profile)
+        for phase, profiles in by_phase.items():
+            stats = pstats.Stats()
+            for profile in profiles:
+                profile.create_stats()
+                if profile.stats:
+                    stats.add(profile)
+            stats.dump_stats(_profile_path(phase, self.suffix))
+        stack = self.stacks.get(threading.get_ident())
+        if stack is not None:
+            self._enable(stack[-1])
+
+
+class _Sampler(_PhaseStacks):
+    """
+    Samples the stack of every thread inside a phase, and of the main
+    thread, every SAMPLE_INTERVAL seconds and counts collapsed stacks
+    per phase.
+    """
+
+    suffix = "collapsed"
+
+    def __init__(self):
+        super().__init__()
+        self.counts = collections.Counter()
+        self.lock = threading.Lock()
+        self.running = False
+
+    def start(self):
+        self.start_stacks()
+        self.running = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self.running = False
+
+    def enter(self, phase):
+        self.push(phase)
+
+    def exit(self):
+        self.pop()
+
+    def _run(self):
+        while self.running:
+            frames = sys._current_frames()
+            for ident, stack in list(self.stacks.items()):
+                frame = frames.get(ident)
+                if frame is not None:
+                    key = (stack[-1], _collapse(frame))
+                    with self.lock:
+                        self.counts[key] += 1
+            time.sleep(SAMPLE_INTERVAL)
+
+    def dump(self):
+        with self.lock:
+            counts = dict(self.counts)
+        by_phase = collections.defaultdict(list)
+        for (phase, stack), count in counts.items():
+            by_phase[phase].append(f"{stack} {count}\n")
+        for phase, lines in by_phase.items():
+            with open(_profile_path(phase, self.suffix), "w") as f:
+                f.writelines(lines)
+
+
+class _MemoryRecorder(_PhaseStacks):
+    """
+    Peak RSS (and optionally tracemalloc peak and top allocators) per phase.
+
+    RSS peaks are sampled whenever a thread's active phase changes: the
+    current RSS, and ru_maxrss if the process high-water mark rose since
+    the last change. Memory is shared by the process, so a peak counts
+    toward every phase active on any thread since the last change. With
+    tracemalloc, a watcher thread snapshots the top allocators each time
+    the traced memory of the active phases grows by 10%, so short-lived
+    peaks inside a phase are seen too.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.phases = {}
+        self.lock = threading.Lock()
+        self.running = False
+
+    def start(self):
+        self.start_stacks()
+        self.maxrss = _maxrss()
+        if TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if tracemalloc.is_tracing():
+            # Forked workers inherit the parent's heap; report only what
+            # this process allocates on top of it.
+            tracemalloc.reset_peak()
+            self.traced_base = tracemalloc.get_traced_memory()[0]
+            self.baseline = tracemalloc.take_snapshot()
+            self.running = True
+            threading.Thread(target=self._watch, daemon=True).start()
+
+    def stop(self):
+        self.running = False
+
+    def enter(self, phase):
+        top = self.push(phase)
+        if phase != top:
+            self._record(self.active() | {top})
+
+    def exit(self):
+        phase, top = self.pop()
+        if phase != top:
+            self._record(self.active() | {phase})
+
+    def _stats(self, phase):
+        return self.phases.setdefault(phase, {"peak_rss": 0})
+
+    def _record(self, phases):
+        with self.lock:
+            maxrss = _maxrss()
+            peak = max(_current_rss(), maxrss if maxrss > self.maxrss else 0)
+            self.maxrss = maxrss
+            traced_peak = None
+            if tracemalloc.is_tracing():
+                traced_peak = tracemalloc.get_traced_memory()[1] - self.traced_base
+                tracemalloc.reset_peak()
+            for phase in phases:
+                stats = self._stats(phase)
+                stats["peak_rss"] = max(stats["peak_rss"], peak)
+                if traced_peak is not None:
+                    stats["traced_peak"] = max(stats.get("traced_peak", 0), traced_peak)
+
+    def _watch(self):
+        while self.running:
+            current = tracemalloc.get_traced_memory()[0] - self.traced_base
+            top = None
+            with self.lock:
+                for phase in self.active():
+                    stats = self._stats(phase)
+                    # Snapshots are expensive, so only take a new one when
+                    # the phase's memory grew noticeably.
+                    if current > stats.get("top_at", 0) * 1.1:
+                        top = top or self._top_allocators()
+                        stats["top"] = top
+                        stats["top_at"] = current
+            time.sleep(WATCH_INTERVAL)
+
+    def _top_allocators(self):
+        diff = tracemalloc.take_snapshot().compare_to(self.baseline, "lineno")
+        return [
+            {
+                "where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size": stat.size_diff,
+                "count": stat.count_diff,
+            }
+            for stat in diff[:TOP_ALLOCATORS]
+            if stat.size_diff > 0
+        ]
+
+    def dump(self):
+        self._record(self.active())
+        with self.lock:
+            phases = json.dumps({"pid": os.getpid(), "phases": self.phases})
+        with open(os.path.join(MEMORY_DIR, f"memory-{os.getpid()}.json"), "w") as f:
+            f.write(phases)
+
+
+def _maxrss():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _current_rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+
+def _collapse(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _profile_path(phase, suffix):
+    return os.path.join(PROFILE_DIR, f"{phase_slug(phase)}.{os.getpid()}.{suffix}")
+
+
+def _start_collectors():
+    _collectors.clear()
+    if PROFILE_DIR is not None:
+        _collectors.append(_Sampler() if PROFILE_MODE == "sampling" else _CProfiler())
+    if MEMORY_DIR is not None:
+        _collectors.append(_MemoryRecorder())
+    for collector in _collectors:
+        collector.start()
+
+
+def _reset_after_fork():
+    # Forked workers must not re-emit the parent's buffered spans or keep
+    # adding to the parent's profiles and memory records.
+    global _lock
+    _lock = threading.Lock()
+    _events.clear()
+    for collector in _collectors:
+        collector.stop()
+    _start_collectors()
+
+
+def _now_us():
+    # CLOCK_MONOTONIC is shared by all processes, so server and worker
+    # spans line up on one timeline.
+    return time.monotonic_ns() // 1000
+
+
+@contextmanager
+def span(name, phase=None, **args):
+    """
+    Record a complete ("X") event around the body of the block.
+    """
+    if TRACE_DIR is None:
+        yield
+        return
+    start = _now_us()
+    try:
+        yield
+    finally:
+        if phase is not None:
+            args["phase"] = phase
+        event = {
+            "name": name,
+            "cat": phase or "hyperion",
+            "ph": "X",
+            "ts": start,
+            "dur": _now_us() - start,
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+            "args": args,
+        }
+        with _lock:
+            _events.append(event)
+
+
+def announce(phase):
+    """
+    Report the first entry of this process into `phase` on stderr.
+    """
+    if not PHASE_EVENTS or phase is None or phase in _announced:
+        return
+    _announced.add(phase)
+    sys.stderr.write(EVENT_PREFIX + json.dumps({"phase": phase, "pid": os.getpid()}) + "\n")
+    sys.stderr.flush()
+
+
+@contextmanager
+def in_phase(phase):
+    """
+    Attribute profile samples and memory use in the block to `phase`.
+    """
+    if not _collectors or phase is None:
+        yield
+        return
+    for collector in _collectors:
+        collector.enter(phase)
+    try:
+        yield
+    finally:
+        for collector in _collectors:
+            collector.exit()
+
+
+def flush():
+    """
+    Append buffered events to this process' trace file and write its
+    profiles and memory records.
+    """
+    for collector in _collectors:
+        collector.dump()
+    if TRACE_DIR is None:
+        return
+    with _lock:
+        events = list(_events)
+        _events.clear()
+    if not events:
+        return
+    path = os.path.join(TRACE_DIR, f"trace-{os.getpid()}.jsonl")
+    with open(path, "a") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+def traced(phase=None, name=None, worker=False):
+    """
+    Decorator wrapping a function call in a span and a protocol phase.
+
+    Set worker=True for functions used as multiprocessing targets: those
+    processes exit without running atexit hooks, so everything is flushed
+    as soon as the call returns.
+    """
+
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            announce(phase)
+            try:
+                with span(label, phase=phase), in_phase(phase):
+                    return func(*args, **kwargs)
+            finally:
+                if worker:
+                    flush()
+
+        return wrapper
+
+    return decorate
+
+
+if TRACE_DIR is not None:
+    os.makedirs(TRACE_DIR, exist_ok=True)
+if PROFILE_DIR is not None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+if MEMORY_DIR is not None:
+    os.makedirs(MEMORY_DIR, exist_ok=True)
+_start_collectors()
+if TRACE_DIR is not None or _collectors:
+    os.register_at_fork(after_in_child=_reset_after_fork)
+    atexit.register(flush)
@@ -1,25 +1,62 @@
 import multiprocessing
-import hashlib
+import os
 import random
 
 import threshold_crypto as tc
-import gmpy2
 from util import (
     deserialize_ep,
     _ecc_key_to_serializable,
     serialize_pd,
     deserialize_pd,
 )
-from Crypto.PublicKey import ECC
 
 
-from primitives import DSA, ElGamalEncryption, NIZK, ChaumPedersenProof
-from exceptions import (
-    InvalidSignatureException,
-    InvalidProofException,
-    InvalidWFNProofException,
-)
+from primitives import DSA, ElGamalEncryption, NIZK
+from exceptions import InvalidProofException
 from subroutines import Mixnet
+import instrument
+import validation
+import proofs
+from instrument import traced
+from checkpoint import checkpointed
+import pool
+import pointcodec
+import threshold
+from transcript import PackedPoints
+from arena import PointArena
+import ecops
+
+
+def threshold_parameters():
+    """
+    The threshold key's parameters for this run; see threshold.from_env.
+    """
+    return tc.ThresholdParameters(*threshold.from_env())
+
+
+def _voter(voter):
+    return voter.id
+
+
+def _share(teller):
+    return teller.secret_key_share.x
+
+
+def _teller_key(teller_public_key):
+    return teller_public_key.Q
+
+
+def _ballot_ids(list_in):
+    return [(index, ballot["id"], ballot["sig"]) for index, ballot in list_in]
+
+
+def _decryption_chunk(indices, alphas_1, alphas_2):
+    return list(indices), alphas_1, alphas_2
+
+
+def _mix_input(list_0):
+    # The ciphertexts' points, by value; see checkpoint.input_key
+    return list_0
 
 
 class Voter:
@@ -29,52 +66,72 @@ class Voter:
         self.vote_max = vote_max
         self.curve = curve
 
+    # Checkpointed so a resumed run encrypts and proves the same vote
+    @checkpointed(instrument.VOTING, party=_voter, state=True)
     def choose_vote_value(self):
         self.vote = random.randrange(self.vote_min, self.vote_max)
 
+    @traced(instrument.SETUP)
+    @checkpointed(instrument.SETUP, party=_voter, state=True)
     def generate_dsa_keys(self):
         dsa = DSA(self.curve)
         self.secret_key, self.public_key = dsa.keygen()
 
+    @traced(instrument.SETUP)
+    @checkpointed(instrument.SETUP, party=_voter, state=True)
     def generate_trapdoor_keypair(self):
         self.ege = ElGamalEncryption(self.curve)
         self.secret_trapdoor_key, self.public_trapdoor_key = self.ege.keygen()
 
+    @traced(instrument.SETUP)
+    @checkpointed(instrument.SETUP, party=_voter, state=True)
     def generate_pok_trapdoor_keypair(self):
-        nizk = NIZK(self.curve)
-        self.pok_trapdoor_key = nizk.prove(
-            self.secret_trapdoor_key, self.public_trapdoor_key, self.id
+        self.pok_trapdoor_key = proofs.prove_knowledge(
+            self.curve.get_pars().P,
+            self.curve.get_pars().order,
+            self.secret_trapdoor_key,
+            self.public_trapdoor_key,
+            self.id,
         )
 
+    @traced(instrument.VOTING)
+    @checkpointed(instrument.VOTING, party=_voter, inputs=_teller_key, state=True)
     def encrypt_vote(self, teller_public_key):
+        self.teller_public_key = teller_public_key
         self.g_vote = self.curve.raise_p(int(self.vote))
-        self.encrypted_vote = self.ege.encrypt(
-            teller_public_key.Q, self.g_vote
+        # Same ciphertext as self.ege.encrypt, with a table for the teller key
+        self.encrypted_vote = ecops.elgamal_encrypt(
+            self.curve, teller_public_key.Q, self.g_vote
         )
 
+    @traced(instrument.VOTING)
+    @checkpointed(instrument.VOTING, party=_voter, inputs=_teller_key, state=True)
     def generate_wellformedness_proof(self, teller_public_key):
-        encrypted_vote = {
-            "c1": self.encrypted_vote[0],
-            "c2": self.encrypted_vote[1],
-        }
-        r = self.encrypted_vote[2]
-        chmp = ChaumPedersenProof(self.curve)
-        self.wellformedness_proof = chmp.prove_or_n(
-            encrypted_vote,
-            r,
+        c1, c2, r = self.encrypted_vote[:3]
+        self.wellformedness_proof = proofs.prove_wellformedness(
+            self.curve.get_pars().P,
+            self.curve.get_pars().order,
             teller_public_key.Q,
+            c1,
+            c2,
+            r,
             self.vote_max,
             int(self.vote),
             self.id,
         )
 
+    @traced(instrument.VOTING)
+    @checkpointed(instrument.VOTING, party=_voter, state=True)
     def sign_ballot(self):
         self.dsa = DSA(self.curve)
-        hash = self.curve.hash_to_mpz(
-            str(self.encrypted_vote)
-            + str(self.public_trapdoor_key)
-            + str(self.pok_trapdoor_key)
-            + str(self.wellformedness_proof)
+        hash = validation.signed_hash(
+            self.curve,
+            {
+                "ev": self.encrypted_vote,
+                "ptk": self.public_trapdoor_key,
+                "pi_1": self.pok_trapdoor_key,
+                "pi_2": self.wellformedness_proof,
+            },
         )
         self.signature = self.dsa.sign(self.secret_key, hash)
         bb_data = {
@@ -88,11 +145,15 @@ class Voter:
             "pi_1": self.pok_trapdoor_key,
             "pi_2": self.wellformedness_proof,
         }
+        # Verified in batches at the tally, or with HYPERION_PREVALIDATE=1
+        # while the other voters are still voting
+        validation.submit(self.curve, self.teller_public_key, bb_data)
         return bb_data
 
     def notify(self, encrypted_term):
         self.g_ri = encrypted_term
 
+    @traced(instrument.VERIFICATION)
     def generate_verification_comm(self):
         g_ri_x = self.g_ri * self.secret_trapdoor_key
         return g_ri_x
@@ -104,8 +165,22 @@ class Teller:
         self.secret_key_share = secret_key_share
         self.public_key = public_key
         self.ege = ElGamalEncryption(self.curve)
-        self.core_count = multiprocessing.cpu_count()
-
+        # The server's scheduler sets HYPERION_CORES to this run's allotment
+        self.core_count = int(os.environ.get("HYPERION_CORES", "0")) or multiprocessing.cpu_count()
+        # The run's tellers share one pool, started on first use by
+        # run_chunk and kept for the whole run. Only the process that
+        # created the Teller uses it; processes main.py forks for the
+        # mp_* targets work on their own.
+        self.pool_key = pool.register(self)
+        self.owner = os.getpid()
+        self.threshold = threshold_parameters()
+        # Share indices of the decrypting tellers -> Lagrange coefficients
+        self.lagrange = {}
+        # Ballots recorded at cast time are verified on this pool
+        validation.set_runner(self.validate_groups)
+
+    @traced(instrument.SETUP)
+    @checkpointed(instrument.SETUP, inputs=lambda k, num_tellers, params: (k, num_tellers))
     def generate_threshold_keys(k, num_tellers, tc_key_params):
         thresh_params = tc.ThresholdParameters(k, num_tellers)
         pub_key, key_shares = tc.create_public_key_and_shares_centralized(
@@ -114,6 +189,21 @@ class Teller:
         return pub_key, key_shares
 
     def mp_raise_h(self, list_in, q1, q2, q3):
+        # Process target of main.py; see run_chunk
+        teller_proofs, teller_registry, list_out = self.run_chunk("raise_h_chunk", list_in)
+        q1.put(teller_proofs)
+        q2.put(teller_registry)
+        q3.put(list_out)
+
+    @traced(instrument.MIXING, worker=True)
+    @checkpointed(instrument.MIXING, party=_share, inputs=_ballot_ids)
+    def raise_h_chunk(self, list_in):
+        """
+        Raise h for a chunk of [index, ballot] items.
+
+        Returns the teller's proofs, its registry entries and the items
+        with serialized ballots.
+        """
         teller_proofs = []
         teller_registry = []
         list_out = []
@@ -171,9 +261,7 @@ class Teller:
             temp.append(ballot)
             list_out.append(temp)
 
-        q1.put(teller_proofs)
-        q2.put(teller_registry)
-        q3.put(list_out)
+        return teller_proofs, teller_registry, list_out
 
     def ciphertext_list_split(self, list_0, n):
         k, m = divmod(len(list_0), n)
@@ -195,6 +283,7 @@ class Teller:
             index = index + 1
         return list_1
 
+    @traced(instrument.DECRYPTION)
     def verify_decryption_proof(
         self,
         tau,
@@ -204,127 +293,75 @@ class Teller:
         public_key_share,
         ciphertexts,
         partial_decryptions,
+        indices=None,
+        col=1,
     ):
-        prod_alpha = ECC.EccPoint(0, 0, "P-256")
-        prod_partial_decryptions = ECC.EccPoint(0, 0, "P-256")
-        alpha_terms = []
-        for ciphertext in ciphertexts:
-            index = ciphertext[0]
-            alpha_terms.append(ciphertext[1][0])
-            t = (
-                gmpy2.mpz(
-                    "0x"
-                    + hashlib.sha256(
-                        str(
-                            str(tau) + str(ciphertext[1][0]) + str(index)
-                        ).encode("UTF-8")
-                    ).hexdigest()
-                )
-                % self.curve.get_pars().order
-            )
-
-            s_2 = ciphertexts[1][0] * t
-            prod_alpha = prod_alpha + s_2
-        for partial_decryption in partial_decryptions:
-            prod_partial_decryptions = (
-                prod_partial_decryptions + partial_decryption.v_y
-            )
-        u = (
-            gmpy2.mpz(
-                "0x"
-                + hashlib.sha256(
-                    str(
-                        str(p_1)
-                        + str(p_1)
-                        + str(self.curve.get_pars().P)
-                        + str(public_key_share)
-                        + str(alpha_terms)
-                        + str(partial_decryptions)
-                    ).encode("UTF-8")
-                ).hexdigest()
-            )
-            % self.curve.get_pars().order
+        """
+        1 if the proof of partial_decrypt_chunk holds for column `col`
+        of a chunk, else 0. `partial_decryptions` is the chunk's output
+        as the prover hashed it: [index, serialized partial decryption]
+        per ciphertext.
+
+        The weights t_i are derived from the whole chunk, so the proof
+        only holds for the chunk the prover decrypted, in its order. The
+        chunk is looked up in `ciphertexts`, the whole board or the chunk
+        itself, by the indices of the partial decryptions; `indices`, the
+        proof's "indices", must name the same chunk (see
+        proofs.decryption_chunk).
+        """
+        ciphertexts = proofs.decryption_chunk(
+            self.index_ciphertexts(ciphertexts), partial_decryptions, indices
+        )
+        if ciphertexts is None:
+            return 0
+        alpha_terms = [ciphertext[col][0] for ciphertext in ciphertexts]
+        proof = {
+            "p_1": deserialize_ep(p_1) if isinstance(p_1, dict) else p_1,
+            "p_2": deserialize_ep(p_2) if isinstance(p_2, dict) else p_2,
+            "w": w,
+            "tau": tau,
+        }
+        equations = proofs.decryption_equations(
+            self.curve.get_pars().P,
+            self.curve.get_pars().order,
+            public_key_share,
+            proof,
+            [deserialize_ep(alpha) for alpha in alpha_terms],
+            [deserialize_pd(item[1]).yC1 for item in partial_decryptions],
+            [alpha_terms, partial_decryptions],
         )
-        v_1 = self.curve.raise_p(w) + (public_key_share * u)
-        v_2 = prod_alpha * w
-        v_2 = v_2 + (prod_partial_decryptions * u)
-        if (p_1 == v_1) and (p_2 == v_2):
-            return 1
-        return 0
+        return int(proofs.holds(equations))
 
     def mp_partial_decrypt(self, ciphertexts_in, q1, q2, q3):
-        tau_1 = self.curve.get_random()
-        tau_2 = self.curve.get_random()
-        r_1 = self.curve.get_random()
-        r_2 = self.curve.get_random()
-        p_1_1 = self.curve.raise_p(r_1)
-        p_2_1 = self.curve.raise_p(r_2)
-        comm_tau_1 = hashlib.sha256(str(tau_1).encode("UTF-8")).hexdigest()
-        comm_tau_2 = hashlib.sha256(str(tau_2).encode("UTF-8")).hexdigest()
+        # Process target of main.py; see run_chunk. Only the indices and
+        # the packed alphas of the chunk go to the worker.
+        output, output2, proof = self.run_chunk(
+            "partial_decrypt_chunk",
+            [ciphertext[0] for ciphertext in ciphertexts_in],
+            pointcodec.pack_serialized(ciphertext[1][0] for ciphertext in ciphertexts_in),
+            pointcodec.pack_serialized(ciphertext[2][0] for ciphertext in ciphertexts_in),
+        )
+        q1.put(output)
+        q2.put(output2)
+        q3.put(proof)
+
+    @traced(instrument.DECRYPTION, worker=True)
+    @checkpointed(instrument.DECRYPTION, party=_share, inputs=_decryption_chunk)
+    def partial_decrypt_chunk(self, indices, alphas_1, alphas_2):
+        """
+        Partial decryptions of both columns of a chunk of tagged
+        ciphertexts, and the chunk's proof of correct decryption. The
+        chunk is given as its indices and the alphas of each column,
+        packed by pointcodec.pack_serialized.
+        """
         output = []
         output2 = []
-        proof = []
-        prod_alpha_1 = ECC.EccPoint(0, 0, "P-256")
-        prod_alpha_2 = ECC.EccPoint(0, 0, "P-256")
-        alpha_terms_1 = []
-        alpha_terms_2 = []
-        flag = 0
-        for ciphertext in ciphertexts_in:
-            index = ciphertext[0]
-            alpha_1 = ciphertext[1][0]
-            alpha_2 = ciphertext[2][0]
-            t_1 = (
-                gmpy2.mpz(
-                    "0x"
-                    + hashlib.sha256(
-                        str(str(tau_1) + str(alpha_1) + str(index)).encode(
-                            "UTF-8"
-                        )
-                    ).hexdigest()
-                )
-                % self.curve.get_pars().order
-            )
-            t_2 = (
-                gmpy2.mpz(
-                    "0x"
-                    + hashlib.sha256(
-                        str(str(tau_2) + str(alpha_2) + str(index)).encode(
-                            "UTF-8"
-                        )
-                    ).hexdigest()
-                )
-                % self.curve.get_pars().order
-            )
-
-            pd_1 = self.ege.partial_decrypt(
-                ECC.EccPoint(
-                    ciphertext[1][0]["x"],
-                    ciphertext[1][0]["y"],
-                    ciphertext[1][0]["curve"],
-                ),
-                self.secret_key_share,
-            )
-            pd_2 = self.ege.partial_decrypt(
-                ECC.EccPoint(
-                    ciphertext[2][0]["x"],
-                    ciphertext[2][0]["y"],
-                    ciphertext[2][0]["curve"],
-                ),
-                self.secret_key_share,
-            )
-            if flag == 0:
-                flag = 1
-                prod_alpha_1 = deserialize_ep(alpha_1) * t_1
-
-                prod_alpha_2 = deserialize_ep(alpha_2) * t_2
-
-            else:
-                prod_alpha_1 = prod_alpha_1 + (deserialize_ep(alpha_1) * t_1)
-
-                prod_alpha_2 = prod_alpha_2 + (deserialize_ep(alpha_2) * t_2)
-
-            alpha_terms_1.append(alpha_1)
-            alpha_terms_2.append(alpha_2)
+        # Each point is built once for the decryption and the proof
+        points_1 = pointcodec.unpack_points(alphas_1)
+        points_2 = pointcodec.unpack_points(alphas_2)
+        for index, point_1, point_2 in zip(indices, points_1, points_2):
+            pd_1 = self.ege.partial_decrypt(point_1, self.secret_key_share)
+            pd_2 = self.ege.partial_decrypt(point_2, self.secret_key_share)
             temp = []
 
             temp.append(index)
@@ -335,150 +372,227 @@ class Teller:
             temp2.append(index)
             temp2.append(serialize_pd(pd_2))
             output2.append(temp2)
-        q1.put(output)
-        q2.put(output2)
 
-        p_1_2 = prod_alpha_1 * r_1
-        p_2_2 = prod_alpha_2 * r_2
-        u_1 = (
-            gmpy2.mpz(
-                "0x"
-                + hashlib.sha256(
-                    str(
-                        str(p_1_1)
-                        + str(p_1_2)
-                        + str(self.curve.get_pars().P.x)
-                        + str(self.curve.get_pars().P.y)
-                        + str(self.curve.raise_p(self.secret_key_share.y))
-                        + str(alpha_terms_1)
-                        + str(output)
-                    ).encode("UTF-8")
-                ).hexdigest()
-            )
-            % self.curve.get_pars().order
+        public_key_share = self.curve.raise_p(self.secret_key_share.y)
+        # Transcripts absorb the packed alphas like the serialized ones
+        # verify_decryption_proof hashes
+        proof_1 = proofs.prove_decryption(
+            self.curve.get_pars().P,
+            self.curve.get_pars().order,
+            self.secret_key_share.y,
+            public_key_share,
+            points_1,
+            [PackedPoints(alphas_1), output],
         )
-
-        u_2 = (
-            gmpy2.mpz(
-                "0x"
-                + hashlib.sha256(
-                    str(
-                        str(p_2_1)
-                        + str(p_2_2)
-                        + str(self.curve.get_pars().P.x)
-                        + str(self.curve.get_pars().P.y)
-                        + str(self.curve.raise_p(self.secret_key_share.y))
-                        + str(alpha_terms_2)
-                        + str(output2)
-                    ).encode("UTF-8")
-                ).hexdigest()
-            )
-            % self.curve.get_pars().order
+        proof_2 = proofs.prove_decryption(
+            self.curve.get_pars().P,
+            self.curve.get_pars().order,
+            self.secret_key_share.y,
+            public_key_share,
+            points_2,
+            [PackedPoints(alphas_2), output2],
         )
+        proof = {
+            "p_1_1": tc.data._ecc_point_to_serializable(proof_1["p_1"]),
+            "p_1_2": tc.data._ecc_point_to_serializable(proof_1["p_2"]),
+            "p_2_1": tc.data._ecc_point_to_serializable(proof_2["p_1"]),
+            "p_2_2": tc.data._ecc_point_to_serializable(proof_2["p_2"]),
+            "w_1": proof_1["w"],
+            "w_2": proof_2["w"],
+            "tau_1": proof_1["tau"],
+            "tau_2": proof_2["tau"],
+            # The chunk the weights bind; see verify_decryption_proof
+            "indices": list(indices),
+        }
+        return output, output2, proof
 
-        w_1 = r_1 - (u_1 * self.secret_key_share.y)
-        w_2 = r_2 - (u_2 * self.secret_key_share.y)
-        q3.put(
-            {
-                "p_1_1": tc.data._ecc_point_to_serializable(p_1_1),
-                "p_1_2": tc.data._ecc_point_to_serializable(p_1_2),
-                "p_2_1": tc.data._ecc_point_to_serializable(p_2_1),
-                "p_2_2": tc.data._ecc_point_to_serializable(p_2_2),
-                "w_1": w_1,
-                "w_2": w_2,
-                "tau_1": tau_1,
-                "tau_2": tau_2,
-            }
+    def index_ciphertexts(self, ciphertexts):
+        """
+        Tagged ciphertexts (see tag_ciphertexts) keyed by their index.
+        """
+        return {item[0]: item for item in ciphertexts}
+
+    def mp_full_decrypt(self, pd1_in, ciphertexts, col, q1):
+        # Process target of main.py; see full_decrypt
+        q1.put(self.full_decrypt(pd1_in, ciphertexts, col))
+
+    def lagrange_coefficients(self, indices):
+        """
+        Lagrange coefficients at 0 for the given share indices. The same
+        tellers decrypt the whole board, so they are computed once.
+        """
+        indices = tuple(indices)
+        coefficients = self.lagrange.get(indices)
+        if coefficients is None:
+            coefficients = threshold.lagrange_coefficients(indices, self.curve.get_pars().order)
+            self.lagrange[indices] = coefficients
+        return coefficients
+
+    def partial_decryptions(self, pds):
+        """
+        `pds` as threshold_crypto PartialDecryptions; main.py passes them
+        as serialize_pd made them.
+        """
+        return [pd if hasattr(pd, "yC1") else deserialize_pd(pd) for pd in pds]
+
+    def combinable(self, pds):
+        """
+        Whether combine_shares can decrypt with `pds`: at least k
+        threshold_crypto PartialDecryptions (x, yC1) of distinct shares.
+        """
+        indices = [getattr(pd, "x", None) for pd in pds]
+        return (
+            len(pds) >= self.threshold.k
+            and None not in indices
+            and all(hasattr(pd, "yC1") for pd in pds)
+            and len(set(indices)) == len(indices)
         )
 
-    def multi_dim_index(self, list, key):
-        for item in list:
-            if item[0] == key:
-                return item
-        return None
+    def combine_shares(self, indices, shares, c2):
+        """
+        c2 - sum(lambda_i * y_i c1) for the partial decryptions y_i c1 of
+        the shares with the given indices, as one multi-scalar
+        multiplication with the cached coefficients.
+        """
+        # Negated weights, so the sum is added to c2 in place
+        plaintext = ecops.msm(shares, [-l for l in self.lagrange_coefficients(indices)])
+        plaintext += c2
+        return plaintext
 
-    def mp_full_decrypt(self, pd1_in, ciphertexts, col, q1):
-        result = []
-        for item in pd1_in:
-            index = item[0]
-            ct = self.multi_dim_index(ciphertexts, index)
-            ciphertext = tc.EncryptedMessage(
-                deserialize_ep(ct[col][0]), deserialize_ep(ct[col][1]), ""
+    def combine_partial_decryptions(self, pds, c1, c2):
+        """
+        The plaintext of a ciphertext from its partial decryptions, through
+        combine_shares when they are combinable and ege.threshold_decrypt
+        otherwise.
+        """
+        pds = self.partial_decryptions(pds)
+        if not self.combinable(pds):
+            return self.ege.threshold_decrypt(
+                pds, tc.EncryptedMessage(c1, c2, ""), self.threshold
             )
+        return self.combine_shares([pd.x for pd in pds], [pd.yC1 for pd in pds], c2)
 
-            result.append(
-                [
-                    index,
-                    tc.data._ecc_point_to_serializable(
-                        self.ege.threshold_decrypt(
-                            item[1],
-                            ciphertext,
-                            tc.ThresholdParameters(2, 3),
-                        )
-                    ),
-                ]
-            )
-        q1.put(result)
-
-    def full_decrypt(self, pd_in, q1):
-        global decrypted
-        split_ciphertexts = self.ciphertext_list_split(pd_in, self.core_count)
-        processes = [
-            multiprocessing.Process(
-                target=self.mp_full_decrypt, args=(ciph, q1)
-            )
-            for ciph in split_ciphertexts
-        ]
-        for p in processes:
-            p.daemon = True
-            p.start()
-        data = []
-        for p in processes:
-            data = data + q1.get()
-
-        for p in processes:
-            p.join()
-            # p.close()
-        decrypted = data
+    @traced(instrument.DECRYPTION)
+    def full_decrypt(self, pd_in, ciphertexts, col):
+        """
+        Decrypt column `col` of the tagged ciphertexts from the combined
+        partial decryptions, on the worker pool; results keep pd_in's order.
+        """
+        # Slot i of the arena holds c2 and the yC1 of each partial
+        # decryption of pd_in[i]; only the share indices are pickled.
+        # Items that are not combinable are decrypted here.
+        ciphertexts = self.index_ciphertexts(ciphertexts)
+        width = 1 + max((len(item[1]) for item in pd_in), default=0)
+        decrypted = [None] * len(pd_in)
+        shares = []  # (slot, share indices)
+        with PointArena(len(pd_in), width) as inputs, PointArena(len(pd_in)) as outputs:
+            for i, item in enumerate(pd_in):
+                index, pds = item[0], self.partial_decryptions(item[1])
+                c1, c2 = ciphertexts[index][col][:2]
+                if not self.combinable(pds):
+                    plaintext = self.combine_partial_decryptions(
+                        pds, deserialize_ep(c1), deserialize_ep(c2)
+                    )
+                    decrypted[i] = [index, tc.data._ecc_point_to_serializable(plaintext)]
+                    continue
+                coords = [(c2["x"], c2["y"])] + [(pd.yC1.x, pd.yC1.y) for pd in pds]
+                coords += [(0, 0)] * (width - len(coords))
+                inputs.write_xy(i, coords)
+                shares.append((i, [pd.x for pd in pds]))
+            self.map_chunks("decrypt_arena_chunk", shares, inputs, outputs)
+            for i, _ in shares:
+                (x, y), = outputs.read_xy(i)
+                decrypted[i] = [pd_in[i][0], {"x": x, "y": y, "curve": pointcodec.CURVE}]
+        return decrypted
+
+    @traced(instrument.DECRYPTION, worker=True)
+    def decrypt_arena_chunk(self, shares, inputs, outputs):
+        """
+        Decrypt the `inputs` slots listed in `shares` ((slot, share
+        indices) pairs) and write the plaintexts to the same `outputs`
+        slots.
+        """
+        try:
+            for slot, indices in shares:
+                c2, *points = inputs.read(slot, 1 + len(indices))
+                outputs.write(slot, [self.combine_shares(indices, points, c2)])
+        finally:
+            # A worker closes the views it opened; full_decrypt unlinks
+            for arena in (inputs, outputs):
+                if not arena.owner:
+                    arena.close()
+        return len(shares)
+
+    def worker_pool(self):
+        # TellerProcess.start calls this before the target threads start
+        return pool.shared_pool(self.core_count, self._before_fork)
+
+    def _before_fork(self):
+        # No validation threads may be running when the workers fork
+        validation.drain()
+        # Build the key's table before forking, so workers share it
+        ecops.precompute(self.public_key.Q)
+
+    def on_pool(self):
+        """
+        Whether work goes to the worker pool: only in the process that
+        created this Teller. A process main.py forked for an mp_* target
+        is a worker already.
+        """
+        return os.getpid() == self.owner
 
+    def run_chunk(self, method, *args):
+        """
+        self.<method>(*args), on a pool worker when on_pool().
+        """
+        if not self.on_pool():
+            return getattr(self, method)(*args)
+        return self.worker_pool().map(self.pool_key, method, [args])[0]
+
+    def map_chunks(self, method, items, *args):
+        """
+        Results of self.<method>(chunk, *args) in chunk order, for
+        `items` split into one chunk per pool worker when on_pool() and
+        as one chunk otherwise.
+        """
+        if not self.on_pool():
+            return [getattr(self, method)(items, *args)]
+        return self.worker_pool().map_chunks(self.pool_key, method, items, *args)
+
+    @traced(instrument.MIXING)
     def validate_ballot(curve, teller_public_key, ballot):
-        dsa = DSA(curve)
-        hash = curve.hash_to_mpz(
-            str(ballot["ev"])
-            + str(ballot["ptk"])
-            + str(ballot["pi_1"])
-            + str(ballot["pi_2"])
+        # Tallying starts here; finish the cast-time checks first
+        validation.drain()
+        error = validation.result(ballot)
+        if error is validation.UNKNOWN:
+            error = validation.check_ballot(curve, teller_public_key, ballot)
+        if error is not None:
+            print(error)
+        return error is None
+
+    def validate_groups(self, groups):
+        """
+        check_batch for each (curve, teller key, ballots) group, one group
+        per call on the worker pool when on_pool() and the groups are for
+        this Teller's key.
+        """
+        if not self.on_pool() or any(key.Q != self.public_key.Q for _, key, _ in groups):
+            return [validation.check_batch(*group) for group in groups]
+        return self.worker_pool().map(
+            self.pool_key, "validate_chunk", [(ballots,) for _, _, ballots in groups]
         )
-        nizk = NIZK(curve)
-        chmp = ChaumPedersenProof(curve)
-        try:
-            if not dsa.verify(ballot["spk"], ballot["sig"], hash):
-                raise InvalidSignatureException(ballot["id"])
-            if not nizk.verify(ballot["pi_1"], ballot["ptk"], ballot["id"]):
-                raise InvalidProofException(ballot["id"])
-            ciphertext = {"c1": ballot["ev"][0], "c2": ballot["ev"][1]}
-            if not chmp.verify_or_n(
-                ciphertext,
-                teller_public_key.Q,
-                ballot["pi_2"][0],
-                ballot["pi_2"][1],
-                ballot["pi_2"][2],
-                ballot["pi_2"][3],
-                ballot["id"],
-            ):
-                raise InvalidWFNProofException(ballot["id"])
-        except Exception as e:
-            print(e)
+
+    @traced(instrument.MIXING, worker=True)
+    def validate_chunk(self, ballots):
+        return validation.check_batch(self.curve, self.public_key, ballots)
 
     def raise_h(self, teller_public_key, ballot):
         r_i = self.curve.get_random()
         voter_public_key = ballot["ptk"]
 
-        ege = ElGamalEncryption(self.curve)
-
         message = voter_public_key * r_i
 
-        ciphertext = ege.encrypt(teller_public_key.Q, message)
+        ciphertext = ecops.elgamal_encrypt(self.curve, teller_public_key.Q, message)
         nizk = NIZK(self.curve)
         proof = nizk.proof_2(
             ciphertext,
@@ -490,17 +604,21 @@ class Teller:
 
         return ciphertext, proof, r_i
 
+    @traced(instrument.MIXING)
     def verify_proof_h_r(curve, teller_public_key, h_r, ptk, proof, id):
         nizk = NIZK(curve)
         if not nizk.verify_2(h_r, teller_public_key.Q, ptk, proof):
             raise InvalidProofException(id)
             print(e)
 
+    @traced(instrument.MIXING)
+    @checkpointed(instrument.MIXING, party=_share, inputs=_mix_input)
     def re_encryption_mix(self, list_0):
         mx = Mixnet(self.curve)
         proof = mx.re_encryption_mix(list_0, self.public_key.Q)
         return proof
 
+    @traced(instrument.MIXING)
     def verify_re_enc_mix(self, list_0, proof):
         mx = Mixnet(self.curve)
         return mx.verify_mix(
@@ -528,6 +646,7 @@ class Teller:
             proof[19],
         )
 
+    @traced(instrument.NOTIFICATION)
     def notify(curve, registry_entry):
         ege = ElGamalEncryption(curve)
         g_ri = curve.raise_p(registry_entry["r_i"])
@@ -540,6 +659,7 @@ class Teller:
         ciphertext = ege.encrypt(registry_entry["ptk"], g_ri)
         return ciphertext
 
+    @traced(instrument.INDIVIDUAL_VIEWS)
     def individual_board_shuffle(self, list_0):
         key = self.curve.get_random()
         mx = Mixnet(self.curve)
@@ -0,0 +1,81 @@
+"""
+Compact binary encodings of P-256 points.
+
+A point is either 64 raw bytes (x then y, big-endian) or 33 bytes in
+SEC1 compressed form (a 0x02/0x03 prefix for the parity of y, then x).
+Raw decoding needs no arithmetic. Compressed points are half the size
+but need a modular square root to decode, so raw suits inter-process
+traffic and compressed suits storage. A list of points packs into one
+bytes buffer of fixed-size entries. Sending or pickling the buffer is
+then a single copy, instead of one dict with decimal strings and a curve
+name per point. Teller.mp_partial_decrypt sends a chunk's alphas to its
+pool worker this way, and the pool pickles single points in raw form.
+
+The point at infinity, which pycryptodome stores as (0, 0), encodes as
+all zero bytes in both forms.
+"""
+from Crypto.PublicKey import ECC
+
+CURVE = "P-256"
+SIZE = 32  # bytes per coordinate
+RAW_SIZE = 2 * SIZE
+COMPRESSED_SIZE = 1 + SIZE
+
+_P = int(ECC._curves[CURVE].p)
+_B = int(ECC._curves[CURVE].b)
+
+
+def same_curve(point):
+    """
+    Whether `point` is a point of the curve these encodings are for. Its
+    coordinates are not checked; EccPoint checked them when it was built.
+    """
+    return ECC._curves.get(point._curve_name) is ECC._curves[CURVE]
+
+
+def encode_xy(x, y, compressed=False):
+    x, y = int(x), int(y)
+    if compressed:
+        if x == 0 and y == 0:
+            return bytes(COMPRESSED_SIZE)
+        return (b"\x03" if y & 1 else b"\x02") + x.to_bytes(SIZE, "big")
+    return x.to_bytes(SIZE, "big") + y.to_bytes(SIZE, "big")
+
+
+def decode_xy(data, compressed=False):
+    """
+    (x, y) of an encoded point, without building an EccPoint.
+    """
+    if not compressed:
+        return int.from_bytes(data[:SIZE], "big"), int.from_bytes(data[SIZE:RAW_SIZE], "big")
+    x = int.from_bytes(data[1:COMPRESSED_SIZE], "big")
+    if data[0] == 0:
+        return 0, 0
+    # y^2 = x^3 - 3x + b; p = 3 mod 4, so the root is a single power
+    y = pow((x * x * x - 3 * x + _B) % _P, (_P + 1) // 4, _P)
+    if (y & 1) != (data[0] & 1):
+        y = _P - y
+    return x, y
+
+
+def encode_point(point, compressed=False):
+    return encode_xy(point.x, point.y, compressed)
+
+
+def decode_point(data, compressed=False):
+    x, y = decode_xy(data, compressed)
+    return ECC.EccPoint(x, y, CURVE)
+
+
+def pack_serialized(points, compressed=False):
+    """
+    One buffer holding the encodings of `points`, in
+    tc.data._ecc_point_to_serializable form, back to back.
+    """
+    return b"".join(encode_xy(p["x"], p["y"], compressed) for p in points)
+
+
+def unpack_points(buffer, compressed=False):
+    size = COMPRESSED_SIZE if compressed else RAW_SIZE
+    view = memoryview(buffer)
+    return [decode_point(view[i:i + size], compressed) for i in range(0, len(view), size)]
@@ -0,0 +1,184 @@
+"""
+Persistent worker pool for a Teller's parallel phases.
+
+main.py starts one multiprocessing.Process per chunk for raising h,
+partial decryption and full decryption, each inheriting a copy of the
+Teller. Instead, every Teller registers itself here when it is created,
+and one TellerPool of core_count workers is forked for the whole run
+(shared_pool), so n tellers share the run's cores instead of starting n
+pools. The workers inherit the registered Tellers, so a call only sends
+the Teller's key, the method and its chunk of work. Chunks are
+scheduled with imap and the results come back in chunk order.
+
+setup.sh patches main.py (scripts/patch_main.py) to start the Teller's
+mp_* targets as TellerProcess threads instead. They run in the main
+process, where the Teller hands each chunk to its pool (Teller.run_chunk)
+and puts the results on main.py's queues as before.
+
+Points and keys are reduced when a chunk is pickled: P-256 points to
+their 64-byte pointcodec encoding, other points to their coordinates.
+pycryptodome points cannot be pickled otherwise.
+"""
+import atexit
+import copyreg
+import multiprocessing
+import os
+import threading
+
+from Crypto.PublicKey import ECC
+
+import pointcodec
+
+# Pool workers are forked, so the Teller reaches them without pickling
+_context = multiprocessing.get_context("fork")
+_tellers = []  # registered Tellers; workers find them by index
+_pools = []
+_shared = None  # see shared_pool
+_shared_lock = threading.Lock()
+
+
+def _point(x, y, curve):
+    return ECC.EccPoint(x, y, curve)
+
+
+def _reduce_point(point):
+    if pointcodec.same_curve(point):
+        return pointcodec.decode_point, (pointcodec.encode_point(point),)
+    return _point, (int(point.x), int(point.y), point._curve_name)
+
+
+def _key(curve, d, x, y):
+    if d is None:
+        return ECC.construct(curve=curve, point_x=x, point_y=y)
+    return ECC.construct(curve=curve, d=d, point_x=x, point_y=y)
+
+
+def _reduce_key(key):
+    d = int(key.d) if key.has_private() else None
+    return _key, (key.curve, d, int(key.pointQ.x), int(key.pointQ.y))
+
+
+copyreg.pickle(ECC.EccPoint, _reduce_point)
+copyreg.pickle(ECC.EccKey, _reduce_key)
+
+
+def register(teller):
+    """
+    Key under which pool workers find `teller`. Register every Teller
+    before its first pool call: workers only see the Tellers registered
+    when they were forked.
+    """
+    with _shared_lock:
+        _tellers.append(teller)
+        return len(_tellers) - 1
+
+
+def _call(task):
+    key, method, args = task
+    return getattr(_tellers[key], method)(*args)
+
+
+def split(items, n):
+    """
+    `items` in n contiguous chunks whose sizes differ by at most one,
+    as Teller.ciphertext_list_split.
+    """
+    k, m = divmod(len(items), n)
+    return [items[i * k + min(i, m):(i + 1) * k + min(i + 1, m)] for i in range(n)]
+
+
+class TellerPool:
+    """
+    Worker processes serving the registered Tellers for the duration of a run.
+    """
+
+    def __init__(self, processes):
+        self.processes = processes
+        self.tellers = len(_tellers)
+        self.pool = _context.Pool(processes)
+        _pools.append(self)
+
+    def map(self, key, method, calls):
+        """
+        Results of <method>(*args) of the Teller registered under `key`,
+        for each args tuple, in order.
+        """
+        return list(self.pool.imap(_call, [(key, method, args) for args in calls]))
+
+    def map_chunks(self, key, method, items, *args):
+        """
+        Split `items` into one chunk per worker and return the results of
+        <method>(chunk, *args) of the Teller under `key` in chunk order.
+        Empty chunks are left out.
+        """
+        return self.map(
+            key, method, [(chunk, *args) for chunk in split(items, self.processes) if chunk]
+        )
+
+    def close(self):
+        if self in _pools:
+            _pools.remove(self)
+            self.pool.close()
+            self.pool.join()
+
+
+def shared_pool(processes, before_fork=None):
+    """
+    The run's TellerPool, shared by all its Tellers and threads. It is
+    forked on first use, after before_fork(), and forked again if it was
+    closed or Tellers were registered since.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared not in _pools or _shared.tellers < len(_tellers):
+            if _shared is not None:
+                _shared.close()
+            if before_fork is not None:
+                before_fork()
+            _shared = TellerPool(processes)
+        return _shared
+
+
+class TellerProcess(threading.Thread):
+    """
+    multiprocessing.Process stand-in for a Teller's mp_* targets. The
+    target runs on a thread of the calling process, so the Teller's
+    worker pool does the work instead of a newly forked process.
+    """
+
+    def __init__(self, group=None, target=None, name=None, args=(), kwargs=None, *, daemon=None):
+        super().__init__(group, target, name, args, kwargs, daemon=daemon)
+        self.exitcode = None
+
+    def start(self):
+        # Fork the workers here, before any target thread is running
+        teller = getattr(self._target, "__self__", None)
+        if hasattr(teller, "worker_pool"):
+            teller.worker_pool()
+        super().start()
+
+    def run(self):
+        try:
+            super().run()
+        except BaseException:
+            self.exitcode = 1
+            raise
+        self.exitcode = 0
+
+
+@atexit.register
+def _close_all():
+    for pool in list(_pools):
+        pool.pool.terminate()
+    _pools.clear()
+
+
+def _reset_after_fork():
+    # Workers and other children do not own their parent's pools; they
+    # keep the registered Tellers
+    global _shared_lock
+    _pools.clear()
+    _shared_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
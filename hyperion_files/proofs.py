@@ -0,0 +1,172 @@
+"""
+The zero-knowledge proofs of a ballot, stated as equations.
+
+pi_1 proves knowledge of the trapdoor key x of ptk = x*G (Schnorr):
+
+  gr = w*G, c = H(G, ptk, gr, id), z = w + c*x
+  valid when z*G - gr - c*ptk = 0
+
+pi_2 proves that ev = (c1, c2) = (r*G, m*G + r*Q) encrypts one of
+m = 0 .. count-1 to the teller key Q (a disjunctive Chaum-Pedersen
+proof, Cramer-Damgard-Schoenmakers). The branch of the real m is proven
+and every other branch j is simulated with a chosen challenge c_j:
+
+  pi_2 = [ul, vl, cl, zl], with for every j
+  valid when z_j*G - u_j - c_j*c1 = 0 and z_j*Q - v_j - c_j*(c2 - j*G) = 0
+  and sum(cl) = H(G, Q, c1, c2, ul, vl, id)
+
+Hashes are transcript challenges mod the group order, and proofs carry
+the voter id as context. pi_1 keeps its commitment under "gr" and pi_2
+its commitment lists first, as Teller.raise_h_chunk serializes them.
+
+pi_d proves that a teller's partial decryptions d_i = y*a_i of a chunk
+of alphas a_i use the secret key share y of Y = y*G. Weights t_i are
+transcript challenges over tau and the statement (the alphas and the
+serialized outputs), and the proof is a Chaum-Pedersen proof for
+A = sum(t_i*a_i) and D = sum(t_i*d_i):
+
+  p_1 = r*G, p_2 = r*A, u = H(p_1, p_2, G, Y, statement), w = r - u*y
+  valid when w*G + u*Y - p_1 = 0 and w*A + u*D - p_2 = 0
+
+The *_equations functions return the group equations as (points,
+scalars) pairs whose sum must be the point at infinity, so
+batch.BatchVerifier can check many proofs with one multi-scalar
+multiplication. Checks on scalars alone, such as sum(cl) = c, are made
+when the equations are built; they return None when those fail.
+"""
+import secrets
+
+import ecops
+from transcript import Transcript
+
+
+def _random(order):
+    return 1 + secrets.randbelow(order - 1)
+
+
+def _challenge(label, order, *values):
+    return Transcript(label).append(*values).challenge(order)
+
+
+def prove_knowledge(generator, order, secret, public, context):
+    """
+    pi_1 for `public` = `secret` * `generator`.
+    """
+    order = int(order)
+    w = _random(order)
+    gr = generator * w
+    c = _challenge("knowledge", order, generator, public, gr, context)
+    return {"gr": gr, "z": (w + c * int(secret)) % order}
+
+
+def knowledge_equations(generator, order, proof, public, context):
+    order = int(order)
+    gr = proof["gr"]
+    c = _challenge("knowledge", order, generator, public, gr, context)
+    return [([generator, gr, public], [int(proof["z"]), -1, -c])]
+
+
+def prove_wellformedness(generator, order, public_key, c1, c2, r, count, vote, context):
+    """
+    pi_2 for (c1, c2) = (r*G, vote*G + r*public_key), vote in 0 .. count-1.
+    """
+    order = int(order)
+    if not 0 <= vote < count:
+        raise ValueError(f"vote {vote} is not in 0..{count - 1}")
+    ul, vl, cl, zl = [], [], [], []
+    w = _random(order)
+    for j in range(count):
+        if j == vote:
+            ul.append(generator * w)
+            vl.append(public_key * w)
+            cl.append(0)
+            zl.append(0)
+            continue
+        c_j, z_j = _random(order), _random(order)
+        ul.append(ecops.msm([generator, c1], [z_j, -c_j]))
+        vl.append(ecops.msm([public_key, c2, generator], [z_j, -c_j, c_j * j]))
+        cl.append(c_j)
+        zl.append(z_j)
+    c = _challenge("wellformedness", order, generator, public_key, c1, c2, ul, vl, context)
+    cl[vote] = (c - sum(cl)) % order
+    zl[vote] = (w + cl[vote] * int(r)) % order
+    return [ul, vl, cl, zl]
+
+
+def wellformedness_equations(generator, order, public_key, c1, c2, proof, context):
+    order = int(order)
+    ul, vl, cl, zl = proof[:4]
+    if not len(ul) == len(vl) == len(cl) == len(zl):
+        return None
+    c = _challenge("wellformedness", order, generator, public_key, c1, c2, ul, vl, context)
+    if sum(int(c_j) for c_j in cl) % order != c:
+        return None
+    equations = []
+    for j, (u_j, v_j, c_j, z_j) in enumerate(zip(ul, vl, cl, zl)):
+        c_j, z_j = int(c_j), int(z_j)
+        equations.append(([generator, u_j, c1], [z_j, -1, -c_j]))
+        equations.append(([public_key, v_j, c2, generator], [z_j, -1, -c_j, c_j * j]))
+    return equations
+
+
+def holds(equations):
+    """
+    Whether every equation holds, each checked on its own.
+    """
+    if equations is None:
+        return False
+    return all(ecops.msm(points, scalars).is_point_at_infinity() for points, scalars in equations)
+
+
+def decryption_weights(order, tau, statement, count):
+    """
+    The weights t_i of pi_d, one per alpha.
+    """
+    return Transcript("decryption-weights").append(tau, statement).challenges(order, count)
+
+
+def prove_decryption(generator, order, secret, public, alphas, statement):
+    """
+    pi_d for the partial decryptions secret * alpha of `alphas`, which
+    `statement` describes to the verifier.
+    """
+    order = int(order)
+    tau = _random(order)
+    weights = decryption_weights(order, tau, statement, len(alphas))
+    r = _random(order)
+    p_1 = generator * r
+    p_2 = ecops.msm(alphas, weights) * r
+    u = _challenge("partial-decryption", order, p_1, p_2, generator, public, statement)
+    return {"p_1": p_1, "p_2": p_2, "w": (r - u * int(secret)) % order, "tau": tau}
+
+
+def decryption_equations(generator, order, public, proof, alphas, shares, statement):
+    order = int(order)
+    if len(alphas) != len(shares):
+        return None
+    p_1, p_2, w = proof["p_1"], proof["p_2"], int(proof["w"])
+    weights = decryption_weights(order, int(proof["tau"]), statement, len(alphas))
+    u = _challenge("partial-decryption", order, p_1, p_2, generator, public, statement)
+    return [
+        ([generator, public, p_1], [w, u, -1]),
+        (
+            list(alphas) + list(shares) + [p_2],
+            [w * t for t in weights] + [u * t for t in weights] + [-1],
+        ),
+    ]
+
+
+def decryption_chunk(board, partial_decryptions, indices=None):
+    """
+    The tagged ciphertexts of `board` (index -> ciphertext) that a
+    chunk's [index, partial decryption] items belong to, in the prover's
+    order; None if one is not on the board or the proof's `indices` name
+    another chunk. The items' indices are part of pi_d's statement, so
+    relabelled partial decryptions do not verify either.
+    """
+    chunk_indices = [item[0] for item in partial_decryptions]
+    if indices is not None and list(indices) != chunk_indices:
+        return None
+    if any(index not in board for index in chunk_indices):
+        return None
+    return [board[index] for index in chunk_indices]
@@ -0,0 +1,47 @@
+"""
+Threshold parameters and Lagrange coefficients, without threshold_crypto.
+
+The server sets HYPERION_THRESHOLD to "k,n" from the run request: k of
+the n tellers' key shares decrypt. Teller.combine_shares combines k
+partial decryptions with the Lagrange coefficients at 0 of their share
+indices, which lagrange_coefficients computes mod the group order.
+"""
+import os
+
+DEFAULT = "2,3"
+
+
+def parse(value):
+    """
+    (k, n) from a "k,n" string, for 1 <= k <= n.
+    """
+    try:
+        k, n = (int(part) for part in value.split(","))
+    except (AttributeError, ValueError):
+        k = n = None
+    if k is None or not 1 <= k <= n:
+        raise ValueError(f"HYPERION_THRESHOLD must be 'k,n' with 1 <= k <= n, got {value!r}")
+    return k, n
+
+
+def from_env():
+    """
+    (k, n) of this run; standalone runs keep 2 of 3.
+    """
+    return parse(os.environ.get("HYPERION_THRESHOLD", DEFAULT))
+
+
+def lagrange_coefficients(indices, order):
+    """
+    The Lagrange coefficients at 0 of the distinct share `indices`, mod `order`.
+    """
+    order = int(order)
+    coefficients = []
+    for i in indices:
+        numerator, denominator = 1, 1
+        for j in indices:
+            if j != i:
+                numerator = numerator * j % order
+                denominator = denominator * (j - i) % order
+        coefficients.append(numerator * pow(denominator, -1, order) % order)
+    return coefficients
@@ -0,0 +1,239 @@
+"""
+Fiat-Shamir transcripts over canonical byte encodings.
+
+Challenges used to be sha256(str(a) + str(b) + ...). That builds the
+repr of every list of points and partial decryptions only to hash it.
+It also hashes pycryptodome points by their object address, because
+that is what str() of an EccPoint shows. A Transcript encodes each value
+with a type tag into a buffer that goes to the hash whenever it
+reaches 64 KiB, also inside lists and dicts:
+
+  point          "P" + x and y, 32 bytes each (pointcodec's raw form)
+  integer        "I" + 32 bytes big-endian, or "J" + sign, length and
+                 bytes when it does not fit
+  str / bytes    "S" / "B" + 4-byte length + the bytes
+  list / tuple   "L" + 4-byte count + the items
+  dict           "M" + 4-byte count + the sorted keys and their values
+  None           "N"
+
+Serialized points ({"x", "y", "curve"} dicts) encode exactly like the
+EccPoints they stand for, and keys encode as their public point. So
+does a list of points packed by pointcodec, wrapped in PackedPoints.
+Other objects fall back to "R" + their str().
+
+challenge() reduces the digest mod the group order. challenges() derives
+many scalars from one transcript, such as the per-ciphertext weights of
+a proof of decryption. It reads them from SHAKE-256 output seeded with
+the digest, instead of hashing a string per ciphertext.
+
+HYPERION_TRANSCRIPT_HASH picks the hash: sha256 (default), sha3_256,
+blake2b or blake2s, all with 32-byte digests. Provers and verifiers must
+use the same one, so it is set once per run.
+"""
+import hashlib
+import operator
+import os
+
+from Crypto.PublicKey import ECC
+
+import pointcodec
+
+ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    "sha3_256": hashlib.sha3_256,
+    "blake2b": lambda: hashlib.blake2b(digest_size=32),
+    "blake2s": hashlib.blake2s,
+}
+ALGORITHM = os.environ.get("HYPERION_TRANSCRIPT_HASH", "sha256")
+
+_SCALAR_SIZE = pointcodec.SIZE
+_SCALAR_LIMIT = 1 << (8 * _SCALAR_SIZE)
+_FLUSH = 1 << 16  # bytes gathered before each hash update
+# Bytes per challenge from the XOF; the 64 beyond the order's 256 bits
+# keep the bias of the reduction below 2^-64.
+_WIDE = 40
+
+
+def _length(n):
+    return n.to_bytes(4, "big")
+
+
+def _encode_int(n, buffer):
+    if 0 <= n < _SCALAR_LIMIT:
+        buffer += b"I"
+        buffer += n.to_bytes(_SCALAR_SIZE, "big")
+    else:
+        data = abs(n).to_bytes((abs(n).bit_length() + 7) // 8, "big")
+        buffer += b"J-" if n < 0 else b"J+"
+        buffer += _length(len(data))
+        buffer += data
+
+
+def _encode_xy(x, y, buffer):
+    buffer += b"P"
+    buffer += int(x).to_bytes(_SCALAR_SIZE, "big")
+    buffer += int(y).to_bytes(_SCALAR_SIZE, "big")
+
+
+def _encode_sequence(value, buffer):
+    buffer += b"L"
+    buffer += _length(len(value))
+    for item in value:
+        _encode(item, buffer)
+        buffer.flush()
+
+
+def _encode_dict(value, buffer):
+    if len(value) == 3 and "x" in value and "y" in value and "curve" in value:
+        _encode_xy(value["x"], value["y"], buffer)
+        return
+    buffer += b"M"
+    buffer += _length(len(value))
+    for key in sorted(value, key=str):
+        _encode(key, buffer)
+        _encode(value[key], buffer)
+        buffer.flush()
+
+
+class PackedPoints:
+    """
+    A pointcodec raw buffer, absorbed like the list of points it holds.
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+
+def _encode_packed(value, buffer):
+    view = memoryview(value.buffer)
+    buffer += b"L"
+    buffer += _length(len(view) // pointcodec.RAW_SIZE)
+    for i in range(0, len(view), pointcodec.RAW_SIZE):
+        buffer += b"P"
+        buffer += view[i:i + pointcodec.RAW_SIZE]
+        buffer.flush()
+
+
+def _encode_str(value, buffer):
+    data = value.encode("UTF-8")
+    buffer += b"S"
+    buffer += _length(len(data))
+    buffer += data
+
+
+def _encode_bytes(value, buffer):
+    buffer += b"B"
+    buffer += _length(len(value))
+    buffer += value
+
+
+# Exact types first; subclasses and the rest go through _encode_other
+_ENCODERS = {
+    list: _encode_sequence,
+    tuple: _encode_sequence,
+    dict: _encode_dict,
+    int: _encode_int,
+    str: _encode_str,
+    bytes: _encode_bytes,
+    PackedPoints: _encode_packed,
+}
+
+
+def _encode(value, buffer):
+    encoder = _ENCODERS.get(type(value))
+    if encoder is not None:
+        encoder(value, buffer)
+    else:
+        _encode_other(value, buffer)
+
+
+def _encode_other(value, buffer):
+    if isinstance(value, ECC.EccPoint):
+        x, y = value.xy
+        _encode_xy(x, y, buffer)
+    elif isinstance(value, ECC.EccKey):
+        _encode_other(value.pointQ, buffer)
+    elif value is None:
+        buffer += b"N"
+    elif isinstance(value, (list, tuple)):
+        _encode_sequence(value, buffer)
+    elif isinstance(value, dict):
+        _encode_dict(value, buffer)
+    elif isinstance(value, str):
+        _encode_str(value, buffer)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        _encode_bytes(bytes(value), buffer)
+    elif hasattr(value, "__index__"):
+        _encode_int(operator.index(value), buffer)
+    else:
+        data = str(value).encode("UTF-8")
+        buffer += b"R"
+        buffer += _length(len(data))
+        buffer += data
+
+
+class _Buffer(bytearray):
+    """
+    Encoded bytes not yet hashed; the encoders call flush() between
+    items.
+    """
+
+    def __init__(self, hash):
+        super().__init__()
+        self.hash = hash
+
+    def flush(self, size=_FLUSH):
+        if len(self) >= size:
+            self.hash.update(self)
+            self.clear()
+
+
+class Transcript:
+    def __init__(self, label, algorithm=None):
+        algorithm = algorithm or ALGORITHM
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown transcript hash {algorithm!r}")
+        self.algorithm = algorithm
+        self._hash = ALGORITHMS[algorithm]()
+        self.append(label)
+
+    def copy(self):
+        """
+        An independent transcript with everything absorbed so far.
+        """
+        other = Transcript.__new__(Transcript)
+        other.algorithm = self.algorithm
+        other._hash = self._hash.copy()
+        return other
+
+    def append(self, *values):
+        """
+        Absorb `values` in order; returns the transcript.
+        """
+        buffer = _Buffer(self._hash)
+        for value in values:
+            _encode(value, buffer)
+            buffer.flush()
+        buffer.flush(0)
+        return self
+
+    def digest(self):
+        return self._hash.digest()
+
+    def challenge(self, order):
+        """
+        The digest as an integer reduced mod `order`.
+        """
+        return int.from_bytes(self.digest(), "big") % int(order)
+
+    def challenges(self, order, count):
+        """
+        `count` challenges mod `order`, read as consecutive _WIDE-byte
+        blocks of SHAKE-256 output seeded with this transcript's digest.
+        """
+        order = int(order)
+        stream = hashlib.shake_256(self.digest()).digest(_WIDE * count)
+        return [
+            int.from_bytes(stream[i:i + _WIDE], "big") % order
+            for i in range(0, len(stream), _WIDE)
+        ]
@@ -0,0 +1,284 @@
+"""
+Ballot validation in batches, at cast time or at the tally.
+
+Voter.sign_ballot records each new ballot with submit(). Ballots are
+verified in groups of BATCH_SIZE by check_batch: it checks the DSA
+signatures on their own and folds the proof equations of the whole
+group (see proofs.py) into one batch.BatchVerifier check. Only when that
+fails are the group's ballots checked one by one, to name the invalid
+ones. HYPERION_BATCH_VERIFY=0 verifies every ballot on its own.
+
+By default the recorded ballots are verified at the tally: the first
+Teller.validate_ballot call for a recorded ballot checks all of them,
+on the tellers' worker pool when one is set with set_runner. With
+HYPERION_PREVALIDATE=1 each group is instead checked on a background
+thread pool as soon as it is full, while the remaining voters are still
+voting, and validate_ballot reuses the stored outcome. That is off by
+default: the checks then run inside the voting phase and move its
+timings, so runs only compare with each other at the same setting.
+
+The background pool uses threads, not processes, so the ballots are not
+pickled and the point arithmetic runs in C outside the GIL.
+HYPERION_VALIDATE_WORKERS sets its size (default: the run's core
+allotment HYPERION_CORES, else the CPU count). Tellers
+call drain() before tallying, so it has finished and shut down before
+the tally forks its workers. Ballots never recorded, or changed since, are verified on
+their own by validate_ballot.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import gmpy2
+
+from primitives import DSA
+import proofs
+from batch import BatchVerifier
+from transcript import Transcript
+from exceptions import (
+    InvalidSignatureException,
+    InvalidProofException,
+    InvalidWFNProofException,
+)
+
+ENABLED = os.environ.get("HYPERION_PREVALIDATE", "0") == "1"
+# The server's scheduler sets HYPERION_CORES to the run's core allotment
+WORKERS = (
+    int(os.environ.get("HYPERION_VALIDATE_WORKERS", "0"))
+    or int(os.environ.get("HYPERION_CORES", "0"))
+    or os.cpu_count()
+    or 1
+)
+BATCH = os.environ.get("HYPERION_BATCH_VERIFY", "1") != "0"
+# Ballots per check_batch call of the background pool
+BATCH_SIZE = 64
+
+# Returned by result() for ballots without a usable stored outcome
+UNKNOWN = object()
+
+_pool = None
+_results = {}  # ballot id -> [digest, future of its batch or None, position]
+_pending = []  # (curve, teller key, ballot) not yet being checked
+_runner = None  # see set_runner
+_lock = threading.Lock()
+
+
+def signed_hash(curve, ballot):
+    """
+    The hash the voter signs in Voter.sign_ballot.
+    """
+    transcript = Transcript("ballot").append(
+        ballot["ev"], ballot["ptk"], ballot["pi_1"], ballot["pi_2"]
+    )
+    return gmpy2.mpz(transcript.challenge(curve.get_pars().order))
+
+
+def ballot_digest(ballot):
+    """
+    Fingerprint of the verified fields, to detect ballots changed after submission.
+    """
+    text = "|".join(
+        str(ballot[key]) for key in ("id", "spk", "sig", "ev", "ptk", "pi_1", "pi_2")
+    )
+    return hashlib.sha256(text.encode("UTF-8")).hexdigest()
+
+
+def ballot_equations(curve, teller_public_key, ballot):
+    """
+    The equations of the NIZK and OR-proof of `ballot`; None for an
+    OR-proof whose challenges already fail.
+    """
+    generator = curve.get_pars().P
+    order = curve.get_pars().order
+    c1, c2 = ballot["ev"][0], ballot["ev"][1]
+    knowledge = proofs.knowledge_equations(
+        generator, order, ballot["pi_1"], ballot["ptk"], ballot["id"]
+    )
+    wellformedness = proofs.wellformedness_equations(
+        generator, order, teller_public_key.Q, c1, c2, ballot["pi_2"], ballot["id"]
+    )
+    if wellformedness is None:
+        return None
+    return knowledge + wellformedness
+
+
+def check_ballot(curve, teller_public_key, ballot):
+    """
+    Verify one ballot; None if it is valid, else the exception describing why not.
+    """
+    dsa = DSA(curve)
+    try:
+        if not dsa.verify(ballot["spk"], ballot["sig"], signed_hash(curve, ballot)):
+            raise InvalidSignatureException(ballot["id"])
+        generator = curve.get_pars().P
+        order = curve.get_pars().order
+        if not proofs.holds(proofs.knowledge_equations(
+            generator, order, ballot["pi_1"], ballot["ptk"], ballot["id"]
+        )):
+            raise InvalidProofException(ballot["id"])
+        if not proofs.holds(proofs.wellformedness_equations(
+            generator, order, teller_public_key.Q, ballot["ev"][0], ballot["ev"][1],
+            ballot["pi_2"], ballot["id"],
+        )):
+            raise InvalidWFNProofException(ballot["id"])
+    except Exception as e:
+        return e
+    return None
+
+
+def check_batch(curve, teller_public_key, ballots):
+    """
+    check_ballot for each of `ballots`, in order, with the proofs checked
+    as one batch.
+    """
+    if not BATCH:
+        return [check_ballot(curve, teller_public_key, ballot) for ballot in ballots]
+    errors = [None] * len(ballots)
+    batch = BatchVerifier()
+    dsa = DSA(curve)
+    for i, ballot in enumerate(ballots):
+        try:
+            equations = ballot_equations(curve, teller_public_key, ballot)
+        except Exception:
+            # Malformed proof; check_ballot reports why
+            equations = None
+        if equations is None:
+            errors[i] = check_ballot(curve, teller_public_key, ballot)
+            continue
+        if not dsa.verify(ballot["spk"], ballot["sig"], signed_hash(curve, ballot)):
+            errors[i] = InvalidSignatureException(ballot["id"])
+            continue
+        for points, scalars in equations:
+            batch.add(points, scalars, tag=i)
+    if not batch.verify():
+        for i in batch.failures():
+            errors[i] = check_ballot(curve, teller_public_key, ballots[i])
+    return errors
+
+
+def submit(curve, teller_public_key, ballot):
+    """
+    Record a freshly cast ballot for validation. With ENABLED it is
+    checked on the background pool with the next BATCH_SIZE ballots;
+    otherwise it waits for the tally, where result() checks all recorded
+    ballots in batches.
+    """
+    digest = ballot_digest(ballot)
+    with _lock:
+        if ENABLED and _pending and _pending[0][1] is not teller_public_key:
+            _dispatch()
+        _results[ballot["id"]] = [digest, None, len(_pending)]
+        _pending.append((curve, teller_public_key, ballot))
+        if ENABLED and len(_pending) >= BATCH_SIZE:
+            _dispatch()
+
+
+def _dispatch():
+    # Hand the pending ballots to the pool as one batch; holds _lock
+    global _pool
+    if not _pending:
+        return
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="validate")
+    curve, teller_public_key = _pending[0][:2]
+    ballots = [ballot for _, _, ballot in _pending]
+    future = _pool.submit(check_batch, curve, teller_public_key, ballots)
+    for ballot in ballots:
+        _results[ballot["id"]][1] = future
+    _pending.clear()
+
+
+def _take_groups():
+    # The pending ballots as (future, curve, teller key, ballots) groups
+    # of up to BATCH_SIZE under one key; holds _lock
+    groups = []
+    for curve, teller_public_key, ballot in _pending:
+        group = groups[-1] if groups else None
+        if group is None or group[2] is not teller_public_key or len(group[3]) >= BATCH_SIZE:
+            group = (Future(), curve, teller_public_key, [])
+            groups.append(group)
+        entry = _results[ballot["id"]]
+        entry[1], entry[2] = group[0], len(group[3])
+        group[3].append(ballot)
+    _pending.clear()
+    return groups
+
+
+def set_runner(runner):
+    """
+    Have runner([(curve, teller key, ballots), ...]) compute check_batch
+    for each group at the tally, e.g. on a worker pool; None checks them
+    inline.
+    """
+    global _runner
+    _runner = runner
+
+
+def _verify(groups):
+    calls = [group[1:] for group in groups]
+    try:
+        if _runner is None:
+            outcomes = [check_batch(*call) for call in calls]
+        else:
+            outcomes = _runner(calls)
+    except BaseException as e:
+        for group in groups:
+            group[0].set_exception(e)
+        raise
+    for group, errors in zip(groups, outcomes):
+        group[0].set_result(errors)
+
+
+def drain():
+    """
+    Wait for every ballot submitted to the background pool and shut the
+    pool down. The stored outcomes stay available to result().
+    """
+    global _pool
+    with _lock:
+        if ENABLED:
+            _dispatch()
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def result(ballot):
+    """
+    Stored outcome for `ballot` (None or the exception), waiting for it if
+    still running; UNKNOWN if it was never submitted or has changed since.
+    A ballot not checked yet is checked now, with every other recorded
+    ballot, in groups of BATCH_SIZE.
+    """
+    groups = []
+    with _lock:
+        entry = _results.get(ballot["id"])
+        if entry is not None and entry[1] is None:
+            if ENABLED:
+                _dispatch()
+            else:
+                groups = _take_groups()
+    if groups:
+        _verify(groups)
+    if entry is None:
+        return UNKNOWN
+    digest, future, position = entry
+    if digest != ballot_digest(ballot):
+        return UNKNOWN
+    return future.result()[position]
+
+
+def _reset_after_fork():
+    # Workers only check the groups they are sent; drop the parent's
+    # pool, runner and records.
+    global _pool, _lock, _runner
+    _pool = None
+    _runner = None
+    _results.clear()
+    _pending.clear()
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,168 @@
+"""
+Patch hyperion/main.py to run the tellers' chunks on the run's worker pool.
+
+main.py starts a multiprocessing.Process per chunk with a Teller's mp_*
+method as its target. This rewrites each such call to start a
+pool.TellerProcess instead, which runs the target on a thread so the
+Teller hands the chunk to the run's shared pool (see pool.py). Calls are
+found on main.py's syntax tree, whatever the import style; everything
+else is left as it is. The patch is idempotent, and a main.py without
+such calls is left unchanged, in which case the targets keep running in
+their own processes.
+
+The patched parties.py changed what some Teller methods take: the
+decryption proof is checked against the chunk's [index, serialized
+partial decryption] output, optionally with the proof's "indices".
+Calls of those methods in main.py are checked against the new
+arguments first (contract_errors), and a main.py that does not match
+is left unpatched with an error.
+
+    python scripts/patch_main.py hyperion/main.py
+"""
+import ast
+import sys
+
+MARKER = "# Teller chunks run on worker pools (scripts/patch_main.py)"
+
+# Teller methods main.py calls whose arguments the patched modules
+# define: (least, most) arguments without self. The decryption proof
+# takes indices and col after the chunk's output.
+CONTRACTS = {
+    "verify_decryption_proof": (7, 9),
+    "mp_partial_decrypt": (4, 4),
+    "mp_full_decrypt": (4, 4),
+}
+
+
+def _is_process(func):
+    if isinstance(func, ast.Attribute):
+        return func.attr == "Process"
+    return isinstance(func, ast.Name) and func.id == "Process"
+
+
+def _is_teller_target(call):
+    for keyword in call.keywords:
+        if keyword.arg == "target":
+            value = keyword.value
+            return isinstance(value, ast.Attribute) and value.attr.startswith("mp_")
+    return False
+
+
+def process_calls(tree):
+    """
+    The func nodes of Process(target=<x>.mp_*) calls in `tree`.
+    """
+    return [
+        node.func for node in ast.walk(tree)
+        if isinstance(node, ast.Call) and _is_process(node.func) and _is_teller_target(node)
+    ]
+
+
+def _argument_count(call):
+    # None when starred arguments hide the count
+    if any(isinstance(arg, ast.Starred) for arg in call.args):
+        return None
+    if any(keyword.arg is None for keyword in call.keywords):
+        return None
+    count = len(call.args) + len(call.keywords)
+    # Teller.method(teller, ...) passes self explicitly
+    if isinstance(call.func.value, ast.Name) and call.func.value.id == "Teller":
+        count -= 1
+    return count
+
+
+def _target_args(call):
+    # The args of a Process(target=..., args=(...)) call, or None
+    for keyword in call.keywords:
+        if keyword.arg == "args" and isinstance(keyword.value, (ast.Tuple, ast.List)):
+            return keyword.value.elts
+    return None
+
+
+def contract_errors(source):
+    """
+    Calls in `source` to the Teller methods of CONTRACTS, directly or
+    as Process targets, with arguments the patched methods do not take;
+    one "line N: ..." message each.
+    """
+    errors = []
+    for node in ast.walk(ast.parse(source)):
+        if not isinstance(node, ast.Call):
+            continue
+        if isinstance(node.func, ast.Attribute) and node.func.attr in CONTRACTS:
+            name, count = node.func.attr, _argument_count(node)
+        elif _is_process(node.func) and _is_teller_target(node):
+            target = next(k.value for k in node.keywords if k.arg == "target")
+            args = _target_args(node)
+            name, count = target.attr, None if args is None else len(args)
+        else:
+            continue
+        if name not in CONTRACTS or count is None:
+            continue
+        least, most = CONTRACTS[name]
+        if not least <= count <= most:
+            expected = f"{least}" if least == most else f"{least} to {most}"
+            errors.append(f"line {node.lineno}: {name} called with {count} argument(s), expected {expected}")
+    return errors
+
+
+def patch(source):
+    """
+    `source` with its Teller Process calls starting TellerProcesses, and
+    the number of calls rewritten.
+    """
+    if MARKER in source:
+        return source, 0
+    funcs = [f for f in process_calls(ast.parse(source)) if f.lineno == f.end_lineno]
+    if not funcs:
+        return source, 0
+    # Offsets are in UTF-8 bytes; rewrite from the end so earlier ones hold
+    lines = [line.encode("UTF-8") for line in source.splitlines(keepends=True)]
+    for func in sorted(funcs, key=lambda f: (f.lineno, f.col_offset), reverse=True):
+        line = lines[func.lineno - 1]
+        lines[func.lineno - 1] = (
+            line[:func.col_offset] + b"_teller_pool.TellerProcess" + line[func.end_col_offset:]
+        )
+    patched = b"".join(lines).decode("UTF-8")
+    # After a leading docstring and __future__ imports
+    tree = ast.parse(source)
+    insert_at = 0
+    for node in tree.body:
+        is_docstring = (
+            isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str) and node is tree.body[0]
+        )
+        is_future = isinstance(node, ast.ImportFrom) and node.module == "__future__"
+        if not (is_docstring or is_future):
+            break
+        insert_at = node.end_lineno
+    patched_lines = patched.splitlines(keepends=True)
+    patched_lines.insert(insert_at, f"{MARKER}\nimport pool as _teller_pool\n")
+    return "".join(patched_lines), len(funcs)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        sys.exit("usage: patch_main.py path/to/main.py")
+    path = argv[0]
+    with open(path, encoding="UTF-8") as f:
+        source = f.read()
+    errors = contract_errors(source)
+    if errors:
+        for error in errors:
+            print(f"[ERROR] {path}: {error}")
+        sys.exit(f"{path}: Teller calls do not match the patched parties.py; left unchanged")
+    patched, count = patch(source)
+    if count:
+        with open(path, "w", encoding="UTF-8") as f:
+            f.write(patched)
+        print(f"[INFO] {path}: {count} teller Process call(s) now use the worker pool")
+    elif MARKER in source:
+        print(f"[INFO] {path}: already patched")
+    else:
+        print(f"[WARN] {path}: no Process(target=....mp_*) calls found; left unchanged")
+
+
+if __name__ == "__main__":
+    main()
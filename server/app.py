@@ -1,25 +1,96 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
+from typing import Literal, Optional
 from .models import RegisterReq, CastReq
-from . import storage
-from .hyperion_runner import run_hyperion
+from . import elections
+from . import tracing
+from . import profiling
+from . import points
+from . import history
+from . import validation
+from . import scheduler
+from . import checkpoints
+from .memory import MemoryRun
+from . import jobs
+from .hyperion_runner import run_hyperion, HyperionProcess
 import asyncio
 
 app = FastAPI(title="Hyperion PoC")
-LAST_TALLY = None
-LAST_BB = None
-RUNNING = False
+# Cast ballots are checked in the background as they arrive
+VALIDATION = validation.ValidationPipeline()
+# Runs share the machine's cores and memory through one admission queue
+SCHEDULER = scheduler.Scheduler()
+
+# Election endpoints are served twice: at the top level for the default
+# election (or ?election_id=) and under /elections/{election_id}.
+election_router = APIRouter()
+
+def get_election(election_id: str = elections.DEFAULT_ELECTION):
+    try:
+        return elections.get_election(election_id)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+# ---------- Tracing ----------
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    trace = tracing.Trace()
+    if tracing.TRACE_ALL:
+        trace.enable()
+    request.state.trace = trace
+    with trace.span(f"{request.method} {request.url.path}"):
+        response = await call_next(request)
+    if trace.enabled:
+        await asyncio.to_thread(trace.export)
+        response.headers["X-Trace-Id"] = trace.trace_id
+    return response
+
+# ---------- Elections ----------
+@app.get("/elections")
+async def list_elections():
+    return {"status": "ok", "elections": elections.list_elections()}
+
+@app.delete("/elections/{election_id}")
+async def drop_election(election_id: str):
+    if not elections.drop_election(election_id):
+        raise HTTPException(status_code=409, detail="Election unknown or a run is in progress.")
+    return {"status": "ok", "election_id": election_id}
 
 # ---------- Registration and voting endpoints ---------- # TBD: DELETE
-@app.post("/register")
-async def register(req: RegisterReq):
-    storage.register_voter(req.voter_id, req.h)
+@election_router.post("/register")
+async def register(req: RegisterReq, election: elections.Election = Depends(get_election)):
+    election.store.register_voter(req.voter_id, req.h, req.pk_voter)
     return {"status": "ok"}
 
-@app.post("/cast")
-async def cast(req: CastReq):
-    row = storage.cast_ballot(req.voter_id, req.h, req.enc_vote, req.signed_ballot)
-    return {"status": "ok", "row_id": row["row_id"]}
+@election_router.post("/cast")
+async def cast(req: CastReq, election: elections.Election = Depends(get_election)):
+    row = election.store.cast_ballot(req.voter_id, req.h, req.enc_vote, req.signed_ballot, req.proofs)
+    VALIDATION.submit(election.store, row)
+    return {"status": "ok", "row_id": row["row_id"], "seq": row["seq"], "validation": validation.PENDING}
+
+@election_router.get("/ballots")
+async def get_ballots(
+    since: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    election: elections.Election = Depends(get_election),
+):
+    # Cast ballots are append-only: clients pass the cursor of their last
+    # sync and get only the rows added since.
+    rows = election.store.get_bb_since(since, limit)
+    return {
+        "status": "ok",
+        "ballots": rows,
+        "cursor": since + len(rows),
+        "total": len(election.store.BB),
+    }
+
+@election_router.get("/ballots/{row_id}")
+async def get_ballot(row_id: str, election: elections.Election = Depends(get_election)):
+    row = election.store.find_ballot(row_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Ballot not found.")
+    return {"status": "ok", "ballot": row}
 
 # ---------- Hyperion Protocol ----------
 class HyperionRequest(BaseModel):
@@ -27,52 +98,215 @@ class HyperionRequest(BaseModel):
     tellers: int = 3
     threshold: int = 2
     max_votes: int = 2
+    trace: bool = False
+    profile: Optional[Literal["cprofile", "sampling"]] = None
+    tracemalloc: bool = False
+    # Lower runs first; default is interactive for small runs, batch otherwise
+    priority: Optional[int] = None
+    # Store phase outputs; `resume` continues an earlier checkpointed run
+    checkpoint: bool = False
+    resume: Optional[str] = None
+    rerun_phase: Optional[str] = None
 
-@app.post("/hyperion")
-async def run_hyperion_protocol(req: HyperionRequest = HyperionRequest()):
-    global LAST_TALLY, LAST_BB, RUNNING
-    if RUNNING:
+def checkpoint_run(req):
+    if not (req.checkpoint or req.resume):
+        return None
+    try:
+        return checkpoints.CheckpointRun(req.resume, req.rerun_phase)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@election_router.post("/hyperion")
+async def run_hyperion_protocol(
+    request: Request,
+    req: HyperionRequest = HyperionRequest(),
+    election: elections.Election = Depends(get_election),
+):
+    if election.running:
         raise HTTPException(status_code=409, detail="Hyperion run already in progress")
+    trace = request.state.trace
+    if req.trace:
+        trace.enable()
+    profile = profiling.ProfileRun(req.profile) if req.profile else None
+    checkpoint = checkpoint_run(req)
+    grant = None
     try:
-        RUNNING = True
-        result = await asyncio.to_thread(run_hyperion, req.voters, req.tellers, req.threshold, req.max_votes)
-        LAST_TALLY = result
-        LAST_BB = result["bulletin_board"]
-        return {
-            "status": "ok",
-            "tally": result["bulletin_board"],
-            "timings": result["timings"],
-            "raw_output": result["raw_output"],
-        }
+        election.running = True
+        # Ballots still being checked get their final status first
+        await asyncio.to_thread(VALIDATION.drain)
+        grant = await SCHEDULER.acquire(req.model_dump())
+        result = await asyncio.to_thread(
+            run_hyperion, req.voters, req.tellers, req.threshold, req.max_votes,
+            trace=trace if trace.enabled else None, profile=profile,
+            memory=MemoryRun(tracemalloc=req.tracemalloc), cores=grant.cores,
+            checkpoint=checkpoint,
+        )
+        election.last_tally = result
+        election.last_bb = result["bulletin_board"]
+        await asyncio.to_thread(record_history, req.model_dump(), result)
+        response = run_response(result, profile)
+        if trace.enabled:
+            response["trace"] = trace.path
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        RUNNING = False
+        if grant:
+            SCHEDULER.release(grant)
+        election.running = False
+
+def record_history(params, result):
+    # Runs without a timing table (e.g. a crashed protocol) are not kept,
+    # nor resumed runs, whose replayed phases take no time
+    if result.get("timings") and not params.get("resume"):
+        history.record_run(params, result)
+
+def run_response(result, profile=None):
+    """
+    Client view of a run result, shared by /hyperion and the job API.
+    """
+    response = {
+        "status": "ok",
+        "tally": result["bulletin_board"],
+        "timings": result["timings"],
+        "memory": result.get("memory", {}),
+        "raw_output": result["raw_output"],
+    }
+    if profile:
+        response["profile"] = {
+            "run_id": profile.run_id,
+            "mode": profile.mode,
+            "files": {
+                phase: f"/profiles/{profile.run_id}/{name}"
+                for phase, name in result.get("profile", {}).items()
+            },
+        }
+    if "checkpoint" in result:
+        response["checkpoint"] = result["checkpoint"]
+    return response
+
+# ---------- Hyperion jobs (non-blocking runs with progress) ----------
+@election_router.post("/jobs")
+async def start_job(
+    req: HyperionRequest = HyperionRequest(),
+    election: elections.Election = Depends(get_election),
+):
+    if election.running:
+        raise HTTPException(status_code=409, detail="Hyperion run already in progress")
+    checkpoint = checkpoint_run(req)
+    election.running = True
+    profile = profiling.ProfileRun(req.profile) if req.profile else None
+    process = HyperionProcess(
+        req.voters, req.tellers, req.threshold, req.max_votes,
+        profile=profile, memory=MemoryRun(tracemalloc=req.tracemalloc),
+        checkpoint=checkpoint,
+    )
+    params = {**req.model_dump(), "election_id": election.election_id}
+    job = jobs.add_job(jobs.Job(params, process, profile))
+    job.task = asyncio.create_task(finish_job(job, election))
+    return {"status": "ok", "job_id": job.job_id}
+
+async def finish_job(job, election):
+    try:
+        await asyncio.to_thread(VALIDATION.drain)
+        result = await job.run(SCHEDULER)
+        if result is not None:
+            election.last_tally = result
+            election.last_bb = result["bulletin_board"]
+            await asyncio.to_thread(record_history, job.params, result)
+    finally:
+        election.running = False
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    response = job.to_dict()
+    if job.status == "done":
+        response["result"] = run_response(job.result, job.profile)
+    return response
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    job.cancel()
+    return {"status": "ok", "job_id": job_id}
+
+@app.get("/scheduler")
+async def get_scheduler():
+    return {"status": "ok", **SCHEDULER.to_dict()}
+
+@app.get("/history")
+async def get_history(limit: Optional[int] = Query(None, ge=1)):
+    # Regressions are judged against all earlier runs, so find them
+    # before trimming to the requested window.
+    runs = history.find_regressions(await asyncio.to_thread(history.load_history))
+    if limit:
+        runs = runs[-limit:]
+    return {"status": "ok", "phases": history.PHASES, "runs": runs}
+
+@app.get("/checkpoints")
+async def list_checkpoints():
+    return {"status": "ok", "checkpoints": await asyncio.to_thread(checkpoints.list_checkpoints)}
+
+@app.delete("/checkpoints/{run_id}")
+async def delete_checkpoint(run_id: str):
+    if not await asyncio.to_thread(checkpoints.delete_checkpoint, run_id):
+        raise HTTPException(status_code=404, detail="Checkpoint not found.")
+    return {"status": "ok", "run_id": run_id}
+
+@app.get("/profiles/{run_id}/{name}")
+async def get_profile(run_id: str, name: str):
+    path = profiling.profile_path(run_id, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return FileResponse(path, filename=name)
 
 # ---------- Bulletin board ----------
-@app.get("/bb")
-async def get_bb():
-    if LAST_BB:
-        return {"status": "ok", "bb": LAST_BB}
+@election_router.get("/bb")
+async def get_bb(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    encoding: Literal["json", "compressed"] = "json",
+    election: elections.Election = Depends(get_election),
+):
+    # Clients page through large boards with offset/limit; `total` tells
+    # them how many rows there are.
+    bb = election.last_bb
+    if bb:
+        end = None if limit is None else offset + limit
+        return {
+            "status": "ok",
+            "bb": points.encode_rows(bb[offset:end], encoding),
+            "encoding": encoding,
+            "offset": offset,
+            "total": len(bb),
+        }
     raise HTTPException(status_code=404, detail="No bulletin board available. Run /hyperion first.")
 
 # ---------- Tally results ---------- TBD: DELETE
-@app.get("/tally_results")
-async def tally_results():
-    if LAST_TALLY:
-        return {"status": "ok", "tally": LAST_TALLY}
+@election_router.get("/tally_results")
+async def tally_results(election: elections.Election = Depends(get_election)):
+    if election.last_tally:
+        return {"status": "ok", "tally": election.last_tally}
     raise HTTPException(status_code=404, detail="No tally results yet. Run /hyperion first.")
 
 # --- Notification (example placeholder) --- TBD: DELETE
-@app.get("/notify/{voter_id}")
-async def notify(voter_id: str):
-    if not LAST_TALLY:
+@election_router.get("/notify/{voter_id}")
+async def notify(voter_id: str, election: elections.Election = Depends(get_election)):
+    if not election.last_tally:
         raise HTTPException(status_code=404, detail="No tally results yet.")
-    info = storage.get_notify(voter_id)
+    info = election.store.get_notify(voter_id)
     if not info or "g_r" not in info:
         raise HTTPException(status_code=404, detail="No notification for voter.")
     return {"g_r": info["g_r"]}
 
+app.include_router(election_router)
+app.include_router(election_router, prefix="/elections/{election_id}")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=8000)
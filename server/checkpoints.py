@@ -0,0 +1,75 @@
+import glob
+import os
+import re
+import shutil
+import uuid
+
+CHECKPOINT_ROOT = os.environ.get("HYPERION_CHECKPOINT_ROOT", "output/checkpoints")
+# Phase slugs accepted for rerun_phase, in protocol order
+PHASES = [
+    "setup",
+    "voting-avg",
+    "tallying-mixing",
+    "tallying-decryption",
+    "notification",
+    "verification-avg",
+    "individual-views",
+]
+RUN_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class CheckpointRun:
+    """
+    Phase outputs of a Hyperion run, kept under CHECKPOINT_ROOT/<run_id>/.
+
+    A new run gets a fresh id; passing the id of an earlier run resumes
+    it, replaying everything it completed. With `rerun_phase`, that phase
+    and all later ones are computed again on the stored earlier outputs.
+    """
+
+    def __init__(self, run_id=None, rerun_phase=None):
+        if run_id is not None and not RUN_ID.match(run_id):
+            raise ValueError(f"Invalid checkpoint id: {run_id!r}")
+        if rerun_phase is not None and rerun_phase not in PHASES:
+            raise ValueError(f"Unknown phase: {rerun_phase!r}")
+        self.resumed = run_id is not None
+        if self.resumed and not os.path.isdir(os.path.join(CHECKPOINT_ROOT, run_id)):
+            raise ValueError(f"No checkpoint {run_id}")
+        self.run_id = run_id or uuid.uuid4().hex
+        self.rerun_phase = rerun_phase
+        self.dir = os.path.join(CHECKPOINT_ROOT, self.run_id)
+
+    def child_env(self, env=None):
+        env = dict(env or os.environ)
+        env["HYPERION_CHECKPOINT_DIR"] = os.path.abspath(self.dir)
+        if self.rerun_phase:
+            env["HYPERION_CHECKPOINT_RERUN"] = self.rerun_phase
+        return env
+
+    def to_dict(self):
+        return {"run_id": self.run_id, "resumed": self.resumed,
+                "rerun_phase": self.rerun_phase, **checkpoint_info(self.run_id)}
+
+
+def checkpoint_info(run_id):
+    paths = glob.glob(os.path.join(CHECKPOINT_ROOT, run_id, "*.log"))
+    return {
+        "bytes": sum(os.path.getsize(p) for p in paths),
+        "updated": max((os.path.getmtime(p) for p in paths), default=None),
+    }
+
+
+def list_checkpoints():
+    if not os.path.isdir(CHECKPOINT_ROOT):
+        return []
+    runs = [{"run_id": run_id, **checkpoint_info(run_id)}
+            for run_id in os.listdir(CHECKPOINT_ROOT) if RUN_ID.match(run_id)]
+    return sorted(runs, key=lambda run: run["updated"] or 0, reverse=True)
+
+
+def delete_checkpoint(run_id):
+    path = os.path.join(CHECKPOINT_ROOT, run_id)
+    if not RUN_ID.match(run_id) or not os.path.isdir(path):
+        return False
+    shutil.rmtree(path)
+    return True
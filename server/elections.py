@@ -0,0 +1,73 @@
+import re
+import threading
+from . import storage, validation
+
+DEFAULT_ELECTION = "default"
+ELECTION_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class Election:
+    """
+    One election: its ballots, its last Hyperion run and whether a run
+    is in progress. Runs of different elections do not block each other.
+    """
+
+    def __init__(self, election_id, store=None):
+        self.election_id = election_id
+        self.store = store or storage.ElectionStore()
+        self.last_tally = None
+        self.last_bb = None
+        self.running = False
+
+    def summary(self):
+        return {
+            "election_id": self.election_id,
+            "ballots": len(self.store.BB),
+            "validation": validation.counts(self.store.BB),
+            "voters": len(self.store.secrets_store),
+            "tallied": self.last_tally is not None,
+            "running": self.running,
+        }
+
+
+ELECTIONS = {}  # election_id -> Election
+_lock = threading.Lock()
+
+
+def get_election(election_id=DEFAULT_ELECTION):
+    """
+    The election with this id, created on first use.
+    """
+    if not ELECTION_ID.match(election_id):
+        raise ValueError(f"Invalid election id: {election_id!r}")
+    with _lock:
+        election = ELECTIONS.get(election_id)
+        if election is None:
+            # The default election keeps the module-level store
+            store = storage.DEFAULT_STORE if election_id == DEFAULT_ELECTION else None
+            election = ELECTIONS[election_id] = Election(election_id, store)
+        return election
+
+
+def drop_election(election_id):
+    """
+    Forget an election and its ballots; False if it was not known or is running.
+    """
+    with _lock:
+        election = ELECTIONS.get(election_id)
+        if election is None or election.running:
+            return False
+        del ELECTIONS[election_id]
+    election.store.clear()
+    return True
+
+
+def list_elections():
+    with _lock:
+        return [e.summary() for e in ELECTIONS.values()]
+
+
+def reset():
+    with _lock:
+        ELECTIONS.clear()
+    storage.DEFAULT_STORE.clear()
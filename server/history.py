@@ -0,0 +1,82 @@
+import json
+import os
+import statistics
+import threading
+import time
+import uuid
+from .hyperion_runner import PHASES
+
+HISTORY_PATH = os.environ.get("HYPERION_HISTORY_PATH", "output/history.jsonl")
+# A phase regressed if it is this much slower than its baseline
+REGRESSION_TOLERANCE = 0.2
+# Earlier runs of the same configuration the baseline is the median of
+BASELINE_RUNS = 5
+
+_lock = threading.Lock()
+
+
+def record_run(params, result):
+    """
+    Append the timings and peak RSS of a finished run to the history file.
+    """
+    entry = {
+        "id": uuid.uuid4().hex,
+        "at": time.time(),
+        "params": {k: params.get(k) for k in ("voters", "tellers", "threshold", "max_votes")},
+        "timings": {p: result["timings"][p] for p in PHASES if p in result.get("timings", {})},
+        "peak_rss_mb": {p: m["peak_rss_mb"] for p, m in result.get("memory", {}).items() if p in PHASES},
+    }
+    with _lock:
+        os.makedirs(os.path.dirname(HISTORY_PATH) or ".", exist_ok=True)
+        with open(HISTORY_PATH, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+    return entry
+
+
+def load_history(limit=None):
+    """
+    Recorded runs, oldest first; the last `limit` only if given.
+    """
+    if not os.path.exists(HISTORY_PATH):
+        return []
+    runs = []
+    with _lock, open(HISTORY_PATH) as f:
+        for line in f:
+            try:
+                runs.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return runs[-limit:] if limit else runs
+
+
+def config_key(run):
+    params = run["params"]
+    return (params["voters"], params["tellers"], params["threshold"], params["max_votes"])
+
+
+def find_regressions(runs, tolerance=REGRESSION_TOLERANCE, baseline_runs=BASELINE_RUNS):
+    """
+    Add a `regressions` list to each run.
+
+    A phase regresses when it took more than (1 + tolerance) times the
+    median of the previous `baseline_runs` runs with the same parameters.
+    """
+    previous = {}
+    for run in runs:
+        earlier = previous.setdefault(config_key(run), [])
+        regressions = []
+        for phase, seconds in run["timings"].items():
+            values = [r["timings"][phase] for r in earlier[-baseline_runs:] if phase in r["timings"]]
+            if not values:
+                continue
+            baseline = statistics.median(values)
+            if baseline > 0 and seconds > baseline * (1 + tolerance):
+                regressions.append({
+                    "phase": phase,
+                    "seconds": seconds,
+                    "baseline": baseline,
+                    "change": seconds / baseline - 1,
+                })
+        run["regressions"] = regressions
+        earlier.append(run)
+    return runs
@@ -1,21 +1,166 @@
+import json
+import os
+import signal
 import subprocess
 import re
+import threading
+from contextlib import nullcontext
 
-def run_hyperion(voters=50, tellers=3, threshold=2, max_votes=2):
+# Protocol phases, in execution order, as printed in the timing table
+PHASES = [
+    'Setup',
+    'Voting (avg.)',
+    'Tallying (Mixing)',
+    'Tallying (Decryption)',
+    'Notification',
+    'Verification (avg.)',
+    'Coercion Mitigation',
+    'Individual Views',
+]
+
+# Prefix of the phase events hyperion_files/instrument.py writes to stderr
+EVENT_PREFIX = "@@hyperion-event "
+
+
+class RunCancelled(Exception):
+    pass
+
+
+def hyperion_cmd(voters, tellers, threshold, max_votes):
+    return ["python3", "hyperion/main.py", str(voters), str(tellers), str(threshold), "-maxv", str(max_votes)]
+
+def child_env(trace=None, profile=None, memory=None, cores=None, checkpoint=None, threshold=None):
     """
-    Run Hyperion main.py as subprocess and capture its console output.
+    Environment for the Hyperion subprocess, or None to inherit ours.
     """
-    cmd = ["python3", "hyperion/main.py", str(voters), str(tellers), str(threshold), "-maxv", str(max_votes)]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
+    env = trace.child_env() if trace else None
+    if profile:
+        env = profile.child_env(env)
+    if memory:
+        env = memory.child_env(env)
+    if checkpoint:
+        env = checkpoint.child_env(env)
+    if cores:
+        # Size of the run's shared worker pool and validation thread
+        # pool; see Teller.core_count and validation.WORKERS
+        env = dict(env if env is not None else os.environ)
+        env["HYPERION_CORES"] = str(cores)
+    if threshold:
+        # (k, n) of the teller key, for full decryption; see Teller.threshold
+        env = dict(env if env is not None else os.environ)
+        env["HYPERION_THRESHOLD"] = "%d,%d" % threshold
+    return env
 
-    output = proc.stdout
-    timings = parse_timings(output)
-    bb = parse_bulletin_board(output)
-    return {
+def collect_result(output, span, profile=None, memory=None, checkpoint=None):
+    """
+    Parse the console output and gather profiles and memory records.
+    """
+    with span("parse_timings"):
+        timings = parse_timings(output)
+    with span("parse_bulletin_board"):
+        bb = parse_bulletin_board(output)
+    result = {
         "raw_output": output,
         "timings": timings,
         "bulletin_board": bb,
     }
+    if profile:
+        with span("collect_profiles"):
+            result["profile"] = profile.collect()
+    if memory:
+        with span("collect_memory"):
+            result["memory"] = memory.collect()
+    if checkpoint:
+        result["checkpoint"] = checkpoint.to_dict()
+    return result
+
+def run_hyperion(voters=50, tellers=3, threshold=2, max_votes=2, trace=None, profile=None, memory=None, cores=None,
+                 checkpoint=None):
+    """
+    Run Hyperion main.py as subprocess and capture its console output.
+
+    When an enabled `trace` is given, the run and its parsing steps are
+    recorded as spans and the subprocess is told where to write its own.
+    When a `profile` run is given, the protocol processes are profiled and
+    the merged per-phase files are listed under "profile" in the result.
+    When a `memory` run is given, per-phase memory figures of all protocol
+    processes are returned under "memory".
+    `cores` caps the run's worker processes, shared by all its tellers,
+    and its validation threads. With a
+    `checkpoint` run, phase outputs are stored and earlier ones replayed.
+    """
+    def span(name, **args):
+        return trace.span(name, **args) if trace else nullcontext()
+
+    cmd = hyperion_cmd(voters, tellers, threshold, max_votes)
+    env = child_env(trace, profile, memory, cores, checkpoint, threshold=(threshold, tellers))
+    with span("run_hyperion", voters=voters, tellers=tellers, threshold=threshold, max_votes=max_votes):
+        with span("subprocess"):
+            proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+        return collect_result(proc.stdout, span, profile, memory, checkpoint)
+
+
+class HyperionProcess:
+    """
+    A cancellable Hyperion run that reports phase events as they happen.
+
+    `run` blocks like run_hyperion and returns the same result; call it
+    from a worker thread. `on_event` is called with each phase event
+    ({"phase": ..., "pid": ...}) the first time a process enters a phase.
+    `cancel` kills the protocol process together with its workers.
+    """
+
+    def __init__(self, voters=50, tellers=3, threshold=2, max_votes=2,
+                 profile=None, memory=None, on_event=None, cores=None, checkpoint=None):
+        self.cmd = hyperion_cmd(voters, tellers, threshold, max_votes)
+        self.threshold = (threshold, tellers)
+        self.profile = profile
+        self.memory = memory
+        self.cores = cores
+        self.checkpoint = checkpoint
+        self.on_event = on_event
+        self.proc = None
+        self.cancelled = False
+        self.stderr = []
+        self._lock = threading.Lock()
+
+    def run(self):
+        env = child_env(profile=self.profile, memory=self.memory, cores=self.cores,
+                        checkpoint=self.checkpoint, threshold=self.threshold) or dict(os.environ)
+        env["HYPERION_PHASE_EVENTS"] = "1"
+        with self._lock:
+            if self.cancelled:
+                raise RunCancelled()
+            # New session, so cancel can signal the workers as well
+            self.proc = subprocess.Popen(
+                self.cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, env=env, start_new_session=True,
+            )
+        reader = threading.Thread(target=self._read_events, daemon=True)
+        reader.start()
+        output = self.proc.stdout.read()
+        self.proc.wait()
+        reader.join()
+        if self.cancelled:
+            raise RunCancelled()
+        return collect_result(output, lambda name: nullcontext(), self.profile, self.memory, self.checkpoint)
+
+    def _read_events(self):
+        for line in self.proc.stderr:
+            if line.startswith(EVENT_PREFIX):
+                if self.on_event:
+                    self.on_event(json.loads(line[len(EVENT_PREFIX):]))
+            else:
+                self.stderr.append(line)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self.proc is not None and self.proc.poll() is None:
+                try:
+                    os.killpg(self.proc.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
 
 def parse_timings(text):
     """
@@ -70,16 +215,7 @@ def parse_timings(text):
     if data_parts and not data_parts[0]:
         data_parts = data_parts[1:]
     
-    expected_headers = [
-        'Setup',
-        'Voting (avg.)',
-        'Tallying (Mixing)',
-        'Tallying (Decryption)',
-        'Notification',
-        'Verification (avg.)',
-        'Coercion Mitigation',
-        'Individual Views',
-    ]
+    expected_headers = PHASES
     
     for i in range(min(len(data_parts), len(expected_headers))):
         if i < len(data_parts):
@@ -92,9 +228,31 @@ def parse_timings(text):
     
     return timings
 
+# Point fields of a vote cell; long integers may be wrapped across lines
+POINT_FIELD = re.compile(r"'(x|y)':\s*(-?[\d\s]+)")
+CURVE_FIELD = re.compile(r"'curve':\s*'([^']+)'")
+
+def bb_row(index, vote_str, commitment_str):
+    """
+    Structured bulletin board row, parsed once when the board is built.
+    """
+    coords = {name: int(re.sub(r"\s", "", value)) for name, value in POINT_FIELD.findall(vote_str)}
+    curve = CURVE_FIELD.search(vote_str)
+    return {
+        "index": index,
+        "vote": vote_str,
+        "x": coords.get("x"),
+        "y": coords.get("y"),
+        "curve": curve.group(1) if curve else None,
+        "commitment": commitment_str,
+    }
+
 def parse_bulletin_board(text):
     """
     Parse the ASCII Texttable printed by Hyperion main.py.
+
+    Each row holds the vote point (x, y, curve), the commitment, the
+    row's index on the board and the original vote string.
     """
     bb_data = []
     lines = text.split('\n')
@@ -109,10 +267,7 @@ def parse_bulletin_board(text):
                 vote_str = ' '.join(current_vote).strip()
                 commitment_str = ''.join(current_commitment).strip()
                 if "{'x':" in vote_str and "'curve':" in vote_str:
-                    bb_data.append({
-                        "vote": vote_str,
-                        "commitment": commitment_str,
-                    })
+                    bb_data.append(bb_row(len(bb_data), vote_str, commitment_str))
                 
                 current_vote = []
                 current_commitment = []
@@ -137,9 +292,6 @@ def parse_bulletin_board(text):
         vote_str = ' '.join(current_vote).strip()
         commitment_str = ''.join(current_commitment).strip()
         if "{'x':" in vote_str and "'curve':" in vote_str:
-            bb_data.append({
-                "vote": vote_str,
-                "commitment": commitment_str,
-            })
+            bb_data.append(bb_row(len(bb_data), vote_str, commitment_str))
     
     return bb_data
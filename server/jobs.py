@@ -0,0 +1,107 @@
+import asyncio
+import time
+import uuid
+from .hyperion_runner import PHASES, RunCancelled
+
+# Finished jobs kept for status queries
+MAX_JOBS = 100
+
+JOBS = {}  # job_id -> Job
+
+
+class Job:
+    """
+    A Hyperion run started through the job API.
+
+    Tracks the run's status (queued, running, done, failed, cancelled),
+    the phases the protocol has entered so far and, once done, its result.
+    """
+
+    def __init__(self, params, process, profile=None):
+        self.job_id = uuid.uuid4().hex
+        self.params = params
+        self.process = process
+        self.process.on_event = self.on_event
+        self.profile = profile
+        self.status = "queued"
+        self.phase = None
+        self.events = []
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.task = None
+        self.grant = None
+
+    def on_event(self, event):
+        # Called from the runner's reader thread; every process reports
+        # each phase, keep the first report only.
+        phase = event.get("phase")
+        if phase not in PHASES or any(e["phase"] == phase for e in self.events):
+            return
+        self.events.append({"phase": phase, "at": round(time.time() - self.created, 3)})
+        if self.phase is None or PHASES.index(phase) > PHASES.index(self.phase):
+            self.phase = phase
+
+    @property
+    def progress(self):
+        if self.status == "done":
+            return 1.0
+        if self.phase is None:
+            return 0.0
+        return PHASES.index(self.phase) / len(PHASES)
+
+    async def run(self, scheduler=None):
+        """
+        Run the process, first waiting for admission when a scheduler is given.
+        """
+        try:
+            if scheduler:
+                self.grant = await scheduler.acquire(self.params)
+                self.process.cores = self.grant.cores
+            self.status = "running"
+            self.result = await asyncio.to_thread(self.process.run)
+            self.status = "done"
+        except (RunCancelled, asyncio.CancelledError):
+            self.status = "cancelled"
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            if self.grant:
+                scheduler.release(self.grant)
+            self.finished = time.time()
+        return self.result
+
+    def cancel(self):
+        if self.status in ("queued", "running"):
+            self.process.cancel()
+        # Still waiting for admission: leave the queue
+        if self.status == "queued" and self.task:
+            self.task.cancel()
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "params": self.params,
+            "phase": self.phase,
+            "progress": round(self.progress, 3),
+            "events": list(self.events),
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished,
+            "grant": self.grant.to_dict() if self.grant else None,
+        }
+
+
+def add_job(job):
+    JOBS[job.job_id] = job
+    finished = [j for j in JOBS.values() if j.finished is not None]
+    for old in sorted(finished, key=lambda j: j.created)[:max(0, len(JOBS) - MAX_JOBS)]:
+        del JOBS[old.job_id]
+    return job
+
+
+def get_job(job_id):
+    return JOBS.get(job_id)
@@ -0,0 +1,78 @@
+import glob
+import json
+import os
+import shutil
+import tempfile
+
+MB = 1024 * 1024
+
+
+class MemoryRun:
+    """
+    Per-phase memory records collected from one Hyperion run.
+
+    The Hyperion process and each Teller worker write one JSON record into
+    `child_dir` when they exit; `collect` combines them per phase.
+    """
+
+    def __init__(self, tracemalloc=False):
+        self.tracemalloc = tracemalloc
+        self.child_dir = tempfile.mkdtemp(prefix="hyperion-memory-")
+
+    def child_env(self, env=None):
+        env = dict(env or os.environ)
+        env["HYPERION_MEMORY_DIR"] = self.child_dir
+        if self.tracemalloc:
+            env["HYPERION_TRACEMALLOC"] = "1"
+        return env
+
+    def collect(self):
+        records = []
+        for path in glob.glob(os.path.join(self.child_dir, "memory-*.json")):
+            with open(path) as f:
+                records.append(json.load(f))
+        shutil.rmtree(self.child_dir, ignore_errors=True)
+        return summarize(records)
+
+
+def summarize(records):
+    """
+    Combine per-process records into per-phase figures (in MB).
+
+    - peak_rss_mb: peak RSS of the largest single process in the phase
+    - total_rss_mb: sum of the per-process peaks, an upper bound for the
+      phase since forked workers share pages with the parent
+    - processes: number of processes that ran the phase
+    - traced_peak_mb / top_allocators: tracemalloc figures of the process
+      with the largest traced peak, when tracemalloc was enabled
+    """
+    phases = {}
+    for record in records:
+        for phase, stats in record["phases"].items():
+            summary = phases.setdefault(phase, {
+                "peak_rss_mb": 0.0,
+                "total_rss_mb": 0.0,
+                "processes": 0,
+            })
+            rss = stats["peak_rss"] / MB
+            summary["peak_rss_mb"] = max(summary["peak_rss_mb"], rss)
+            summary["total_rss_mb"] += rss
+            summary["processes"] += 1
+            if "traced_peak" not in stats:
+                continue
+            traced = stats["traced_peak"] / MB
+            if traced >= summary.get("traced_peak_mb", 0.0):
+                summary["traced_peak_mb"] = traced
+                summary["top_allocators"] = [
+                    {
+                        "where": top["where"],
+                        "size_mb": top["size"] / MB,
+                        "count": top["count"],
+                    }
+                    for top in stats.get("top", [])
+                ]
+    for summary in phases.values():
+        for key in ("peak_rss_mb", "total_rss_mb", "traced_peak_mb"):
+            if key in summary:
+                summary[key] = round(summary[key], 3)
+    return phases
@@ -0,0 +1,53 @@
+"""
+Encodings for the EC points on the bulletin board.
+
+Rows carry the vote point as integers (x, y, curve). Clients that only
+store or compare points can ask for the SEC1 compressed form instead,
+a hex string of one prefix byte and the x coordinate.
+"""
+
+ENCODINGS = ("json", "compressed")
+
+# Field element size in bytes per curve name as printed by Hyperion
+CURVE_BYTES = {
+    "P-256": 32,
+    "secp256k1": 32,
+    "P-384": 48,
+    "P-521": 66,
+}
+
+
+def coordinate_bytes(curve, x):
+    return CURVE_BYTES.get(curve) or max(1, (x.bit_length() + 7) // 8)
+
+
+def compress_point(x, y, curve):
+    """
+    SEC1 compressed encoding of (x, y) as hex, or None without both coordinates.
+    """
+    if x is None or y is None:
+        return None
+    prefix = b"\x03" if y & 1 else b"\x02"
+    return (prefix + x.to_bytes(coordinate_bytes(curve, x), "big")).hex()
+
+
+def encode_rows(rows, encoding="json"):
+    """
+    Bulletin board rows in the requested encoding.
+
+    "json" returns the rows as stored. "compressed" replaces the vote
+    string and coordinates with a single `point` field.
+    """
+    if encoding == "json":
+        return rows
+    if encoding == "compressed":
+        return [
+            {
+                "index": row.get("index"),
+                "curve": row.get("curve"),
+                "point": compress_point(row.get("x"), row.get("y"), row.get("curve")),
+                "commitment": row.get("commitment"),
+            }
+            for row in rows
+        ]
+    raise ValueError(f"Unknown encoding: {encoding}")
@@ -0,0 +1,82 @@
+import collections
+import glob
+import os
+import pstats
+import shutil
+import tempfile
+import uuid
+
+PROFILE_ROOT = os.environ.get("HYPERION_PROFILE_ROOT", "output/profiles")
+MODES = ("cprofile", "sampling")
+
+
+class ProfileRun:
+    """
+    Profiles collected from one Hyperion run.
+
+    The Hyperion process and its Teller workers each write one profile
+    per phase into `child_dir`; `collect` merges them into one file per
+    phase under PROFILE_ROOT/<run_id>/.
+    """
+
+    def __init__(self, mode):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.run_id = uuid.uuid4().hex
+        self.mode = mode
+        self.child_dir = tempfile.mkdtemp(prefix="hyperion-profile-")
+        self.out_dir = os.path.join(PROFILE_ROOT, self.run_id)
+
+    def child_env(self, env=None):
+        env = dict(env or os.environ)
+        env["HYPERION_PROFILE_DIR"] = self.child_dir
+        env["HYPERION_PROFILE_MODE"] = self.mode
+        return env
+
+    def collect(self):
+        """
+        Merge the per-process profiles and return {phase: file name}.
+        """
+        groups = collections.defaultdict(list)
+        for path in glob.glob(os.path.join(self.child_dir, "*.*.*")):
+            phase = os.path.basename(path).split(".")[0]
+            groups[phase].append(path)
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        files = {}
+        for phase, paths in sorted(groups.items()):
+            if self.mode == "cprofile":
+                name = f"{phase}.pstats"
+                pstats.Stats(*paths).dump_stats(os.path.join(self.out_dir, name))
+            else:
+                name = f"{phase}.collapsed"
+                merge_collapsed(paths, os.path.join(self.out_dir, name))
+            files[phase] = name
+        shutil.rmtree(self.child_dir, ignore_errors=True)
+        return files
+
+
+def merge_collapsed(paths, out_path):
+    """
+    Sum collapsed-stack files ("frame;frame;frame count" per line).
+    """
+    counts = collections.Counter()
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack:
+                    counts[stack] += int(count)
+    with open(out_path, "w") as f:
+        for stack, count in counts.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def profile_path(run_id, name):
+    """
+    Path of a collected profile file, or None if there is no such file.
+    """
+    if os.path.basename(run_id) != run_id or os.path.basename(name) != name:
+        return None
+    path = os.path.join(PROFILE_ROOT, run_id, name)
+    return path if os.path.isfile(path) else None
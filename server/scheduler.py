@@ -0,0 +1,132 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+
+# Budget shared by all protocol runs on this machine
+CORE_BUDGET = int(os.environ.get("HYPERION_CORE_BUDGET", "0")) or os.cpu_count() or 1
+MEMORY_BUDGET_MB = int(os.environ.get("HYPERION_MEMORY_BUDGET_MB", "0"))
+
+# Every teller raises h and decrypts every ballot, so a run's work grows
+# with voters times tellers: one core per this many ballot-teller pairs
+# (500 voters at 3 tellers), up to the whole budget
+BALLOTS_PER_CORE = 1500
+# Rough peak RSS of a run: base, per pool worker, and per ballot and teller
+BASE_MB = 150
+WORKER_MB = 40
+MB_PER_BALLOT = 0.05
+
+# Runs up to this size are interactive and go ahead of larger ones
+INTERACTIVE_VOTERS = 500
+INTERACTIVE, BATCH = 0, 10
+
+
+def physical_memory_mb():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2**20
+    except (ValueError, OSError, AttributeError):
+        return 0
+
+
+class Grant:
+    """
+    Cores and memory reserved for one run until it is released.
+    """
+
+    def __init__(self, cores, memory_mb, priority):
+        self.cores = cores
+        self.memory_mb = memory_mb
+        self.priority = priority
+
+    def to_dict(self):
+        return {"cores": self.cores, "memory_mb": self.memory_mb, "priority": self.priority}
+
+
+class Scheduler:
+    """
+    Admits protocol runs against a machine-wide core and memory budget.
+
+    Each run gets a core allotment sized to its voters and tellers, which
+    the Hyperion process uses for its one worker pool, shared by all its
+    tellers, and its validation threads instead of one worker per CPU. Runs that do not
+    fit wait in a queue ordered by priority (lower first), then arrival;
+    by default small runs are interactive and overtake large sweeps.
+    """
+
+    def __init__(self, cores=CORE_BUDGET, memory_mb=None):
+        self.cores = cores
+        self.memory_mb = physical_memory_mb() if memory_mb is None else memory_mb
+        self.used_cores = 0
+        self.used_memory_mb = 0
+        self.running = []
+        self._queue = []  # (priority, seq, grant, future)
+        self._seq = itertools.count()
+
+    def plan(self, params):
+        """
+        Grant the run described by `params` would get.
+        """
+        voters = params.get("voters", 50)
+        tellers = params.get("tellers", 3)
+        cores = min(self.cores, max(1, math.ceil(voters * tellers / BALLOTS_PER_CORE)))
+        memory_mb = math.ceil(BASE_MB + cores * WORKER_MB + voters * tellers * MB_PER_BALLOT)
+        if self.memory_mb:
+            memory_mb = min(memory_mb, self.memory_mb)
+        priority = params.get("priority")
+        if priority is None:
+            priority = INTERACTIVE if voters <= INTERACTIVE_VOTERS else BATCH
+        return Grant(cores, memory_mb, priority)
+
+    def fits(self, grant):
+        if self.used_cores + grant.cores > self.cores:
+            return False
+        return not self.memory_mb or self.used_memory_mb + grant.memory_mb <= self.memory_mb
+
+    async def acquire(self, params):
+        """
+        Wait until the run fits the budget and reserve its share.
+        """
+        grant = self.plan(params)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (grant.priority, next(self._seq), grant, future))
+        self._admit()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(grant)
+            else:
+                self._queue = [entry for entry in self._queue if entry[3] is not future]
+                heapq.heapify(self._queue)
+                self._admit()
+            raise
+
+    def release(self, grant):
+        if grant in self.running:
+            self.running.remove(grant)
+            self.used_cores -= grant.cores
+            self.used_memory_mb -= grant.memory_mb
+        self._admit()
+
+    def _admit(self):
+        # Strictly in queue order, so a large run at the head is not
+        # starved by smaller ones of the same priority behind it.
+        while self._queue and self.fits(self._queue[0][2]):
+            _, _, grant, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self.running.append(grant)
+            self.used_cores += grant.cores
+            self.used_memory_mb += grant.memory_mb
+            future.set_result(grant)
+
+    def to_dict(self):
+        return {
+            "cores": self.cores,
+            "memory_mb": self.memory_mb,
+            "used_cores": self.used_cores,
+            "used_memory_mb": self.used_memory_mb,
+            "running": [g.to_dict() for g in self.running],
+            "queued": [grant.to_dict() for _, _, grant, _ in sorted(self._queue, key=lambda e: e[:2])],
+        }
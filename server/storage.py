@@ -1,34 +1,71 @@
-import uuid, random
-
-BB = []             # Bulletin board
-secrets_store = {}  # voter_id -> {h, g_r?}
-
-def register_voter(voter_id: str, h: str):
-    secrets_store[voter_id] = {"h":h}
-
-def cast_ballot(voter_id: str, h: str, enc_vote: str, signed_ballot: str):
-    row = {
-        "row_id": str(uuid.uuid4()),
-        "voter_id": voter_id,
-        "h": h,
-        "enc_vote": enc_vote,
-        "signed_ballot": signed_ballot,
-    }
-    BB.append(row)
-    return row
-
-def get_bb():
-    return BB
-
-def run_tally():
-    random.shuffle(BB)
-    tally = []
-    for row in BB:
-        plaintext = row["enc_vote"]
-        g_r = f"g_r_{row['row_id']}"
-        secrets_store[row["voter_id"]]["g_r"] = g_r
-        tally.append({"row_id": row["row_id"], "vote": plaintext, "h_r": g_r})
-    return tally
-
-def get_notify(voter_id: str):
-    return secrets_store.get(voter_id)
\ No newline at end of file
+import uuid, threading
+
+class ElectionStore:
+    """
+    Ballots and voter secrets of one election.
+
+    Writes take the store's lock, so several elections (and background
+    workers) can ingest at the same time without sharing a lock.
+    """
+    def __init__(self):
+        self.BB = []             # Bulletin board, append-only
+        self.BB_INDEX = {}       # row_id -> position in BB
+        self.secrets_store = {}  # voter_id -> {h, pk_voter, g_r?}
+        self.lock = threading.Lock()
+
+    def clear(self):
+        with self.lock:
+            self.BB.clear()
+            self.BB_INDEX.clear()
+            self.secrets_store.clear()
+
+    def register_voter(self, voter_id: str, h: str, pk_voter: str = ""):
+        with self.lock:
+            self.secrets_store[voter_id] = {"h":h, "pk_voter": pk_voter}
+
+    def cast_ballot(self, voter_id: str, h: str, enc_vote: str, signed_ballot: str, proofs: str = ""):
+        with self.lock:
+            row = {
+                "row_id": str(uuid.uuid4()),
+                "voter_id": voter_id,
+                "h": h,
+                "enc_vote": enc_vote,
+                "signed_ballot": signed_ballot,
+                "proofs": proofs,
+                "seq": len(self.BB),
+            }
+            self.BB.append(row)
+            self.BB_INDEX[row["row_id"]] = row["seq"]
+        return row
+
+    def get_bb(self):
+        return self.BB
+
+    def get_bb_since(self, since=0, limit=None):
+        """
+        Rows appended at or after position `since`.
+        """
+        end = None if limit is None else since + limit
+        return self.BB[since:end]
+
+    def find_ballot(self, row_id: str):
+        pos = self.BB_INDEX.get(row_id)
+        if pos is None or pos >= len(self.BB) or self.BB[pos]["row_id"] != row_id:
+            return None
+        return self.BB[pos]
+
+    def get_notify(self, voter_id: str):
+        return self.secrets_store.get(voter_id)
+
+# Store of the default election, also used by the module-level helpers
+DEFAULT_STORE = ElectionStore()
+BB = DEFAULT_STORE.BB
+BB_INDEX = DEFAULT_STORE.BB_INDEX
+secrets_store = DEFAULT_STORE.secrets_store
+
+register_voter = DEFAULT_STORE.register_voter
+cast_ballot = DEFAULT_STORE.cast_ballot
+get_bb = DEFAULT_STORE.get_bb
+get_bb_since = DEFAULT_STORE.get_bb_since
+find_ballot = DEFAULT_STORE.find_ballot
+get_notify = DEFAULT_STORE.get_notify
@@ -0,0 +1,128 @@
+import glob
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+TRACE_ROOT = os.environ.get("HYPERION_TRACE_ROOT", "output/traces")
+# Trace every request instead of only runs that ask for it.
+TRACE_ALL = os.environ.get("HYPERION_TRACE") == "1"
+
+# Lane used for the per-phase spans derived from the protocol events.
+PHASE_TID = 0
+
+
+def _now_us():
+    return time.monotonic_ns() // 1000
+
+
+class Trace:
+    """
+    Collects spans for one request and the Hyperion run it triggers.
+
+    Server spans are kept in memory. The Hyperion subprocess and its
+    workers write their own events into `child_dir`, which is merged in
+    by `export`.
+    """
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.enabled = False
+        self.events = []
+        self.child_dir = None
+        self.path = os.path.join(TRACE_ROOT, f"{self.trace_id}.json")
+        self._lock = threading.Lock()
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            self.child_dir = tempfile.mkdtemp(prefix="hyperion-trace-")
+        return self.path
+
+    @contextmanager
+    def span(self, name, **args):
+        start = _now_us()
+        try:
+            yield
+        finally:
+            event = {
+                "name": name,
+                "cat": "server",
+                "ph": "X",
+                "ts": start,
+                "dur": _now_us() - start,
+                "pid": os.getpid(),
+                "tid": threading.get_native_id(),
+                "args": args,
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def child_env(self, env=None):
+        """
+        Environment for the Hyperion subprocess, unchanged when disabled.
+        """
+        if not self.enabled:
+            return env
+        env = dict(env or os.environ)
+        env["HYPERION_TRACE_DIR"] = self.child_dir
+        return env
+
+    def export(self):
+        """
+        Merge server and subprocess events into one Chrome trace file.
+        """
+        events = list(self.events)
+        for path in glob.glob(os.path.join(self.child_dir, "trace-*.jsonl")):
+            with open(path) as f:
+                events.extend(json.loads(line) for line in f if line.strip())
+        events.extend(phase_spans(events))
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        shutil.rmtree(self.child_dir, ignore_errors=True)
+        return self.path
+
+
+def phase_spans(events):
+    """
+    Build one span per protocol phase covering all spans tagged with it.
+    """
+    bounds = {}
+    for event in events:
+        phase = event.get("args", {}).get("phase")
+        if phase is None or event.get("ph") != "X":
+            continue
+        start, end = event["ts"], event["ts"] + event["dur"]
+        if phase in bounds:
+            start = min(start, bounds[phase][0])
+            end = max(end, bounds[phase][1])
+        bounds[phase] = (start, end)
+
+    pid = os.getpid()
+    spans = [
+        {
+            "name": "thread_name",
+            "ph": "M",
+            "pid": pid,
+            "tid": PHASE_TID,
+            "args": {"name": "Hyperion phases"},
+        }
+    ]
+    for phase, (start, end) in sorted(bounds.items(), key=lambda b: b[1][0]):
+        spans.append({
+            "name": phase,
+            "cat": "phase",
+            "ph": "X",
+            "ts": start,
+            "dur": end - start,
+            "pid": pid,
+            "tid": PHASE_TID,
+            "args": {},
+        })
+    return spans
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import ECC
+from Crypto.Signature import DSS
+
+WORKERS = int(os.environ.get("HYPERION_VALIDATE_WORKERS", "0")) or os.cpu_count() or 1
+
+PENDING = "pending"
+VALID = "valid"
+INVALID = "invalid"
+
+# Voter keys and trapdoor commitments are P-256 points, hex encoded in
+# compressed SEC1 form; client/voter.py builds ballots in the same encoding.
+CURVE = "P-256"
+_G = ECC._curves[CURVE].G
+_ORDER = int(ECC._curves[CURVE].order)
+_SCALAR_BYTES = 32
+
+
+def ballot_message(voter_id, h, enc_vote, proofs):
+    """
+    Bytes a voter signs: the ballot's fields, each length prefixed.
+    """
+    out = bytearray(b"hyperion-ballot")
+    for field in (voter_id, h, enc_vote, proofs):
+        data = field.encode()
+        out += len(data).to_bytes(4, "big") + data
+    return bytes(out)
+
+
+def trapdoor_challenge(h, commitment, voter_id, enc_vote):
+    """
+    Fiat-Shamir challenge of the proof of knowledge of a ballot's trapdoor.
+    """
+    message = b"hyperion-trapdoor" + ballot_message(voter_id, h, enc_vote, commitment)
+    digest = hashlib.sha256(message).digest()
+    return int.from_bytes(digest, "big") % _ORDER
+
+
+def _point(hex_value):
+    return ECC.import_key(bytes.fromhex(hex_value), curve_name=CURVE).pointQ
+
+
+def check_signature(pk_voter, row, proofs):
+    """
+    ECDSA signature of the ballot under the voter's registered key.
+    """
+    try:
+        key = ECC.import_key(bytes.fromhex(pk_voter), curve_name=CURVE)
+        message = ballot_message(row["voter_id"], row["h"], row["enc_vote"], proofs)
+        DSS.new(key, "fips-186-3").verify(SHA256.new(message), bytes.fromhex(row["signed_ballot"]))
+    except ValueError:
+        return False
+    return True
+
+
+def check_trapdoor_proof(row, proofs):
+    """
+    Schnorr proof that the voter knows x with h = x*G, bound to the ballot.
+    """
+    try:
+        h = _point(row["h"])
+        raw = bytes.fromhex(proofs)
+        commitment = raw[:-_SCALAR_BYTES].hex()
+        z = int.from_bytes(raw[-_SCALAR_BYTES:], "big")
+        r = _point(commitment)
+    except ValueError:
+        return False
+    if not 0 < z < _ORDER:
+        return False
+    c = trapdoor_challenge(row["h"], commitment, row["voter_id"], row["enc_vote"])
+    return _G * z == r + h * c
+
+
+def check_ballot(store, row):
+    """
+    Checks of a cast ballot against the election's registrations.
+
+    Returns None if the ballot is valid, else the reason it is not.
+    """
+    voter = store.secrets_store.get(row["voter_id"])
+    if voter is None:
+        return "voter not registered"
+    if voter["h"] != row["h"]:
+        return "trapdoor commitment does not match registration"
+    if not row["signed_ballot"]:
+        return "missing signature"
+    if not row["enc_vote"]:
+        return "missing vote"
+    proofs = row.get("proofs", "")
+    if not check_signature(voter.get("pk_voter", ""), row, proofs):
+        return "invalid signature"
+    if not check_trapdoor_proof(row, proofs):
+        return "invalid trapdoor proof"
+    return None
+
+
+class ValidationPipeline:
+    """
+    Validates cast ballots on a worker pool as they arrive.
+
+    Each row's `status` goes from pending to valid or invalid (with a
+    `reason`), so a tally only has to wait for ballots still in flight
+    instead of verifying the whole board at once.
+    """
+
+    def __init__(self, check=check_ballot, workers=WORKERS):
+        self.check = check
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="validate")
+        self._futures = set()
+        self._lock = threading.Lock()
+
+    def submit(self, store, row):
+        row["status"] = PENDING
+        future = self.pool.submit(self._validate, store, row)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _validate(self, store, row):
+        reason = self.check(store, row)
+        with store.lock:
+            row["status"] = VALID if reason is None else INVALID
+            if reason is not None:
+                row["reason"] = reason
+
+    def _done(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def drain(self, timeout=None):
+        """
+        Wait for all ballots submitted so far.
+        """
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.result(timeout=timeout)
+
+
+def counts(rows):
+    """
+    Number of rows per validation status.
+    """
+    result = {PENDING: 0, VALID: 0, INVALID: 0}
+    for row in rows:
+        status = row.get("status")
+        if status in result:
+            result[status] += 1
+    return result
@@ -65,8 +65,12 @@ fi
 # --- Add Hyperion repo to PYTHONPATH ---
 export PYTHONPATH="$HYPERION_DIR:$PYTHONPATH"
 
-# Replace parties.py in hyperion with the one in the hyperion_files directory
-cp "$MY_PROJECT_DIR/hyperion_files/parties.py" "$HYPERION_DIR/parties.py"
+# Replace parties.py in hyperion with the one in the hyperion_files directory,
+# together with the helper modules it imports
+cp "$MY_PROJECT_DIR"/hyperion_files/*.py "$HYPERION_DIR/"
+
+# Start the tellers' per-chunk processes in main.py on their worker pools
+python "$MY_PROJECT_DIR/scripts/patch_main.py" "$HYPERION_DIR/main.py"
 
 echo
 echo "[INFO] Setup complete."
@@ -5,34 +5,38 @@ import os
 
 # Add the project root to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# The Hyperion modules import each other by top-level name, as they do
+# once copied into hyperion/; upstream modules come from hyperion/ itself
+sys.path.insert(1, os.path.join(os.path.dirname(__file__), '..', 'hyperion_files'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'hyperion'))
 
 from server.app import app
-from server import storage
+from server import storage, elections
 
 @pytest.fixture
 def client():
     """Create a test client for the FastAPI app."""
     return TestClient(app)
 
+@pytest.fixture(autouse=True)
+def history_file(tmp_path, monkeypatch):
+    """Keep run history written by tests out of the output directory."""
+    from server import history
+    path = tmp_path / "history.jsonl"
+    monkeypatch.setattr(history, "HISTORY_PATH", str(path))
+    return path
+
 @pytest.fixture(autouse=True)
 def reset_storage():
-    """Reset storage and app state before each test."""
-    storage.BB.clear()
-    storage.secrets_store.clear()
-    
-    # Reset app globals
-    import server.app as server_app
-    server_app.LAST_TALLY = None
-    server_app.LAST_BB = None
-    server_app.RUNNING = False
-    
+    """Reset storage and election state before each test."""
+    elections.reset()
     yield
-    
-    storage.BB.clear()
-    storage.secrets_store.clear()
-    server_app.LAST_TALLY = None
-    server_app.LAST_BB = None
-    server_app.RUNNING = False
+    elections.reset()
+
+@pytest.fixture
+def election():
+    """The default election, as used by the top-level endpoints."""
+    return elections.get_election()
 
 @pytest.fixture
 def sample_voter_data():
@@ -0,0 +1,111 @@
+import asyncio
+import csv
+import functools
+import json
+
+import httpx
+import pytest
+
+from client import admin
+from client.admin import AdminClient
+from client.utils import ApiClient
+
+
+def job_result(params):
+    """A finished job whose timings grow with the voters; memory only for some runs."""
+    result = {"timings": {"Setup": params["voters"] / 1000}, "tally": [], "raw_output": ""}
+    if params["voters"] >= 100:
+        result["memory"] = {"Setup": {"peak_rss_mb": params["voters"] / 10}}
+    return {"status": "done", "progress": 1.0, "phase": None, "result": result}
+
+
+class JobServer:
+    """MockTransport handler for /jobs: busy for the first `busy` starts."""
+
+    def __init__(self, busy=0):
+        self.busy = busy
+        self.jobs = {}
+        self.starts = 0
+
+    async def __call__(self, request):
+        if request.method == "POST":
+            self.starts += 1
+            if self.busy:
+                self.busy -= 1
+                return httpx.Response(409, json={"detail": "Hyperion run already in progress"})
+            params = json.loads(request.content)
+            job_id = f"job-{len(self.jobs)}"
+            self.jobs[job_id] = params
+            return httpx.Response(200, json={"status": "ok", "job_id": job_id})
+        job_id = request.url.path.rsplit("/", 1)[1]
+        params = self.jobs[job_id]
+        # Smaller runs finish later, so jobs end out of submission order
+        await asyncio.sleep(0.01 * (300 - params["voters"]) / 100)
+        return httpx.Response(200, json={"job_id": job_id, **job_result(params)})
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """A JobServer behind every ApiClient the sweep opens."""
+    server = JobServer()
+    monkeypatch.setattr(admin, "ApiClient", functools.partial(ApiClient, transport=httpx.MockTransport(server)))
+    monkeypatch.setattr(admin, "BUSY_RETRY", 0)
+    return server
+
+
+class TestRunJob:
+    """Test cases for run_job."""
+
+    def test_retries_while_busy(self, server):
+        """Test a 409 from a busy server is retried until the job starts."""
+        server.busy = 2
+
+        async def scenario():
+            async with admin.ApiClient(base_url="http://test") as api:
+                return await admin.run_job(AdminClient(api), {"voters": 50}, quiet=True, interval=0)
+
+        job = asyncio.run(scenario())
+
+        assert job["status"] == "done"
+        assert server.starts == 3
+
+    def test_other_errors_raised(self):
+        """Test errors other than 409 are not retried."""
+        def handler(request):
+            return httpx.Response(422, json={"detail": "bad"})
+
+        async def scenario():
+            async with ApiClient(base_url="http://test", transport=httpx.MockTransport(handler)) as api:
+                return await admin.run_job(AdminClient(api), {"voters": 50}, quiet=True)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(scenario())
+
+
+class TestSweep:
+    """Test cases for sweep and its CSV export."""
+
+    def configs(self):
+        return admin.run_configs([50, 100, 200], [3], [2], [2])
+
+    def test_rows_in_config_order(self, server):
+        """Test rows follow the configs even when parallel jobs finish out of order."""
+        rows = asyncio.run(admin.sweep(["http://test"], self.configs(), {}, quiet=True, parallel=3))
+
+        assert [row["voters"] for row in rows] == [50, 100, 200]
+        assert [row["Setup"] for row in rows] == [0.05, 0.1, 0.2]
+        assert all(row["status"] == "done" for row in rows)
+
+    def test_csv_columns_are_the_union(self, server, tmp_path):
+        """Test the CSV has every row's columns, first seen first, with gaps left empty."""
+        rows = asyncio.run(admin.sweep(["http://test"], self.configs(), {}, quiet=True))
+        path = tmp_path / "timings.csv"
+
+        admin.write_csv(rows, path)
+
+        with open(path, newline="") as f:
+            reader = csv.DictReader(f)
+            exported = list(reader)
+        assert reader.fieldnames[:7] == ["server", "job_id", "status", "voters", "tellers", "threshold", "max_votes"]
+        assert reader.fieldnames.index("Setup") < reader.fieldnames.index("Setup peak_rss_mb")
+        assert [row["Setup peak_rss_mb"] for row in exported] == ["", "10.0", "20.0"]
@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+import pytest
+
+from client import loadtest
+from client.loadtest import LoadStats, check_gates, percentile
+
+
+def server(request):
+    """Voter endpoints that work, except /notify, which fails."""
+    if request.url.path.startswith("/notify"):
+        return httpx.Response(500, json={"detail": "boom"})
+    return httpx.Response(200, json={"status": "ok", "row_id": "r"})
+
+
+def report(p99_ms=10.0, errors=0, requests=100):
+    """A load report with one endpoint."""
+    stats = LoadStats()
+    for i in range(requests):
+        status = 500 if i < errors else 200
+        stats.record("POST /cast", p99_ms / 1000 if i == requests - 1 else 0.001, status)
+    return stats.report(1.0)
+
+
+class TestPercentile:
+    """Test cases for the nearest-rank percentile."""
+
+    def test_nearest_rank(self):
+        """Test percentiles pick the value at the rounded-up rank."""
+        values = list(range(1, 101))
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile(values, 100) == 100
+
+    def test_small_samples(self):
+        """Test few samples round up to an existing value."""
+        assert percentile([3, 7], 50) == 3
+        assert percentile([3, 7], 99) == 7
+        assert percentile([5], 1) == 5
+        assert percentile([], 50) is None
+
+
+class TestGates:
+    """Test cases for check_gates."""
+
+    def test_passing_run(self):
+        """Test a run within both gates has no failures."""
+        assert check_gates(report(p99_ms=10.0), max_p99_ms=50, max_error_rate=0.01) == []
+
+    def test_slow_endpoint(self):
+        """Test an endpoint over the p99 gate is reported."""
+        failures = check_gates(report(p99_ms=10.0, requests=50), max_p99_ms=5)
+
+        assert failures == ["POST /cast: p99 10.0 ms > 5 ms"]
+
+    def test_error_rate(self):
+        """Test an overall error rate over the gate is reported."""
+        failures = check_gates(report(errors=5), max_error_rate=0.01)
+
+        assert failures == ["error rate 0.050 > 0.01"]
+
+    def test_no_gates(self):
+        """Test nothing fails without gates."""
+        assert check_gates(report(errors=50)) == []
+
+
+class TestRunLoad:
+    """Test cases for run_load against a mock server."""
+
+    def test_report(self):
+        """Test every voter's calls are timed per endpoint, with failures counted."""
+        result = asyncio.run(loadtest.run_load(
+            server="http://test", voters=5, rate=0, concurrency=2,
+            transport=httpx.MockTransport(server),
+        ))
+
+        endpoints = result["endpoints"]
+        assert set(endpoints) == {"POST /register", "POST /cast", "GET /notify"}
+        assert endpoints["POST /cast"]["statuses"] == {"200": 5}
+        assert endpoints["GET /notify"]["errors"] == 5
+        assert result["requests"] == 15
+        assert result["error_rate"] == pytest.approx(5 / 15)
+        assert check_gates(result, max_error_rate=0.1) == ["error rate 0.333 > 0.1"]
@@ -0,0 +1,145 @@
+import asyncio
+
+import httpx
+import pytest
+
+from client import utils
+from client.utils import ApiClient
+
+
+class Server:
+    """MockTransport handler answering with a scripted list of outcomes."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json={"status": outcome})
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays, recorded instead of slept, without jitter."""
+    delays = []
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr(utils.asyncio, "sleep", sleep)
+    monkeypatch.setattr(utils.random, "uniform", lambda low, high: 1.0)
+    return delays
+
+
+def call(server, method="GET", **kwargs):
+    """One request through an ApiClient on the mock server."""
+    async def scenario():
+        async with ApiClient(base_url="http://test", transport=httpx.MockTransport(server), **kwargs) as api:
+            return await api.request(method, "/path")
+
+    return asyncio.run(scenario())
+
+
+def refused():
+    return httpx.ConnectError("refused")
+
+
+class TestRetry:
+    """Test cases for ApiClient retries and backoff."""
+
+    def test_connect_errors_back_off(self, sleeps):
+        """Test connection failures are retried with doubling delays."""
+        server = Server(refused(), refused(), 200)
+
+        response = call(server, backoff=0.2)
+
+        assert response.status_code == 200
+        assert len(server.requests) == 3
+        assert sleeps == [0.2, 0.4]
+
+    def test_connect_errors_retried_for_post(self, sleeps):
+        """Test a POST that never reached the server is sent again."""
+        server = Server(refused(), 200)
+
+        assert call(server, "POST").status_code == 200
+        assert len(server.requests) == 2
+
+    def test_gateway_error_retried_when_idempotent(self, sleeps):
+        """Test a 503 on GET is retried."""
+        server = Server(503, 200)
+
+        assert call(server).status_code == 200
+        assert len(server.requests) == 2
+
+    def test_gateway_error_returned_for_post(self, sleeps):
+        """Test a 503 on POST is returned without retrying."""
+        server = Server(503, 200)
+
+        assert call(server, "POST").status_code == 503
+        assert len(server.requests) == 1
+        assert sleeps == []
+
+    def test_read_error_raised_for_post(self, sleeps):
+        """Test a transport error after sending a POST is not retried."""
+        server = Server(httpx.ReadError("reset"), 200)
+
+        with pytest.raises(httpx.ReadError):
+            call(server, "POST")
+        assert len(server.requests) == 1
+
+    def test_gives_up_after_retries(self, sleeps):
+        """Test the last gateway error is returned once retries run out."""
+        server = Server(503)
+
+        assert call(server, retries=2).status_code == 503
+        assert len(server.requests) == 3
+        assert len(sleeps) == 2
+
+    def test_last_connect_error_raised(self, sleeps):
+        """Test a server that stays unreachable raises after the retries."""
+        server = Server(refused())
+
+        with pytest.raises(httpx.ConnectError):
+            call(server, retries=1)
+        assert len(server.requests) == 2
+
+
+class TestEventLoops:
+    """Test cases for ApiClient across event loops."""
+
+    def test_old_client_closed_on_new_loop(self):
+        """Test the client of a finished loop is closed when another loop takes over."""
+        api = ApiClient(base_url="http://test", transport=httpx.MockTransport(Server(200)))
+
+        async def fetch():
+            await api.get("/path")
+            return api._client
+
+        first = asyncio.run(fetch())
+        second = asyncio.run(fetch())
+
+        assert second is not first
+        assert first.is_closed
+        assert not second.is_closed
+        asyncio.run(api.aclose())
+        assert second.is_closed
+
+    def test_same_loop_reuses_client(self):
+        """Test calls on one loop share one client."""
+        api = ApiClient(base_url="http://test", transport=httpx.MockTransport(Server(200)))
+
+        async def scenario():
+            await api.get("/a")
+            first = api._client
+            await api.get("/b")
+            await api.aclose()
+            return first, api._client
+
+        first, after = asyncio.run(scenario())
+
+        assert first.is_closed
+        assert after is None
@@ -0,0 +1,61 @@
+import asyncio
+
+from client.voter import BallotCache
+
+
+class Board:
+    """Stand-in for VoterClient.get_ballots over `count` ballots."""
+
+    def __init__(self, count, max_limit=None):
+        self.rows = [{"row_id": f"r{i}", "seq": i} for i in range(count)]
+        self.max_limit = max_limit
+        self.calls = []
+
+    async def get_ballots(self, cursor, limit):
+        self.calls.append((cursor, limit))
+        if self.max_limit:
+            limit = min(limit, self.max_limit)
+        page = self.rows[cursor:cursor + limit]
+        return {"status": "ok", "ballots": page,
+                "cursor": cursor + len(page), "total": len(self.rows)}
+
+
+def page(cache, board, offset, limit):
+    return asyncio.run(cache.page(board, offset, limit))
+
+
+class TestBallotCachePage:
+    def test_offset_past_cursor(self):
+        """A window past the cursor is synced up to and served exactly."""
+        cache, board = BallotCache(), Board(50)
+        res = page(cache, board, 20, 10)
+        assert [row["seq"] for row in res["ballots"]] == list(range(20, 30))
+        assert res["cursor"] == 30
+        assert res["total"] == 50
+        assert cache.find("r25") == 25
+
+    def test_short_server_pages(self):
+        """Syncing continues while the server caps the page size."""
+        cache, board = BallotCache(), Board(50, max_limit=4)
+        res = page(cache, board, 10, 5)
+        assert [row["seq"] for row in res["ballots"]] == list(range(10, 15))
+        assert cache.cursor == 15
+
+    def test_cached_window(self):
+        """A window already synced is served without a request."""
+        cache, board = BallotCache(), Board(50)
+        page(cache, board, 0, 30)
+        calls = len(board.calls)
+        res = page(cache, board, 5, 10)
+        assert [row["seq"] for row in res["ballots"]] == list(range(5, 15))
+        assert len(board.calls) == calls
+
+    def test_end_of_board(self):
+        """A window past the last ballot returns what exists and stops."""
+        cache, board = BallotCache(), Board(12)
+        res = page(cache, board, 10, 10)
+        assert [row["seq"] for row in res["ballots"]] == [10, 11]
+        assert res["cursor"] == 12
+        assert res["total"] == 12
+        res = page(cache, board, 20, 10)
+        assert res["ballots"] == []
@@ -0,0 +1,92 @@
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+from Crypto.PublicKey import ECC
+
+from arena import PointArena
+
+G = ECC._curves["P-256"].G
+
+
+def double_slots(task):
+    """Worker: write 2 * the first point of each input slot to the output."""
+    inputs, outputs, slots = task
+    try:
+        for slot in slots:
+            point, = inputs.read(slot, 1)
+            outputs.write(slot, [point + point])
+    finally:
+        inputs.close()
+        outputs.close()
+    return len(slots)
+
+
+def fail(task):
+    """Worker: read the arena, then raise."""
+    inputs, = task
+    inputs.read(0)
+    raise ValueError("worker failed")
+
+
+@pytest.fixture
+def fork_pool():
+    """Two forked workers, as a TellerPool uses."""
+    pool = multiprocessing.get_context("fork").Pool(2)
+    yield pool
+    pool.terminate()
+    pool.join()
+
+
+class TestPointArena:
+    """Test cases for PointArena."""
+
+    def test_round_trip(self):
+        """Test points read back as written, slot by slot."""
+        points = [[G * k, G * (k + 1)] for k in range(1, 5)]
+        with PointArena(len(points), width=2) as arena:
+            for i, pair in enumerate(points):
+                arena.write(i, pair)
+
+            assert [arena.read(i) for i in range(len(points))] == points
+            assert arena.read(2, 1) == [points[2][0]]
+            assert arena.read_xy(0) == [(int(p.x), int(p.y)) for p in points[0]]
+
+    def test_infinity(self):
+        """Test the point at infinity survives the arena."""
+        with PointArena(1) as arena:
+            arena.write(0, [G * 0])
+
+            assert arena.read(0)[0].is_point_at_infinity()
+
+    def test_index_out_of_range(self):
+        """Test slots outside the arena are rejected."""
+        with PointArena(2) as arena:
+            with pytest.raises(IndexError):
+                arena.read(2)
+            with pytest.raises(IndexError):
+                arena.write(-1, [G])
+
+    def test_workers_share_the_block(self, fork_pool):
+        """Test workers read inputs and write outputs in place."""
+        points = [G * k for k in range(1, 9)]
+        with PointArena(len(points)) as inputs, PointArena(len(points)) as outputs:
+            for i, point in enumerate(points):
+                inputs.write(i, [point])
+
+            done = fork_pool.map(double_slots, [(inputs, outputs, range(0, 4)),
+                                                (inputs, outputs, range(4, 8))])
+
+            assert done == [4, 4]
+            assert [outputs.read(i)[0] for i in range(len(points))] == [p + p for p in points]
+
+    def test_unlinked_when_worker_raises(self, fork_pool):
+        """Test the block is removed when a worker fails mid-task."""
+        with pytest.raises(ValueError, match="worker failed"):
+            with PointArena(1) as inputs:
+                name = inputs.shm.name
+                inputs.write(0, [G])
+                fork_pool.map(fail, [(inputs,)])
+
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=name)
@@ -0,0 +1,79 @@
+from Crypto.PublicKey import ECC
+
+import proofs
+from batch import BatchVerifier
+
+G = ECC._curves["P-256"].G
+ORDER = int(ECC._curves["P-256"].order)
+TELLER_KEY = G * 0xC0FFEE
+COUNT = 2
+
+
+def ballot_equations(i, vote=None):
+    """The proof equations of voter i's ballot; vote defaults to i % COUNT."""
+    vote = i % COUNT if vote is None else vote
+    secret = 1000 + i
+    knowledge = proofs.prove_knowledge(G, ORDER, secret, G * secret, i)
+    r = 77 + i
+    c1, c2 = G * r, G * vote + TELLER_KEY * r
+    wellformedness = proofs.prove_wellformedness(G, ORDER, TELLER_KEY, c1, c2, r, COUNT, vote, i)
+    return (
+        proofs.knowledge_equations(G, ORDER, knowledge, G * secret, i)
+        + proofs.wellformedness_equations(G, ORDER, TELLER_KEY, c1, c2, wellformedness, i)
+    )
+
+
+def batch_of(equations_per_ballot):
+    """A BatchVerifier with every ballot's equations tagged by its index."""
+    batch = BatchVerifier()
+    for i, equations in enumerate(equations_per_ballot):
+        for points, scalars in equations:
+            batch.add(points, scalars, tag=i)
+    return batch
+
+
+class TestBatchVerifier:
+    """Test cases for BatchVerifier on P-256 ballot proofs."""
+
+    def test_empty(self):
+        """Test an empty batch holds."""
+        assert BatchVerifier().verify()
+        assert BatchVerifier().failures() == []
+
+    def test_valid_batch(self):
+        """Test a batch of honest ballots holds."""
+        batch = batch_of(ballot_equations(i) for i in range(5))
+
+        assert len(batch) == 5 * (1 + 2 * COUNT)
+        assert batch.verify()
+        assert batch.failures() == []
+
+    def test_tampered_equation(self):
+        """Test one changed scalar fails the batch and names its ballot."""
+        ballots = [ballot_equations(i) for i in range(5)]
+        points, scalars = ballots[3][2]
+        ballots[3][2] = (points, [scalars[0] + 1] + scalars[1:])
+        batch = batch_of(ballots)
+
+        assert not batch.verify()
+        assert batch.failures() == [3]
+
+    def test_several_failures_in_order(self):
+        """Test failures() lists every failing tag in the order added."""
+        ballots = [ballot_equations(i) for i in range(4)]
+        for i in (2, 0):
+            points, scalars = ballots[i][0]
+            ballots[i][0] = (points + [G], scalars + [1])
+
+        assert batch_of(ballots).failures() == [0, 2]
+
+    def test_shared_points(self):
+        """Test equations reusing the same point objects are merged correctly."""
+        batch = BatchVerifier()
+        point = G * 9
+        batch.add([point, G], [1, -9])
+        batch.add([point, G], [2, -18])
+
+        assert batch.verify()
+        batch.add([point, G], [1, -8])
+        assert not batch.verify()
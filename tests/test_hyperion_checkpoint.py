@@ -0,0 +1,136 @@
+import random
+import pytest
+from Crypto.PublicKey import ECC
+
+import checkpoint
+import instrument
+from checkpoint import checkpointed
+
+
+class Voter:
+    """Stand-in for parties.Voter with a checkpointed random choice."""
+
+    calls = 0
+
+    def __init__(self, id):
+        self.id = id
+
+    @checkpointed(instrument.VOTING, party=lambda voter: voter.id, state=True)
+    def choose_vote_value(self):
+        Voter.calls += 1
+        self.vote = random.randrange(0, 1 << 32)
+
+
+class Teller:
+    """Stand-in for parties.Teller with a checkpointed mix of points."""
+
+    calls = 0
+
+    def __init__(self, share):
+        self.share = share
+
+    @checkpointed(instrument.MIXING, party=lambda teller: teller.share)
+    def re_encryption_mix(self, list_0):
+        Teller.calls += 1
+        return [[c1 + c1, c2] for c1, c2 in list_0], random.randrange(0, 1 << 32)
+
+
+def ciphertexts():
+    """Fresh point objects with the same values on every call."""
+    g = ECC._curves["P-256"].G
+    return [[g * (2 * i + 1), g * (2 * i + 2)] for i in range(3)]
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_dir(tmp_path, monkeypatch):
+    """Checkpoint into a temporary directory, starting with no records."""
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", str(tmp_path))
+    monkeypatch.setattr(checkpoint, "RERUN_PHASE", None)
+    monkeypatch.setattr(checkpoint, "_records", None)
+    monkeypatch.setattr(Voter, "calls", 0)
+    monkeypatch.setattr(Teller, "calls", 0)
+    return tmp_path
+
+
+def resume(monkeypatch):
+    """Forget the loaded records, as a new process of a resumed run would."""
+    monkeypatch.setattr(checkpoint, "_records", None)
+
+
+class TestCheckpointed:
+    """Test cases for the checkpointed decorator."""
+
+    def test_resume_restores_state(self, monkeypatch):
+        """Test a resumed run gets the stored attributes without recomputing them."""
+        first = Voter("alice")
+        first.choose_vote_value()
+
+        resume(monkeypatch)
+        second = Voter("alice")
+        second.choose_vote_value()
+
+        assert second.vote == first.vote
+        assert Voter.calls == 1
+
+    def test_parties_are_separate(self, monkeypatch):
+        """Test records of one party are not replayed for another."""
+        Voter("alice").choose_vote_value()
+
+        resume(monkeypatch)
+        Voter("bob").choose_vote_value()
+
+        assert Voter.calls == 2
+
+    def test_rerun_phase_recomputes(self, monkeypatch):
+        """Test calls in the rerun phase are computed again."""
+        Voter("alice").choose_vote_value()
+
+        resume(monkeypatch)
+        monkeypatch.setattr(checkpoint, "RERUN_PHASE", instrument.phase_slug(instrument.VOTING))
+        Voter("alice").choose_vote_value()
+
+        assert Voter.calls == 2
+
+    def test_disabled_without_directory(self, monkeypatch):
+        """Test nothing is stored or replayed when checkpointing is off."""
+        monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", None)
+        Voter("alice").choose_vote_value()
+        Voter("alice").choose_vote_value()
+
+        assert Voter.calls == 2
+
+    def test_torn_record_is_ignored(self, checkpoint_dir, monkeypatch):
+        """Test a partly written record of a crashed process is recomputed."""
+        first = Voter("alice")
+        first.choose_vote_value()
+        log, = checkpoint_dir.glob("*.log")
+        log.write_bytes(log.read_bytes()[:-1])
+
+        resume(monkeypatch)
+        Voter("alice").choose_vote_value()
+
+        assert Voter.calls == 2
+
+    def test_resume_with_point_arguments(self, monkeypatch):
+        """Test calls on equal points in new objects are replayed."""
+        first = Teller(1).re_encryption_mix(ciphertexts())
+
+        resume(monkeypatch)
+        second = Teller(1).re_encryption_mix(ciphertexts())
+
+        assert second == first
+        assert Teller.calls == 1
+
+    def test_other_points_recompute(self, monkeypatch):
+        """Test a call on other points is not replayed."""
+        Teller(1).re_encryption_mix(ciphertexts())
+
+        resume(monkeypatch)
+        Teller(1).re_encryption_mix(ciphertexts()[::-1])
+
+        assert Teller.calls == 2
+
+    def test_input_key_is_canonical(self):
+        """Test keys depend on point values, not on the objects."""
+        assert checkpoint.input_key((ciphertexts(),)) == checkpoint.input_key((ciphertexts(),))
+        assert checkpoint.input_key((ciphertexts(),)) != checkpoint.input_key((ciphertexts()[:2],))
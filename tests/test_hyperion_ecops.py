@@ -0,0 +1,194 @@
+import random
+import pytest
+from Crypto.PublicKey import ECC
+
+import ecops
+from ecops import FixedBaseTable
+
+G = ECC._curves["P-256"].G
+ORDER = int(ECC._curves["P-256"].order)
+SCALARS = [0, 1, 2, 15, 16, ORDER - 1, ORDER, ORDER + 1, -1, random.Random(1).randrange(ORDER)]
+
+
+@pytest.fixture(autouse=True)
+def tables(monkeypatch):
+    """Start every test without tables."""
+    monkeypatch.setattr(ecops, "_tables", {})
+    return ecops._tables
+
+
+def infinity():
+    return G * 0
+
+
+class TestClone:
+    """Test cases for clone."""
+
+    def test_independent_copy(self):
+        """Test in-place additions to a clone leave the original alone."""
+        point = G * 7
+        copy = ecops.clone(point)
+        copy += G
+
+        assert point == G * 7
+        assert copy == G * 8
+
+
+class TestFixedBaseTable:
+    """Test cases for FixedBaseTable against plain point * k."""
+
+    @pytest.mark.parametrize("k", SCALARS)
+    def test_matches_multiplication(self, k):
+        """Test table multiplication agrees with pycryptodome."""
+        point = G * 12345
+        assert FixedBaseTable(point).multiply(k) == point * (k % ORDER)
+
+    @pytest.mark.parametrize("window", [1, 3, 5])
+    def test_other_windows(self, window):
+        """Test window sizes that do not divide the scalar size."""
+        point = G * 99
+        k = ORDER - 12345
+
+        assert FixedBaseTable(point, window).multiply(k) == point * k
+
+    def test_zero_is_infinity(self):
+        """Test k = 0 gives the point at infinity."""
+        assert FixedBaseTable(G * 3).multiply(0).is_point_at_infinity()
+
+    def test_infinity_base(self):
+        """Test a table of the point at infinity only gives infinity."""
+        table = FixedBaseTable(infinity())
+
+        assert table.multiply(5).is_point_at_infinity()
+        assert table.multiply(0).is_point_at_infinity()
+
+    def test_results_are_independent(self):
+        """Test results do not share state with the table or each other."""
+        table = FixedBaseTable(G * 5)
+        first = table.multiply(1)
+        first += G
+
+        assert table.multiply(1) == G * 5
+
+
+class TestMultiply:
+    """Test cases for multiply and its table cache."""
+
+    @pytest.mark.parametrize("k", SCALARS)
+    def test_before_and_after_table(self, k, monkeypatch):
+        """Test results agree with point * k with and without a table."""
+        monkeypatch.setattr(ecops, "TABLE_AFTER", 2)
+        point = G * 4242
+
+        plain = ecops.multiply(point, k)
+        tabled = ecops.multiply(point, k)
+
+        assert isinstance(ecops._tables[ecops._key(point)], FixedBaseTable)
+        assert plain == tabled == point * (k % ORDER)
+
+    def test_equal_points_share_a_table(self, monkeypatch):
+        """Test the cache is keyed by coordinates, not by object."""
+        monkeypatch.setattr(ecops, "TABLE_AFTER", 3)
+        for _ in range(3):
+            ecops.multiply(G * 77, 5)
+
+        assert len(ecops._tables) == 1
+        assert isinstance(ecops._tables[ecops._key(G * 77)], FixedBaseTable)
+
+    def test_mixed_bases(self, monkeypatch):
+        """Test bases with and without a table give the right results."""
+        monkeypatch.setattr(ecops, "TABLE_AFTER", 1000)
+        tabled = G * 11
+        ecops.precompute(tabled)
+        plain = G * 13
+
+        for k in SCALARS:
+            assert ecops.multiply(tabled, k) == tabled * (k % ORDER)
+            assert ecops.multiply(plain, k) == plain * (k % ORDER)
+        assert isinstance(ecops._tables[ecops._key(tabled)], FixedBaseTable)
+        assert ecops._tables[ecops._key(plain)] == len(SCALARS)
+
+    def test_infinity(self, monkeypatch):
+        """Test multiplying the point at infinity."""
+        monkeypatch.setattr(ecops, "TABLE_AFTER", 1)
+
+        assert ecops.multiply(infinity(), 3).is_point_at_infinity()
+
+    def test_precompute_keeps_table(self):
+        """Test precompute builds a table once."""
+        point = G * 31
+        ecops.precompute(point)
+        table = ecops._tables[ecops._key(point)]
+        ecops.precompute(G * 31)
+
+        assert ecops._tables[ecops._key(point)] is table
+
+
+def reference_msm(points, scalars):
+    """sum(k * P) with plain pycryptodome multiplications."""
+    result = infinity()
+    for point, k in zip(points, scalars):
+        result = result + point * (int(k) % ORDER)
+    return result
+
+
+class TestMsm:
+    """Test cases for msm against plain multiplications."""
+
+    @pytest.mark.parametrize("n", [1, 2, ecops.STRAUS_MAX, ecops.STRAUS_MAX + 1, 150])
+    def test_matches_reference(self, n):
+        """Test both Straus (up to STRAUS_MAX points) and Pippenger sizes."""
+        rng = random.Random(n)
+        points = [G * rng.randrange(1, ORDER) for _ in range(n)]
+        scalars = [rng.randrange(ORDER) for _ in range(n)]
+
+        assert ecops.msm(points, scalars) == reference_msm(points, scalars)
+
+    @pytest.mark.parametrize("n", [3, ecops.STRAUS_MAX + 6])
+    def test_edge_scalars(self, n):
+        """Test scalars 0, 1, order-1, order and negative ones."""
+        points = [G * (i + 2) for i in range(n)]
+        scalars = [[0, 1, ORDER - 1, ORDER, -1, -ORDER + 3][i % 6] for i in range(n)]
+
+        assert ecops.msm(points, scalars) == reference_msm(points, scalars)
+
+    @pytest.mark.parametrize("n", [4, ecops.STRAUS_MAX + 4])
+    def test_infinity_points(self, n):
+        """Test points at infinity, first or anywhere, add nothing."""
+        points = [infinity() if i % 2 == 0 else G * i for i in range(n)]
+        scalars = list(range(1, n + 1))
+
+        assert ecops.msm(points, scalars) == reference_msm(points, scalars)
+
+    @pytest.mark.parametrize("n", [2, ecops.STRAUS_MAX + 2])
+    def test_cancelling_sum(self, n):
+        """Test a sum that cancels to the point at infinity."""
+        points = [G * 5] * n
+        scalars = [1, -1] * (n // 2)
+
+        assert ecops.msm(points, scalars).is_point_at_infinity()
+
+    @pytest.mark.parametrize("n", [5, ecops.STRAUS_MAX + 5])
+    def test_all_zero_scalars(self, n):
+        """Test zero scalars give the point at infinity."""
+        assert ecops.msm([G * 3] * n, [0] * n).is_point_at_infinity()
+
+    def test_empty(self):
+        """Test no points give the point at infinity."""
+        assert ecops.msm([], []).is_point_at_infinity()
+
+    def test_tabled_and_plain_bases(self):
+        """Test points with a fixed-base table mix with plain ones."""
+        tabled = G * 17
+        ecops.precompute(tabled)
+        points = [tabled, G * 19, tabled, G * 23]
+        scalars = [3, ORDER - 2, 5, 7]
+
+        assert ecops.msm(points, scalars) == reference_msm(points, scalars)
+
+    def test_inputs_unchanged(self):
+        """Test msm does not modify the points it is given."""
+        points = [G * 2, G * 3]
+        ecops.msm(points, [5, 6])
+
+        assert points == [G * 2, G * 3]
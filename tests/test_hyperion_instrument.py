@@ -0,0 +1,125 @@
+import pstats
+import threading
+import time
+
+import instrument
+
+
+def in_thread(collector, phase, work, *args):
+    """Run work(*args) inside `phase` on a new thread and wait for it."""
+    def run():
+        collector.enter(phase)
+        try:
+            work(*args)
+        finally:
+            collector.exit()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def spin_a(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+def spin_b(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+class TestPhaseStacks:
+    """Test cases for the per-thread phase stacks of the collectors."""
+
+    def test_threads_keep_their_own_phase(self):
+        """Test a phase entered on one thread does not move the others."""
+        collector = instrument._Sampler()
+        collector.start_stacks()
+        entered, done = threading.Event(), threading.Event()
+
+        def work():
+            entered.set()
+            done.wait(5)
+
+        thread = in_thread(collector, instrument.MIXING, work)
+        entered.wait(5)
+        collector.enter(instrument.DECRYPTION)
+
+        assert collector.active() == {instrument.MIXING, instrument.DECRYPTION}
+        collector.exit()
+        done.set()
+        thread.join()
+        assert collector.active() == {instrument.MAIN}
+        assert list(collector.stacks) == [collector.main]
+
+
+class TestSampler:
+    """Test cases for _Sampler."""
+
+    def test_samples_phase_threads(self):
+        """Test the stacks of threads inside a phase are sampled under it."""
+        sampler = instrument._Sampler()
+        sampler.start()
+        try:
+            in_thread(sampler, instrument.MIXING, spin_a, 0.2).join()
+        finally:
+            sampler.stop()
+
+        phases = {phase for (phase, stack) in sampler.counts if "spin_a" in stack}
+        assert phases == {instrument.MIXING}
+
+
+class TestCProfiler:
+    """Test cases for _CProfiler."""
+
+    def test_concurrent_phases(self, tmp_path, monkeypatch):
+        """Test calls of concurrent threads go to their own thread's phase."""
+        monkeypatch.setattr(instrument, "PROFILE_DIR", str(tmp_path))
+        profiler = instrument._CProfiler()
+        profiler.start()
+        try:
+            threads = [
+                in_thread(profiler, instrument.MIXING, spin_a, 0.05),
+                in_thread(profiler, instrument.DECRYPTION, spin_b, 0.05),
+            ]
+            for thread in threads:
+                thread.join()
+            profiler.dump()
+        finally:
+            profiler.stop()
+
+        def functions(phase):
+            path = instrument._profile_path(phase, profiler.suffix)
+            return {name for _, _, name in pstats.Stats(path).stats}
+
+        assert "spin_a" in functions(instrument.MIXING)
+        assert "spin_b" not in functions(instrument.MIXING)
+        assert "spin_b" in functions(instrument.DECRYPTION)
+        assert "spin_a" not in functions(instrument.DECRYPTION)
+
+
+class TestMemoryRecorder:
+    """Test cases for _MemoryRecorder."""
+
+    def test_peak_counts_for_every_active_phase(self):
+        """Test process memory is attributed to the phases of all threads."""
+        recorder = instrument._MemoryRecorder()
+        recorder.start()
+        entered, done = threading.Event(), threading.Event()
+
+        def work():
+            entered.set()
+            done.wait(5)
+
+        thread = in_thread(recorder, instrument.MIXING, work)
+        entered.wait(5)
+        recorder.enter(instrument.DECRYPTION)
+        recorder.exit()
+        done.set()
+        thread.join()
+
+        assert recorder.phases[instrument.MIXING]["peak_rss"] > 0
+        assert recorder.phases[instrument.DECRYPTION]["peak_rss"] > 0
@@ -0,0 +1,452 @@
+import hashlib
+import secrets
+from types import SimpleNamespace
+
+import gmpy2
+import pytest
+
+# parties imports the upstream Hyperion modules and threshold_crypto,
+# which setup.sh installs into hyperion/
+parties = pytest.importorskip("parties")
+primitives = pytest.importorskip("primitives")
+
+
+def scan(board, index):
+    """The linear lookup full decryption used before the index map."""
+    for item in board:
+        if item[0] == index:
+            return item
+    return None
+
+
+@pytest.fixture
+def teller():
+    """A Teller with only the board helpers in use."""
+    return parties.Teller.__new__(parties.Teller)
+
+
+class TestIndexCiphertexts:
+    """Test cases for Teller.index_ciphertexts."""
+
+    def test_matches_scan(self, teller):
+        """Test the index finds the same rows as scanning the board."""
+        board = teller.tag_ciphertexts([[[i, i + 1], [i + 2, i + 3]] for i in range(10)])
+        ciphertexts = teller.index_ciphertexts(board)
+
+        for index in range(10):
+            assert ciphertexts[index] is scan(board, index)
+
+    def test_missing_ciphertext(self, teller):
+        """Test an index that is not on the board is missing from both."""
+        board = teller.tag_ciphertexts([[[i], [i]] for i in range(10)])
+        del board[4]
+        ciphertexts = teller.index_ciphertexts(board)
+
+        for index in (4, 10, -1):
+            assert scan(board, index) is None
+            assert ciphertexts.get(index) is None
+        with pytest.raises(KeyError):
+            ciphertexts[4]
+
+
+class P256:
+    """The parts of Hyperion's curve object a Teller's proofs use."""
+
+    def __init__(self):
+        self.pars = parties.tc.CurveParameters()
+
+    def get_pars(self):
+        return self
+
+    @property
+    def P(self):
+        return self.pars.P
+
+    @property
+    def order(self):
+        return self.pars.order
+
+    def raise_p(self, k):
+        return self.pars.P * int(k)
+
+    def get_random(self):
+        return 1 + secrets.randbelow(int(self.order) - 1)
+
+    def hash_to_mpz(self, text):
+        digest = hashlib.sha256(text.encode("UTF-8")).hexdigest()
+        return gmpy2.mpz(int(digest, 16) % int(self.order))
+
+
+class PartialDecryptions:
+    """ElGamalEncryption.partial_decrypt through threshold_crypto."""
+
+    def partial_decrypt(self, c1, key_share):
+        return parties.tc.compute_partial_decryption(
+            parties.tc.EncryptedMessage(c1, c1, ""), key_share
+        )
+
+
+@pytest.fixture
+def decrypting_teller():
+    """A Teller holding one share of a 2-of-3 key."""
+    tc = parties.tc
+    _, shares = tc.create_public_key_and_shares_centralized(
+        tc.CurveParameters(), tc.ThresholdParameters(2, 3)
+    )
+    teller = parties.Teller.__new__(parties.Teller)
+    teller.curve = P256()
+    teller.ege = PartialDecryptions()
+    teller.secret_key_share = shares[0]
+    return teller
+
+
+def board(size):
+    """Tagged ciphertexts with serialized points in both columns."""
+    G = parties.tc.CurveParameters().P
+    serialize = parties.tc.data._ecc_point_to_serializable
+    return [
+        [i, [serialize(G * (10 + i)), serialize(G * (20 + i))], [serialize(G * (30 + i)), serialize(G * (40 + i))]]
+        for i in range(size)
+    ]
+
+
+def prove(teller, ciphertexts):
+    """partial_decrypt_chunk's output and proof for tagged ciphertexts."""
+    pack = parties.pointcodec.pack_serialized
+    return teller.partial_decrypt_chunk(
+        [ciphertext[0] for ciphertext in ciphertexts],
+        pack(ciphertext[1][0] for ciphertext in ciphertexts),
+        pack(ciphertext[2][0] for ciphertext in ciphertexts),
+    )
+
+
+class TestDecryptionProof:
+    """Test cases for partial_decrypt_chunk against verify_decryption_proof."""
+
+    def test_round_trip(self, decrypting_teller):
+        """Test the verifier accepts the prover's proof."""
+        teller = decrypting_teller
+        ciphertexts = board(5)
+        output, _, proof = prove(teller, ciphertexts)
+        public_key_share = teller.curve.raise_p(teller.secret_key_share.y)
+
+        assert teller.verify_decryption_proof(
+            proof["tau_1"], proof["p_1_1"], proof["p_1_2"], proof["w_1"],
+            public_key_share, ciphertexts, output,
+        ) == 1
+
+    def test_tampered_output(self, decrypting_teller):
+        """Test a partial decryption swapped for another is rejected."""
+        teller = decrypting_teller
+        ciphertexts = board(5)
+        output, _, proof = prove(teller, ciphertexts)
+        output[1][1], output[2][1] = output[2][1], output[1][1]
+        public_key_share = teller.curve.raise_p(teller.secret_key_share.y)
+
+        assert teller.verify_decryption_proof(
+            proof["tau_1"], proof["p_1_1"], proof["p_1_2"], proof["w_1"],
+            public_key_share, ciphertexts, output,
+        ) == 0
+
+    def verify(self, teller, proof, ciphertexts, output, col=1, indices=None):
+        """verify_decryption_proof for column `col` of a proof."""
+        public_key_share = teller.curve.raise_p(teller.secret_key_share.y)
+        return teller.verify_decryption_proof(
+            proof[f"tau_{col}"], proof[f"p_{col}_1"], proof[f"p_{col}_2"], proof[f"w_{col}"],
+            public_key_share, ciphertexts, output, indices=indices, col=col,
+        )
+
+    def test_chunk_of_the_board(self, decrypting_teller):
+        """Test the proof's indices select its chunk from the whole board."""
+        ciphertexts = board(10)
+        chunk = [ciphertexts[i] for i in (7, 2, 5)]
+        output, output2, proof = prove(decrypting_teller, chunk)
+
+        assert proof["indices"] == [7, 2, 5]
+        assert self.verify(decrypting_teller, proof, ciphertexts, output, indices=proof["indices"]) == 1
+        assert self.verify(decrypting_teller, proof, ciphertexts, output2, col=2, indices=proof["indices"]) == 1
+
+    def test_other_chunk(self, decrypting_teller):
+        """Test a proof does not hold for the same items in another chunk."""
+        ciphertexts = board(6)
+        output, _, proof = prove(decrypting_teller, ciphertexts[:3])
+
+        assert self.verify(decrypting_teller, proof, ciphertexts[:3][::-1], output[::-1]) == 0
+        assert self.verify(decrypting_teller, proof, ciphertexts[:2], output[:2]) == 0
+        assert self.verify(decrypting_teller, proof, ciphertexts, output, indices=[0, 1, 2, 3]) == 0
+
+    def test_missing_index(self, decrypting_teller):
+        """Test indices that are not on the board are rejected."""
+        ciphertexts = board(4)
+        output, _, proof = prove(decrypting_teller, ciphertexts)
+
+        assert self.verify(decrypting_teller, proof, ciphertexts[1:], output, indices=proof["indices"]) == 0
+
+
+class RecordingElGamal:
+    """ElGamalEncryption.threshold_decrypt that records its calls."""
+
+    def __init__(self, plaintext):
+        self.plaintext = plaintext
+        self.calls = []
+
+    def threshold_decrypt(self, pds, encrypted_message, threshold_params):
+        self.calls.append((pds, encrypted_message, threshold_params))
+        return self.plaintext
+
+
+@pytest.fixture
+def threshold_run(monkeypatch):
+    """A k-of-n key from HYPERION_THRESHOLD, a ciphertext of M and its partial decryptions."""
+    monkeypatch.setenv("HYPERION_THRESHOLD", "3,5")
+    tc = parties.tc
+    params = parties.threshold_parameters()
+    public_key, shares = tc.create_public_key_and_shares_centralized(tc.CurveParameters(), params)
+    G = tc.CurveParameters().P
+    message, r = G * 4321, 987654
+    c1, c2 = G * r, message + public_key.Q * r
+    pds = [tc.compute_partial_decryption(tc.EncryptedMessage(c1, c2, ""), share) for share in shares]
+
+    teller = parties.Teller.__new__(parties.Teller)
+    teller.curve = P256()
+    teller.threshold = params
+    teller.lagrange = {}
+    teller.owner = -1  # not the pool's owner: map_chunks runs inline
+    teller.ege = RecordingElGamal(message)
+    return teller, message, c1, c2, pds
+
+
+class TestCombinePartialDecryptions:
+    """Test cases for both branches of combine_partial_decryptions."""
+
+    def test_threshold_from_env(self, threshold_run):
+        """Test the teller uses the (k, n) set in HYPERION_THRESHOLD."""
+        teller = threshold_run[0]
+
+        assert (teller.threshold.k, teller.threshold.n) == (3, 5)
+
+    def test_malformed_threshold(self, monkeypatch):
+        """Test a malformed HYPERION_THRESHOLD fails with a clear error."""
+        monkeypatch.setenv("HYPERION_THRESHOLD", "3")
+
+        with pytest.raises(ValueError, match="HYPERION_THRESHOLD must be 'k,n'"):
+            parties.threshold_parameters()
+
+    @pytest.mark.parametrize("chosen", [(0, 1, 2), (4, 2, 0), (0, 1, 2, 3, 4)])
+    def test_lagrange_branch(self, threshold_run, chosen):
+        """Test any k or more distinct shares decrypt without threshold_decrypt."""
+        teller, message, c1, c2, pds = threshold_run
+
+        assert teller.combine_partial_decryptions([pds[i] for i in chosen], c1, c2) == message
+        assert teller.ege.calls == []
+
+    def test_fallback_branch(self, threshold_run):
+        """Test too few or repeated shares go to threshold_decrypt."""
+        teller, message, c1, c2, pds = threshold_run
+
+        for chosen in ([pds[0], pds[1]], [pds[0], pds[0], pds[1]]):
+            assert teller.combine_partial_decryptions(chosen, c1, c2) == message
+        assert len(teller.ege.calls) == 2
+        for _, encrypted_message, threshold_params in teller.ege.calls:
+            assert (encrypted_message.C1, encrypted_message.C2) == (c1, c2)
+            assert threshold_params is teller.threshold
+
+    def test_full_decrypt(self, threshold_run):
+        """Test full_decrypt through the arena, with a fallback item in between."""
+        teller, message, c1, c2, pds = threshold_run
+        serialize = parties.tc.data._ecc_point_to_serializable
+        ciphertexts = [[i, [serialize(c1), serialize(c2)]] for i in range(3)]
+        pd_in = [[2, pds[:3]], [0, pds[:2]], [1, pds[1:]]]
+
+        decrypted = teller.full_decrypt(pd_in, ciphertexts, 1)
+
+        assert [item[0] for item in decrypted] == [2, 0, 1]
+        assert all(parties.deserialize_ep(item[1]) == message for item in decrypted)
+        assert len(teller.ege.calls) == 1
+
+    def test_full_decrypt_serialized(self, threshold_run):
+        """Test shares serialized by serialize_pd, as main.py passes them, take the arena path."""
+        teller, message, c1, c2, pds = threshold_run
+        serialize = parties.tc.data._ecc_point_to_serializable
+        ciphertexts = [[i, [serialize(c1), serialize(c2)]] for i in range(2)]
+        pd_in = [[i, [parties.serialize_pd(pd) for pd in pds[i:i + 3]]] for i in range(2)]
+        combined = []
+
+        def combine_shares(indices, shares, c2):
+            combined.append(indices)
+            return parties.Teller.combine_shares(teller, indices, shares, c2)
+
+        teller.combine_shares = combine_shares
+
+        decrypted = teller.full_decrypt(pd_in, ciphertexts, 1)
+
+        assert all(parties.deserialize_ep(item[1]) == message for item in decrypted)
+        assert teller.ege.calls == []
+        assert combined == [[pd.x for pd in pds[i:i + 3]] for i in range(2)]
+
+
+COUNT = 3
+
+
+class Signatures:
+    """DSA stand-in: a ballot's signature is the hash it signs."""
+
+    def __init__(self, curve):
+        pass
+
+    def verify(self, public_key, signature, hash):
+        return signature == hash
+
+
+def cast(curve, teller_key, i, vote=None, tamper=False):
+    """Voter i's signed ballot with proofs.py proofs; `tamper` breaks its OR-proof."""
+    G, order = curve.get_pars().P, curve.get_pars().order
+    vote = i % COUNT if vote is None else vote
+    secret, r = 100 + i, 50 + i
+    ptk = G * secret
+    c1, c2 = G * r, G * vote + teller_key.Q * r
+    pi_2 = parties.proofs.prove_wellformedness(G, order, teller_key.Q, c1, c2, r, COUNT, vote, i)
+    if tamper:
+        pi_2[3][0] = (pi_2[3][0] + 1) % int(order)
+    ballot = {
+        "id": i,
+        "spk": None,
+        "ev": [c1, c2, r],
+        "ptk": ptk,
+        "pi_1": parties.proofs.prove_knowledge(G, order, secret, ptk, i),
+        "pi_2": pi_2,
+    }
+    ballot["sig"] = parties.validation.signed_hash(curve, ballot)
+    return ballot
+
+
+@pytest.fixture
+def tally_validation(monkeypatch):
+    """validation with prevalidation off, batches of 4 and spies on its checks."""
+    validation = parties.validation
+    monkeypatch.setattr(validation, "ENABLED", False)
+    monkeypatch.setattr(validation, "BATCH", True)
+    monkeypatch.setattr(validation, "BATCH_SIZE", 4)
+    monkeypatch.setattr(validation, "DSA", Signatures)
+    monkeypatch.setattr(validation, "_results", {})
+    monkeypatch.setattr(validation, "_pending", [])
+    monkeypatch.setattr(validation, "_runner", None)
+    calls = {"batch": [], "ballot": []}
+    check_batch, check_ballot = validation.check_batch, validation.check_ballot
+
+    def spy_batch(curve, teller_public_key, ballots):
+        calls["batch"].append([ballot["id"] for ballot in ballots])
+        return check_batch(curve, teller_public_key, ballots)
+
+    def spy_ballot(curve, teller_public_key, ballot):
+        calls["ballot"].append(ballot["id"])
+        return check_ballot(curve, teller_public_key, ballot)
+
+    monkeypatch.setattr(validation, "check_batch", spy_batch)
+    monkeypatch.setattr(validation, "check_ballot", spy_ballot)
+    return calls
+
+
+class TestValidateBallot:
+    """Test cases for Teller.validate_ballot verifying at the tally."""
+
+    def setup_method(self):
+        self.curve = P256()
+        self.key = SimpleNamespace(Q=self.curve.raise_p(0xBEEF))
+
+    def submit(self, ballots):
+        for ballot in ballots:
+            parties.validation.submit(self.curve, self.key, ballot)
+
+    def test_batches_at_tally(self, tally_validation):
+        """Test recorded ballots are checked in BATCH_SIZE groups, none on its own."""
+        ballots = [cast(self.curve, self.key, i) for i in range(10)]
+        self.submit(ballots)
+
+        assert tally_validation["batch"] == []
+        assert all(parties.Teller.validate_ballot(self.curve, self.key, b) for b in ballots)
+        assert tally_validation["batch"] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+        assert tally_validation["ballot"] == []
+
+    def test_failed_batch_names_the_ballot(self, tally_validation):
+        """Test only the ballots of a failed batch's culprit are rejected."""
+        ballots = [cast(self.curve, self.key, i, tamper=(i == 5)) for i in range(8)]
+        self.submit(ballots)
+
+        valid = [parties.Teller.validate_ballot(self.curve, self.key, b) for b in ballots]
+
+        assert valid == [i != 5 for i in range(8)]
+        assert tally_validation["ballot"] == [5]
+
+    def test_unrecorded_or_changed_ballot(self, tally_validation):
+        """Test ballots never submitted, or changed since, are checked on their own."""
+        recorded = cast(self.curve, self.key, 1)
+        self.submit([recorded])
+        changed = dict(recorded, ptk=recorded["ptk"] + self.curve.get_pars().P)
+
+        assert parties.Teller.validate_ballot(self.curve, self.key, cast(self.curve, self.key, 2))
+        assert not parties.Teller.validate_ballot(self.curve, self.key, changed)
+        assert tally_validation["ballot"] == [2, 1]
+
+    def test_runner(self, tally_validation):
+        """Test a Teller's validate_groups checks the groups for set_runner."""
+        teller = parties.Teller.__new__(parties.Teller)
+        teller.curve, teller.public_key = self.curve, self.key
+        teller.owner = -1  # not the pool's owner: groups are checked inline
+        parties.validation.set_runner(teller.validate_groups)
+        ballots = [cast(self.curve, self.key, i, tamper=(i == 0)) for i in range(5)]
+        self.submit(ballots)
+
+        assert [parties.Teller.validate_ballot(self.curve, self.key, b) for b in ballots] == [
+            False, True, True, True, True
+        ]
+        assert tally_validation["batch"] == [[0, 1, 2, 3], [4]]
+
+
+class TestUpstreamCrossCheck:
+    """
+    Test cases comparing the proofs.py proofs the voters now send with
+    the upstream NIZK and ChaumPedersenProof they replace: on the same
+    statements, both verifiers accept honest proofs and reject the same
+    tampering, and the proofs keep the upstream layout.
+    """
+
+    def setup_method(self):
+        self.curve = P256()
+        self.G, self.order = self.curve.get_pars().P, self.curve.get_pars().order
+        self.Q = self.curve.raise_p(0xC0DE)
+
+    def test_knowledge(self):
+        """Test both proofs of the trapdoor key agree on the voter id."""
+        secret = 0x1357
+        public = self.G * secret
+        nizk = primitives.NIZK(self.curve)
+        upstream = nizk.prove(secret, public, "voter-1")
+        ours = parties.proofs.prove_knowledge(self.G, self.order, secret, public, "voter-1")
+
+        assert "gr" in upstream and "gr" in ours
+        for voter, expected in (("voter-1", True), ("voter-2", False)):
+            assert bool(nizk.verify(upstream, public, voter)) is expected
+            assert parties.proofs.holds(
+                parties.proofs.knowledge_equations(self.G, self.order, ours, public, voter)
+            ) is expected
+
+    @pytest.mark.parametrize("vote", range(COUNT))
+    def test_wellformedness(self, vote):
+        """Test both OR-proofs accept honest votes and reject a changed response."""
+        r = 0x2468
+        c1, c2 = self.G * r, self.G * vote + self.Q * r
+        chmp = primitives.ChaumPedersenProof(self.curve)
+        upstream = chmp.prove_or_n({"c1": c1, "c2": c2}, r, self.Q, COUNT, vote, "voter-1")
+        ours = parties.proofs.prove_wellformedness(self.G, self.order, self.Q, c1, c2, r, COUNT, vote, "voter-1")
+
+        assert [len(part) for part in upstream[:4]] == [len(part) for part in ours] == [COUNT] * 4
+        for tamper in (False, True):
+            up, mine = [list(part) for part in upstream[:4]], [list(part) for part in ours]
+            if tamper:
+                up[3][vote] += 1
+                mine[3][vote] += 1
+            assert bool(chmp.verify_or_n({"c1": c1, "c2": c2}, self.Q, *up, "voter-1")) is not tamper
+            assert parties.proofs.holds(
+                parties.proofs.wellformedness_equations(self.G, self.order, self.Q, c1, c2, mine, "voter-1")
+            ) is not tamper
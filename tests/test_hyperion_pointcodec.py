@@ -0,0 +1,68 @@
+import pytest
+from Crypto.PublicKey import ECC
+
+import pointcodec
+
+G = ECC._curves["P-256"].G
+
+
+@pytest.fixture
+def points():
+    """A few P-256 points of both y parities."""
+    return [G * k for k in (1, 2, 3, 12345)]
+
+
+def serializable(point):
+    """A point in tc.data._ecc_point_to_serializable form."""
+    return {"x": int(point.x), "y": int(point.y), "curve": "P-256"}
+
+
+class TestEncoding:
+    """Test cases for single point encodings."""
+
+    @pytest.mark.parametrize("compressed", [False, True])
+    def test_round_trip(self, points, compressed):
+        """Test points decode to themselves in both forms."""
+        for point in points:
+            data = pointcodec.encode_point(point, compressed)
+
+            assert len(data) == (pointcodec.COMPRESSED_SIZE if compressed else pointcodec.RAW_SIZE)
+            assert pointcodec.decode_point(data, compressed) == point
+
+    @pytest.mark.parametrize("compressed", [False, True])
+    def test_infinity(self, compressed):
+        """Test the point at infinity encodes as zero bytes."""
+        infinity = G * 0
+
+        data = pointcodec.encode_point(infinity, compressed)
+
+        assert data == bytes(len(data))
+        assert pointcodec.decode_point(data, compressed).is_point_at_infinity()
+
+    def test_same_curve(self):
+        """Test only P-256 points use these encodings."""
+        assert pointcodec.same_curve(G)
+        assert not pointcodec.same_curve(ECC._curves["P-384"].G)
+
+
+class TestPacking:
+    """Test cases for packed point lists."""
+
+    def test_pack_serialized_round_trip(self, points):
+        """Test serialized points pack into one buffer and unpack as points."""
+        buffer = pointcodec.pack_serialized(serializable(p) for p in points)
+
+        assert len(buffer) == len(points) * pointcodec.RAW_SIZE
+        assert pointcodec.unpack_points(buffer) == points
+
+    def test_compressed_round_trip(self, points):
+        """Test compressed packing halves the size and keeps the points."""
+        buffer = pointcodec.pack_serialized((serializable(p) for p in points), compressed=True)
+
+        assert len(buffer) == len(points) * pointcodec.COMPRESSED_SIZE
+        assert pointcodec.unpack_points(buffer, compressed=True) == points
+
+    def test_empty(self):
+        """Test an empty list packs into an empty buffer."""
+        assert pointcodec.pack_serialized([]) == b""
+        assert pointcodec.unpack_points(b"") == []
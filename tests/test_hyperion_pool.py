@@ -0,0 +1,153 @@
+import os
+import queue
+import pytest
+from Crypto.PublicKey import ECC
+
+import pool
+from pool import TellerProcess, split
+
+
+class Teller:
+    """Stand-in Teller with chunk methods and an mp_* target."""
+
+    def __init__(self, processes=2, name="a"):
+        self.processes = processes
+        self.name = name
+        self.pool = None
+        self.key = pool.register(self)
+
+    def worker_pool(self):
+        self.pool = pool.shared_pool(self.processes)
+        return self.pool
+
+    def square_chunk(self, chunk, offset):
+        return [(os.getpid(), x * x + offset) for x in chunk]
+
+    def name_chunk(self, chunk):
+        return [(self.name, x) for x in chunk]
+
+    def double_chunk(self, points):
+        return [p + p for p in points]
+
+    def fail_chunk(self, chunk):
+        raise ValueError("bad chunk")
+
+    def mp_square(self, chunk, q1):
+        q1.put(self.worker_pool().map(self.key, "square_chunk", [(chunk, 0)])[0])
+
+
+@pytest.fixture
+def teller():
+    """A stand-in Teller whose pool is closed after the test."""
+    teller = Teller()
+    yield teller
+    if teller.pool is not None:
+        teller.pool.close()
+
+
+class TestSplit:
+    """Test cases for split."""
+
+    def test_sizes_differ_by_at_most_one(self):
+        """Test chunks are contiguous and balanced."""
+        chunks = split(list(range(10)), 4)
+
+        assert chunks == [[0, 1, 2], [3, 4, 5], [6, 7], [8, 9]]
+
+    def test_more_chunks_than_items(self):
+        """Test surplus chunks are empty."""
+        assert split([1, 2], 3) == [[1], [2], []]
+
+
+class TestTellerPool:
+    """Test cases for TellerPool on real forked workers."""
+
+    def test_map_chunks_keeps_order(self, teller):
+        """Test results come back in chunk order, computed in the workers."""
+        items = list(range(101))
+        chunks = teller.worker_pool().map_chunks(teller.key, "square_chunk", items, 5)
+
+        assert len(chunks) == teller.processes
+        results = [value for chunk in chunks for _, value in chunk]
+        assert results == [x * x + 5 for x in items]
+        assert os.getpid() not in {pid for chunk in chunks for pid, _ in chunk}
+
+    def test_map_chunks_skips_empty_chunks(self, teller):
+        """Test fewer items than workers give one call per item."""
+        chunks = teller.worker_pool().map_chunks(teller.key, "square_chunk", [3], 0)
+
+        assert [[value for _, value in chunk] for chunk in chunks] == [[9]]
+
+    def test_points_cross_the_boundary(self, teller):
+        """Test points are pickled to the workers and back."""
+        g = ECC._curves["P-256"].G
+        points = [g * k for k in (1, 2, 3)]
+
+        doubled, = teller.worker_pool().map(teller.key, "double_chunk", [(points,)])
+
+        assert doubled == [p + p for p in points]
+
+    def test_worker_error_is_raised(self, teller):
+        """Test an exception in a worker reaches the caller."""
+        with pytest.raises(ValueError, match="bad chunk"):
+            teller.worker_pool().map(teller.key, "fail_chunk", [([1],)])
+
+    def test_close(self, teller):
+        """Test a closed pool is no longer terminated at exit."""
+        worker_pool = teller.worker_pool()
+        worker_pool.close()
+        teller.pool = None
+
+        assert worker_pool not in pool._pools
+
+    def test_reopened_after_close(self, teller):
+        """Test the shared pool is forked again once closed."""
+        worker_pool = teller.worker_pool()
+        worker_pool.close()
+
+        assert teller.worker_pool() is not worker_pool
+
+    def test_shared_by_tellers(self, teller):
+        """Test tellers share one pool and each call reaches its own teller."""
+        other = Teller(name="b")
+        shared = other.worker_pool()
+
+        assert teller.worker_pool() is shared
+        assert shared.map(teller.key, "name_chunk", [([1],)]) == [[("a", 1)]]
+        assert shared.map(other.key, "name_chunk", [([2],)]) == [[("b", 2)]]
+
+    def test_forked_again_for_new_tellers(self, teller):
+        """Test a teller registered after the fork gets a pool that knows it."""
+        worker_pool = teller.worker_pool()
+        other = Teller(name="b")
+
+        assert other.worker_pool() is not worker_pool
+        assert worker_pool not in pool._pools
+        assert other.pool.map(other.key, "name_chunk", [([3],)]) == [[("b", 3)]]
+
+
+class TestTellerProcess:
+    """Test cases for TellerProcess."""
+
+    def test_runs_target_on_the_pool(self, teller):
+        """Test the target runs on a thread and its chunk on the pool."""
+        q1 = queue.Queue()
+        process = TellerProcess(target=teller.mp_square, args=([1, 2, 3], q1))
+        process.daemon = True
+
+        process.start()
+        process.join()
+
+        assert process.exitcode == 0
+        assert teller.pool is not None
+        assert [value for _, value in q1.get_nowait()] == [1, 4, 9]
+
+    @pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+    def test_failed_target_sets_exitcode(self, teller):
+        """Test a raising target ends with a non-zero exit code."""
+        process = TellerProcess(target=teller.mp_square, args=(None, None))
+
+        process.start()
+        process.join()
+
+        assert process.exitcode == 1
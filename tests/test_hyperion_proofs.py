@@ -0,0 +1,217 @@
+import pytest
+from Crypto.PublicKey import ECC
+
+import pointcodec
+import proofs
+from transcript import PackedPoints
+
+G = ECC._curves["P-256"].G
+ORDER = int(ECC._curves["P-256"].order)
+SECRET = 0x1234567
+PUBLIC = G * SECRET
+TELLER_KEY = G * 0xABCDEF
+COUNT = 3
+
+
+def encrypt(vote, r=0x5151):
+    """ElGamal encryption of vote * G to the teller key, with its r."""
+    return G * r, G * vote + TELLER_KEY * r, r
+
+
+def wellformed(vote, context="voter-1"):
+    """A ballot ciphertext for `vote` and its OR-proof."""
+    c1, c2, r = encrypt(vote)
+    proof = proofs.prove_wellformedness(G, ORDER, TELLER_KEY, c1, c2, r, COUNT, vote, context)
+    return c1, c2, proof
+
+
+class TestKnowledge:
+    """Test cases for the proof of knowledge of the trapdoor key."""
+
+    def test_valid(self):
+        """Test an honest proof holds."""
+        proof = proofs.prove_knowledge(G, ORDER, SECRET, PUBLIC, "voter-1")
+
+        assert proofs.holds(proofs.knowledge_equations(G, ORDER, proof, PUBLIC, "voter-1"))
+
+    def test_wrong_context(self):
+        """Test a proof does not hold for another voter."""
+        proof = proofs.prove_knowledge(G, ORDER, SECRET, PUBLIC, "voter-1")
+
+        assert not proofs.holds(proofs.knowledge_equations(G, ORDER, proof, PUBLIC, "voter-2"))
+
+    def test_tampered(self):
+        """Test changed responses or keys are rejected."""
+        proof = proofs.prove_knowledge(G, ORDER, SECRET, PUBLIC, "voter-1")
+        tampered = dict(proof, z=(proof["z"] + 1) % ORDER)
+
+        assert not proofs.holds(proofs.knowledge_equations(G, ORDER, tampered, PUBLIC, "voter-1"))
+        assert not proofs.holds(proofs.knowledge_equations(G, ORDER, proof, PUBLIC + G, "voter-1"))
+
+
+class TestWellformedness:
+    """Test cases for the OR-proof of a ballot ciphertext."""
+
+    @pytest.mark.parametrize("vote", range(COUNT))
+    def test_valid(self, vote):
+        """Test honest proofs hold for every vote."""
+        c1, c2, proof = wellformed(vote)
+
+        assert proofs.holds(proofs.wellformedness_equations(G, ORDER, TELLER_KEY, c1, c2, proof, "voter-1"))
+
+    def test_vote_out_of_range(self):
+        """Test the prover refuses votes outside 0 .. count-1."""
+        c1, c2, r = encrypt(COUNT)
+
+        with pytest.raises(ValueError):
+            proofs.prove_wellformedness(G, ORDER, TELLER_KEY, c1, c2, r, COUNT, COUNT, "voter-1")
+
+    def test_out_of_range_ciphertext(self):
+        """Test a proof for vote 0 does not hold for a ciphertext of COUNT."""
+        _, _, proof = wellformed(0)
+        c1, c2, _ = encrypt(COUNT)
+
+        assert not proofs.holds(proofs.wellformedness_equations(G, ORDER, TELLER_KEY, c1, c2, proof, "voter-1"))
+
+    def test_wrong_context(self):
+        """Test a proof does not hold for another voter."""
+        c1, c2, proof = wellformed(1)
+
+        assert proofs.wellformedness_equations(G, ORDER, TELLER_KEY, c1, c2, proof, "voter-2") is None
+
+    def test_tampered(self):
+        """Test a changed response or commitment is rejected."""
+        c1, c2, proof = wellformed(2)
+        ul, vl, cl, zl = proof
+        response = [ul, vl, cl, [zl[0] + 1] + zl[1:]]
+        commitment = [[ul[0] + G] + ul[1:], vl, cl, zl]
+
+        assert not proofs.holds(proofs.wellformedness_equations(G, ORDER, TELLER_KEY, c1, c2, response, "voter-1"))
+        assert not proofs.holds(proofs.wellformedness_equations(G, ORDER, TELLER_KEY, c1, c2, commitment, "voter-1"))
+
+    def test_mismatched_lengths(self):
+        """Test proofs with lists of different lengths are rejected."""
+        c1, c2, (ul, vl, cl, zl) = wellformed(0)
+
+        assert proofs.wellformedness_equations(G, ORDER, TELLER_KEY, c1, c2, [ul, vl[:-1], cl, zl], "voter-1") is None
+        assert not proofs.holds(None)
+
+
+def serializable(point):
+    """A point in tc.data._ecc_point_to_serializable form."""
+    return {"x": int(point.x), "y": int(point.y), "curve": "P-256"}
+
+
+class TestDecryption:
+    """Test cases for the proof of partial decryption."""
+
+    SHARE = 0x7777
+
+    def chunk(self, size=6):
+        """Alphas, their partial decryptions and the prover's statement."""
+        alphas = [G * (100 + i) for i in range(size)]
+        shares = [alpha * self.SHARE for alpha in alphas]
+        output = [[i, serializable(share)] for i, share in enumerate(shares)]
+        packed = pointcodec.pack_serialized(serializable(alpha) for alpha in alphas)
+        return alphas, shares, output, packed
+
+    def test_round_trip(self):
+        """Test a proof over packed alphas holds for the serialized ones."""
+        alphas, shares, output, packed = self.chunk()
+        public = G * self.SHARE
+        proof = proofs.prove_decryption(G, ORDER, self.SHARE, public, alphas, [PackedPoints(packed), output])
+
+        statement = [[serializable(alpha) for alpha in alphas], output]
+        assert proofs.holds(proofs.decryption_equations(G, ORDER, public, proof, alphas, shares, statement))
+
+    def test_wrong_share(self):
+        """Test one partial decryption with another key is rejected."""
+        alphas, shares, output, packed = self.chunk()
+        public = G * self.SHARE
+        proof = proofs.prove_decryption(G, ORDER, self.SHARE, public, alphas, [PackedPoints(packed), output])
+        shares[2] = alphas[2] * (self.SHARE + 1)
+
+        assert not proofs.holds(proofs.decryption_equations(
+            G, ORDER, public, proof, alphas, shares, [PackedPoints(packed), output]
+        ))
+
+    def test_other_statement(self):
+        """Test a proof does not hold for a reordered output."""
+        alphas, shares, output, packed = self.chunk()
+        public = G * self.SHARE
+        proof = proofs.prove_decryption(G, ORDER, self.SHARE, public, alphas, [PackedPoints(packed), output])
+
+        assert not proofs.holds(proofs.decryption_equations(
+            G, ORDER, public, proof, alphas, shares, [PackedPoints(packed), output[::-1]]
+        ))
+        assert proofs.decryption_equations(G, ORDER, public, proof, alphas, shares[:-1], output) is None
+
+
+class TestDecryptionChunk:
+    """Test cases for decryption_chunk, with stand-in partial decryptions."""
+
+    SHARE = 0x7777
+    INDICES = [7, 2, 5]
+
+    def board(self):
+        """Tagged ciphertexts [index, [alpha_1, beta_1], [alpha_2, beta_2]]."""
+        return {
+            i: [i, [serializable(G * (100 + i)), None], [serializable(G * (200 + i)), None]]
+            for i in range(10)
+        }
+
+    def prove(self, board):
+        """The chunk's [index, partial decryption] output and its proof."""
+        alphas = [G * (100 + i) for i in self.INDICES]
+        # Stand-ins for util.serialize_pd: the share index and y*alpha
+        output = [[i, {"x": 1, "yC1": serializable(alpha * self.SHARE)}] for i, alpha in zip(self.INDICES, alphas)]
+        packed = pointcodec.pack_serialized(board[i][1][0] for i in self.INDICES)
+        proof = proofs.prove_decryption(G, ORDER, self.SHARE, G * self.SHARE, alphas, [PackedPoints(packed), output])
+        return output, proof
+
+    def verify(self, board, output, proof, indices=None):
+        """Teller.verify_decryption_proof for column 1, decoding the stand-ins."""
+        chunk = proofs.decryption_chunk(board, output, indices)
+        if chunk is None:
+            return False
+        alpha_terms = [ciphertext[1][0] for ciphertext in chunk]
+        decode = lambda p: ECC.EccPoint(p["x"], p["y"], p["curve"])
+        return proofs.holds(proofs.decryption_equations(
+            G, ORDER, G * self.SHARE, proof,
+            [decode(alpha) for alpha in alpha_terms],
+            [decode(item[1]["yC1"]) for item in output],
+            [alpha_terms, output],
+        ))
+
+    def test_original_indices(self):
+        """Test the proof holds for its chunk, looked up on the whole board."""
+        board = self.board()
+        output, proof = self.prove(board)
+
+        assert self.verify(board, output, proof)
+        assert self.verify(board, output, proof, indices=self.INDICES)
+
+    def test_swapped_indices(self):
+        """Test partial decryptions relabelled with each other's indices are rejected."""
+        board = self.board()
+        output, proof = self.prove(board)
+        swapped = [[output[1][0], output[0][1]], [output[0][0], output[1][1]], output[2]]
+
+        assert not self.verify(board, swapped, proof)
+        assert not self.verify(board, swapped, proof, indices=[2, 7, 5])
+
+    def test_other_proof_indices(self):
+        """Test proof indices naming another chunk are rejected."""
+        board = self.board()
+        output, proof = self.prove(board)
+
+        assert proofs.decryption_chunk(board, output, [2, 7, 5]) is None
+        assert not self.verify(board, output, proof, indices=[2, 7, 5])
+
+    def test_not_on_board(self):
+        """Test partial decryptions of ciphertexts not on the board are rejected."""
+        board = self.board()
+        output, proof = self.prove(board)
+        del board[5]
+
+        assert proofs.decryption_chunk(board, output) is None
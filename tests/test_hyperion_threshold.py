@@ -0,0 +1,52 @@
+import random
+
+import pytest
+from Crypto.PublicKey import ECC
+
+import threshold
+
+ORDER = int(ECC._curves["P-256"].order)
+
+
+class TestParse:
+    """Test cases for parsing HYPERION_THRESHOLD."""
+
+    @pytest.mark.parametrize("value, expected", [("2,3", (2, 3)), ("1,1", (1, 1)), (" 3, 5", (3, 5))])
+    def test_valid(self, value, expected):
+        """Test well-formed values give (k, n)."""
+        assert threshold.parse(value) == expected
+
+    @pytest.mark.parametrize("value", ["", "3", "2,3,4", "a,b", "2;3", "0,3", "4,3", "-1,2", None])
+    def test_malformed(self, value):
+        """Test malformed values name the variable and the expected form."""
+        with pytest.raises(ValueError, match=r"HYPERION_THRESHOLD must be 'k,n' with 1 <= k <= n"):
+            threshold.parse(value)
+
+    def test_from_env(self, monkeypatch):
+        """Test the environment is read, with 2 of 3 by default."""
+        monkeypatch.delenv("HYPERION_THRESHOLD", raising=False)
+        assert threshold.from_env() == (2, 3)
+
+        monkeypatch.setenv("HYPERION_THRESHOLD", "3,5")
+        assert threshold.from_env() == (3, 5)
+
+        monkeypatch.setenv("HYPERION_THRESHOLD", "5,3")
+        with pytest.raises(ValueError):
+            threshold.from_env()
+
+
+class TestLagrangeCoefficients:
+    """Test cases for lagrange_coefficients."""
+
+    @pytest.mark.parametrize("indices", [[1], [1, 2], [2, 5, 3], [1, 2, 3, 4, 5]])
+    def test_interpolates_at_zero(self, indices):
+        """Test the coefficients recover f(0) from shares f(i)."""
+        rng = random.Random(len(indices))
+        polynomial = [rng.randrange(ORDER) for _ in indices]
+
+        def f(x):
+            return sum(a * x ** power for power, a in enumerate(polynomial)) % ORDER
+
+        coefficients = threshold.lagrange_coefficients(indices, ORDER)
+
+        assert sum(c * f(i) for c, i in zip(coefficients, indices)) % ORDER == polynomial[0]
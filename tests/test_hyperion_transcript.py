@@ -0,0 +1,98 @@
+import hashlib
+
+from Crypto.PublicKey import ECC
+
+import pointcodec
+import transcript as transcript_module
+from transcript import Transcript, PackedPoints
+
+G = ECC._curves["P-256"].G
+
+
+def serializable(point):
+    """A point in tc.data._ecc_point_to_serializable form."""
+    return {"x": int(point.x), "y": int(point.y), "curve": "P-256"}
+
+
+class TestPackedPoints:
+    """Test cases for absorbing packed point lists."""
+
+    def test_matches_point_list(self):
+        """Test packed points hash like the list of points they hold."""
+        points = [G * k for k in (1, 2, 3)]
+        packed = pointcodec.pack_serialized(serializable(p) for p in points)
+
+        expected = Transcript("t").append(points, 7).digest()
+
+        assert Transcript("t").append(PackedPoints(packed), 7).digest() == expected
+        assert Transcript("t").append([serializable(p) for p in points], 7).digest() == expected
+
+    def test_empty(self):
+        """Test an empty buffer hashes like an empty list."""
+        assert Transcript("t").append(PackedPoints(b"")).digest() == Transcript("t").append([]).digest()
+
+
+def digest_of(*parts):
+    """sha256 of the label "t" followed by the given encoded bytes."""
+    return hashlib.sha256(b"S" + (1).to_bytes(4, "big") + b"t" + b"".join(parts)).digest()
+
+
+class TestEncodings:
+    """Test cases for the byte encodings against hand-built ones."""
+
+    def test_ints(self):
+        """Test small, large and negative integers."""
+        big = 1 << 300
+        data = big.to_bytes(38, "big")
+
+        assert Transcript("t", "sha256").append(5).digest() == digest_of(b"I" + (5).to_bytes(32, "big"))
+        assert Transcript("t", "sha256").append(big).digest() == digest_of(b"J+" + (38).to_bytes(4, "big") + data)
+        assert Transcript("t", "sha256").append(-big).digest() == digest_of(b"J-" + (38).to_bytes(4, "big") + data)
+
+    def test_points(self):
+        """Test points and their serialized form encode as P + x + y."""
+        point = G * 3
+        expected = digest_of(b"P" + int(point.x).to_bytes(32, "big") + int(point.y).to_bytes(32, "big"))
+
+        assert Transcript("t", "sha256").append(point).digest() == expected
+        assert Transcript("t", "sha256").append(serializable(point)).digest() == expected
+
+    def test_nested_lists(self):
+        """Test lists nest with their counts, strings with their lengths."""
+        expected = digest_of(
+            b"L" + (2).to_bytes(4, "big"),
+            b"L" + (1).to_bytes(4, "big"), b"I" + (1).to_bytes(32, "big"),
+            b"L" + (2).to_bytes(4, "big"), b"S" + (2).to_bytes(4, "big") + b"ab", b"N",
+        )
+
+        assert Transcript("t", "sha256").append([[1], ("ab", None)]).digest() == expected
+
+
+class RecordingHash:
+    """sha256 that records the size of each update."""
+
+    def __init__(self, hash):
+        self.hash = hash
+        self.updates = []
+
+    def update(self, data):
+        self.updates.append(len(data))
+        self.hash.update(data)
+
+    def digest(self):
+        return self.hash.digest()
+
+
+class TestFlush:
+    """Test cases for hashing long values in pieces."""
+
+    def test_long_list_hashed_in_pieces(self):
+        """Test one long list reaches the hash in pieces of about _FLUSH bytes."""
+        values = [list(range(5000)), {"k": list(range(5000))}]
+        expected = Transcript("t", "sha256").append(*values).digest()
+        transcript = Transcript("t", "sha256")
+        transcript._hash = RecordingHash(transcript._hash)
+
+        assert transcript.append(*values).digest() == expected
+        assert len(transcript._hash.updates) > 4
+        assert max(transcript._hash.updates) < transcript_module._FLUSH + 64
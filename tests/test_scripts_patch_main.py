@@ -0,0 +1,113 @@
+import ast
+
+import pytest
+
+from scripts import patch_main
+
+MAIN = '''"""Hyperion."""
+import multiprocessing
+from multiprocessing import Process
+
+
+def tally(teller, chunks, q1, q2, q3):
+    processes = [
+        multiprocessing.Process(target=teller.mp_raise_h, args=(chunk, q1, q2, q3))
+        for chunk in chunks
+    ]
+    other = Process(target=teller.mp_partial_decrypt, args=(chunks[0], q1, q2, q3))
+    unrelated = multiprocessing.Process(target=print, args=("x",))
+    return processes, other, unrelated
+'''
+
+
+class TestPatch:
+    """Test cases for patching main.py."""
+
+    def test_rewrites_teller_targets_only(self):
+        """Test both import styles are rewritten and other Processes kept."""
+        patched, count = patch_main.patch(MAIN)
+
+        assert count == 2
+        assert "_teller_pool.TellerProcess(target=teller.mp_raise_h" in patched
+        assert "_teller_pool.TellerProcess(target=teller.mp_partial_decrypt" in patched
+        assert "multiprocessing.Process(target=print" in patched
+        ast.parse(patched)
+
+    def test_import_follows_docstring(self):
+        """Test the pool import goes after the module docstring."""
+        patched, _ = patch_main.patch(MAIN)
+        lines = patched.splitlines()
+
+        assert lines[0] == '"""Hyperion."""'
+        assert lines[1] == patch_main.MARKER
+        assert lines[2] == "import pool as _teller_pool"
+
+    def test_idempotent(self):
+        """Test patching twice changes nothing the second time."""
+        patched, _ = patch_main.patch(MAIN)
+
+        assert patch_main.patch(patched) == (patched, 0)
+
+    def test_no_teller_targets(self):
+        """Test a main.py without teller Process calls is left unchanged."""
+        source = "import os\nprint(os.getpid())\n"
+
+        assert patch_main.patch(source) == (source, 0)
+
+    def test_main_writes_file(self, tmp_path, capsys):
+        """Test the command line patches the file in place."""
+        path = tmp_path / "main.py"
+        path.write_text(MAIN)
+
+        patch_main.main([str(path)])
+
+        assert "_teller_pool.TellerProcess" in path.read_text()
+        assert "2 teller Process call(s)" in capsys.readouterr().out
+
+
+VERIFY = '''
+def check(teller, proof, share, board, output, q1):
+    ok = teller.verify_decryption_proof(
+        proof["tau_1"], proof["p_1_1"], proof["p_1_2"], proof["w_1"], share, board, output
+    )
+    also = Teller.verify_decryption_proof(teller, 1, 2, 3, 4, share, board, output, indices=proof["indices"])
+    Process(target=teller.mp_full_decrypt, args=(output, board, 1, q1))
+    return ok, also
+'''
+
+
+class TestContractErrors:
+    """Test cases for checking main.py's calls against the patched Teller."""
+
+    def test_matching_calls(self):
+        """Test calls with the chunk's output, with or without indices, pass."""
+        assert patch_main.contract_errors(MAIN) == []
+        assert patch_main.contract_errors(VERIFY) == []
+
+    def test_missing_output(self):
+        """Test a decryption proof check without the partial decryptions is reported."""
+        source = "ok = teller.verify_decryption_proof(tau, p_1, p_2, w, share, board)\n"
+
+        assert patch_main.contract_errors(source) == [
+            "line 1: verify_decryption_proof called with 6 argument(s), expected 7 to 9"
+        ]
+
+    def test_process_target(self):
+        """Test Process targets are checked by their args tuple."""
+        source = "p = Process(target=teller.mp_partial_decrypt, args=(chunk, q1))\n"
+
+        assert patch_main.contract_errors(source) == [
+            "line 1: mp_partial_decrypt called with 2 argument(s), expected 4"
+        ]
+
+    def test_main_refuses_mismatch(self, tmp_path, capsys):
+        """Test the command line leaves a mismatching main.py unpatched."""
+        path = tmp_path / "main.py"
+        source = MAIN + "teller.verify_decryption_proof(tau)\n"
+        path.write_text(source)
+
+        with pytest.raises(SystemExit):
+            patch_main.main([str(path)])
+
+        assert path.read_text() == source
+        assert "[ERROR]" in capsys.readouterr().out
@@ -65,6 +65,52 @@ class TestCastBallotEndpoint:
         assert response1.json()["row_id"] != response2.json()["row_id"]
 
 
+class TestBallotsEndpoint:
+    """Test cases for the cast ballot sync and lookup endpoints."""
+
+    def cast(self, client, sample_cast_data, voter_id):
+        return client.post("/cast", json={**sample_cast_data, "voter_id": voter_id}).json()
+
+    def test_sync_since_cursor(self, client, sample_cast_data):
+        """Test a client only receives rows appended after its cursor."""
+        for voter_id in ("a", "b"):
+            self.cast(client, sample_cast_data, voter_id)
+        first = client.get("/ballots").json()
+        self.cast(client, sample_cast_data, "c")
+
+        second = client.get(f"/ballots?since={first['cursor']}").json()
+
+        assert [r["voter_id"] for r in first["ballots"]] == ["a", "b"]
+        assert first["cursor"] == 2
+        assert [r["voter_id"] for r in second["ballots"]] == ["c"]
+        assert second["cursor"] == 3
+        assert second["total"] == 3
+
+    def test_sync_limit(self, client, sample_cast_data):
+        """Test limit caps a sync and the cursor resumes after it."""
+        for voter_id in ("a", "b", "c"):
+            self.cast(client, sample_cast_data, voter_id)
+
+        result = client.get("/ballots?since=1&limit=1").json()
+
+        assert [r["voter_id"] for r in result["ballots"]] == ["b"]
+        assert result["cursor"] == 2
+
+    def test_lookup_own_ballot(self, client, sample_cast_data):
+        """Test a voter finds their ballot by the row id /cast returned."""
+        self.cast(client, sample_cast_data, "a")
+        cast = self.cast(client, sample_cast_data, "b")
+
+        result = client.get(f"/ballots/{cast['row_id']}").json()
+
+        assert result["ballot"]["voter_id"] == "b"
+        assert result["ballot"]["seq"] == cast["seq"] == 1
+
+    def test_lookup_unknown_ballot(self, client):
+        """Test unknown row ids return 404."""
+        assert client.get("/ballots/missing").status_code == 404
+
+
 class TestTallyEndpoint:
     """Test cases for tallying endpoint."""
     
@@ -157,6 +203,47 @@ class TestBulletinBoardEndpoint:
         assert "bb" in result
         assert result["bb"] == mock_result["bulletin_board"]
 
+    def test_get_bb_page(self, client, election):
+        """Test paging through the bulletin board with offset and limit."""
+        election.last_bb = [{"vote": str(i), "commitment": ""} for i in range(10)]
+
+        response = client.get("/bb?offset=4&limit=3")
+
+        assert response.status_code == 200
+        result = response.json()
+        assert [row["vote"] for row in result["bb"]] == ["4", "5", "6"]
+        assert result["offset"] == 4
+        assert result["total"] == 10
+
+    def test_get_bb_page_past_end(self, client, election):
+        """Test an offset past the end returns no rows."""
+        election.last_bb = [{"vote": "0", "commitment": ""}]
+
+        result = client.get("/bb?offset=5&limit=3").json()
+
+        assert result["bb"] == []
+        assert result["total"] == 1
+
+    def test_get_bb_compressed(self, client, election):
+        """Test the compressed encoding returns SEC1 points."""
+        election.last_bb = [{"index": 0, "vote": "", "x": 5, "y": 2, "curve": "P-256", "commitment": "c"}]
+
+        result = client.get("/bb?encoding=compressed").json()
+
+        assert result["encoding"] == "compressed"
+        assert result["bb"][0]["point"] == "02" + "00" * 31 + "05"
+        assert "x" not in result["bb"][0]
+
+    def test_get_bb_invalid_encoding(self, client, election):
+        """Test unknown encodings are rejected."""
+        election.last_bb = [{"vote": "", "commitment": ""}]
+
+        assert client.get("/bb?encoding=der").status_code == 422
+
+    def test_get_bb_invalid_limit(self, client):
+        """Test a non-positive limit is rejected."""
+        assert client.get("/bb?limit=0").status_code == 422
+
 
 class TestTallyResultsEndpoint:
     """Test cases for tally results endpoint."""
@@ -201,11 +288,10 @@ class TestNotificationEndpoint:
         assert response.status_code == 404
         assert "No tally results yet" in response.json()["detail"]
     
-    def test_notify_voter_not_found(self, client):
+    def test_notify_voter_not_found(self, client, election):
         """Test notification for non-existent voter."""
         # Mock that tally has run
-        from server.app import LAST_TALLY
-        with patch('server.app.LAST_TALLY', {"some": "result"}):
+        with patch.object(election, 'last_tally', {"some": "result"}):
             response = client.get("/notify/nonexistent_voter")
             
             assert response.status_code == 404
@@ -0,0 +1,129 @@
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+from server import checkpoints
+from server.checkpoints import CheckpointRun
+from server.hyperion_runner import run_hyperion
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_root(tmp_path, monkeypatch):
+    """Keep checkpoints in a temporary directory."""
+    monkeypatch.setattr(checkpoints, "CHECKPOINT_ROOT", str(tmp_path / "checkpoints"))
+    return tmp_path / "checkpoints"
+
+
+def make_checkpoint(root, run_id="a" * 32, size=10):
+    """Create a checkpoint directory with one log of `size` bytes."""
+    path = root / run_id
+    path.mkdir(parents=True)
+    (path / "123.log").write_bytes(b"x" * size)
+    return run_id
+
+
+class TestCheckpointRun:
+    """Test cases for CheckpointRun."""
+
+    def test_new_run(self):
+        """Test a new run gets a fresh id and directory."""
+        run = CheckpointRun()
+
+        assert not run.resumed
+        assert len(run.run_id) == 32
+        assert run.dir.endswith(run.run_id)
+
+    def test_child_env(self):
+        """Test the subprocess is told where to checkpoint and what to rerun."""
+        run = CheckpointRun(rerun_phase="tallying-mixing")
+
+        env = run.child_env({"PATH": "/bin"})
+
+        assert env["HYPERION_CHECKPOINT_DIR"] == os.path.abspath(run.dir)
+        assert env["HYPERION_CHECKPOINT_RERUN"] == "tallying-mixing"
+        assert env["PATH"] == "/bin"
+
+    def test_resume(self, checkpoint_root):
+        """Test resuming an existing checkpoint reuses its directory."""
+        run_id = make_checkpoint(checkpoint_root)
+
+        run = CheckpointRun(run_id)
+
+        assert run.resumed
+        assert run.to_dict()["bytes"] == 10
+
+    @pytest.mark.parametrize("run_id, phase", [
+        ("../etc", None),
+        ("b" * 32, None),
+        (None, "mixing"),
+    ])
+    def test_invalid(self, run_id, phase):
+        """Test bad ids, unknown checkpoints and unknown phases are rejected."""
+        with pytest.raises(ValueError):
+            CheckpointRun(run_id, phase)
+
+
+class TestCheckpointStore:
+    """Test cases for listing and deleting checkpoints."""
+
+    def test_list(self, checkpoint_root):
+        """Test checkpoints are listed with their size."""
+        run_id = make_checkpoint(checkpoint_root, size=5)
+
+        assert checkpoints.list_checkpoints() == [
+            {"run_id": run_id, "bytes": 5, "updated": pytest.approx(os.path.getmtime(checkpoint_root / run_id / "123.log"))}
+        ]
+
+    def test_delete(self, checkpoint_root):
+        """Test deleting removes the directory and unknown ids are refused."""
+        run_id = make_checkpoint(checkpoint_root)
+
+        assert checkpoints.delete_checkpoint(run_id)
+        assert not checkpoints.delete_checkpoint(run_id)
+        assert checkpoints.list_checkpoints() == []
+
+
+class TestCheckpointedRuns:
+    """Test cases for runs with checkpoints."""
+
+    @patch('server.hyperion_runner.subprocess.run')
+    def test_run_reports_checkpoint(self, mock_run):
+        """Test run_hyperion passes the directory on and reports the checkpoint."""
+        mock_run.return_value = MagicMock(stdout="")
+        run = CheckpointRun()
+
+        result = run_hyperion(checkpoint=run)
+
+        env = mock_run.call_args.kwargs["env"]
+        assert env["HYPERION_CHECKPOINT_DIR"] == os.path.abspath(run.dir)
+        assert result["checkpoint"]["run_id"] == run.run_id
+
+    @patch('server.app.run_hyperion')
+    def test_endpoint_resume(self, mock_run_hyperion, client, checkpoint_root):
+        """Test /hyperion resumes a checkpoint and keeps it out of the history."""
+        run_id = make_checkpoint(checkpoint_root)
+        mock_run_hyperion.return_value = {
+            "bulletin_board": [], "timings": {"Setup": 0.0}, "raw_output": "",
+            "checkpoint": {"run_id": run_id},
+        }
+
+        with patch('server.app.history.record_run') as record_run:
+            response = client.post("/hyperion", json={"resume": run_id})
+
+        assert response.status_code == 200
+        assert response.json()["checkpoint"]["run_id"] == run_id
+        assert mock_run_hyperion.call_args.kwargs["checkpoint"].run_id == run_id
+        record_run.assert_not_called()
+
+    def test_endpoint_unknown_checkpoint(self, client):
+        """Test resuming an unknown checkpoint is rejected before running."""
+        response = client.post("/hyperion", json={"resume": "c" * 32})
+
+        assert response.status_code == 422
+
+    def test_endpoints_list_and_delete(self, client, checkpoint_root):
+        """Test /checkpoints lists and deletes stored runs."""
+        run_id = make_checkpoint(checkpoint_root)
+
+        assert client.get("/checkpoints").json()["checkpoints"][0]["run_id"] == run_id
+        assert client.delete(f"/checkpoints/{run_id}").status_code == 200
+        assert client.delete(f"/checkpoints/{run_id}").status_code == 404
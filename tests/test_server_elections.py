@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import patch
+from server import elections, storage
+
+
+RESULT = {
+    "bulletin_board": [{"vote": "v", "commitment": "c"}],
+    "timings": {},
+    "raw_output": "",
+}
+
+
+class TestElections:
+    """Test cases for the election registry."""
+
+    def test_default_election_uses_module_store(self):
+        """Test the default election shares the module-level storage."""
+        assert elections.get_election().store is storage.DEFAULT_STORE
+
+    def test_elections_are_separate(self):
+        """Test each election gets its own store."""
+        a = elections.get_election("a")
+        b = elections.get_election("b")
+
+        a.store.cast_ballot("v1", "h", "YES", "sig")
+
+        assert len(a.store.BB) == 1
+        assert b.store.BB == []
+        assert elections.get_election("a") is a
+
+    def test_invalid_id(self):
+        """Test ids outside the allowed characters are rejected."""
+        with pytest.raises(ValueError):
+            elections.get_election("../etc")
+
+    def test_drop_running_election(self):
+        """Test an election cannot be dropped during a run."""
+        elections.get_election("a").running = True
+
+        assert elections.drop_election("a") is False
+        assert elections.drop_election("unknown") is False
+
+
+class TestElectionEndpoints:
+    """Test cases for election-scoped endpoints."""
+
+    def test_ballots_per_election(self, client, sample_voter_data, sample_cast_data):
+        """Test ballots cast in one election do not show up in another."""
+        client.post("/elections/e1/register", json=sample_voter_data)
+        client.post("/elections/e1/cast", json=sample_cast_data)
+        client.post("/elections/e2/cast", json=sample_cast_data)
+        client.post("/elections/e2/cast", json=sample_cast_data)
+
+        e1 = client.get("/elections/e1/ballots").json()
+        e2 = client.get("/ballots?election_id=e2").json()
+
+        assert e1["total"] == 1
+        assert e2["total"] == 2
+        assert storage.BB == []
+
+    @patch('server.app.run_hyperion')
+    def test_tally_per_election(self, mock_run_hyperion, client):
+        """Test a run only sets the board of its own election."""
+        mock_run_hyperion.return_value = RESULT
+
+        response = client.post("/elections/e1/hyperion", json={})
+
+        assert response.status_code == 200
+        assert client.get("/elections/e1/bb").json()["bb"] == RESULT["bulletin_board"]
+        assert client.get("/elections/e2/bb").status_code == 404
+        assert client.get("/bb").status_code == 404
+
+    @patch('server.app.run_hyperion')
+    def test_runs_of_other_elections_not_blocked(self, mock_run_hyperion, client):
+        """Test a run in progress only blocks its own election."""
+        mock_run_hyperion.return_value = RESULT
+        elections.get_election("busy").running = True
+
+        assert client.post("/elections/busy/hyperion", json={}).status_code == 409
+        assert client.post("/elections/free/hyperion", json={}).status_code == 200
+
+    def test_invalid_election_id(self, client):
+        """Test malformed election ids return 422."""
+        assert client.get("/ballots?election_id=bad id").status_code == 422
+
+    def test_list_and_drop(self, client, sample_cast_data):
+        """Test elections can be listed and dropped."""
+        client.post("/elections/e1/cast", json=sample_cast_data)
+
+        listed = client.get("/elections").json()["elections"]
+        dropped = client.delete("/elections/e1")
+
+        summary = next(e for e in listed if e["election_id"] == "e1")
+        assert summary["ballots"] == 1
+        assert summary["voters"] == 0
+        assert summary["tallied"] is False
+        assert dropped.status_code == 200
+        assert "e1" not in elections.ELECTIONS
@@ -0,0 +1,106 @@
+import pytest
+from unittest.mock import patch
+from server import history
+from server.history import record_run, load_history, find_regressions
+
+
+def run(voters, seconds, phase="Setup", at=0):
+    """A history entry with one phase timing."""
+    return {
+        "id": str(at),
+        "at": at,
+        "params": {"voters": voters, "tellers": 3, "threshold": 2, "max_votes": 2},
+        "timings": {phase: seconds},
+        "peak_rss_mb": {},
+    }
+
+
+class TestRecordRun:
+    """Test cases for record_run and load_history."""
+
+    def test_round_trip(self):
+        """Test recorded runs are loaded back oldest first."""
+        params = {"voters": 10, "tellers": 3, "threshold": 2, "max_votes": 2, "tracemalloc": True}
+        result = {
+            "timings": {"Setup": 1.5, "Voting (avg.)": 0.2},
+            "memory": {"Setup": {"peak_rss_mb": 40.0}, "main": {"peak_rss_mb": 60.0}},
+        }
+
+        record_run(params, result)
+        record_run({**params, "voters": 20}, result)
+
+        runs = load_history()
+        assert [r["params"]["voters"] for r in runs] == [10, 20]
+        assert "tracemalloc" not in runs[0]["params"]
+        assert runs[0]["timings"] == {"Setup": 1.5, "Voting (avg.)": 0.2}
+        assert runs[0]["peak_rss_mb"] == {"Setup": 40.0}
+
+    def test_limit(self):
+        """Test limit keeps the most recent runs."""
+        for voters in (1, 2, 3):
+            record_run({"voters": voters}, {"timings": {"Setup": 1.0}})
+
+        assert [r["params"]["voters"] for r in load_history(limit=2)] == [2, 3]
+
+    def test_no_history(self):
+        """Test a missing history file yields no runs."""
+        assert load_history() == []
+
+
+class TestFindRegressions:
+    """Test cases for find_regressions."""
+
+    def test_slower_than_baseline(self):
+        """Test a phase well above the median of earlier runs is flagged."""
+        runs = [run(50, 1.0, at=1), run(50, 1.1, at=2), run(50, 0.9, at=3), run(50, 1.5, at=4)]
+
+        result = find_regressions(runs)
+
+        assert [r["regressions"] for r in result[:3]] == [[], [], []]
+        regression = result[3]["regressions"][0]
+        assert regression["phase"] == "Setup"
+        assert regression["baseline"] == 1.0
+        assert regression["change"] == pytest.approx(0.5)
+
+    def test_within_tolerance(self):
+        """Test small slowdowns are not flagged."""
+        result = find_regressions([run(50, 1.0), run(50, 1.1)])
+
+        assert result[1]["regressions"] == []
+
+    def test_baseline_per_configuration(self):
+        """Test runs are only compared with runs of the same parameters."""
+        result = find_regressions([run(50, 1.0), run(500, 10.0)])
+
+        assert result[1]["regressions"] == []
+
+
+class TestHistoryEndpoint:
+    """Test cases for the /history endpoint."""
+
+    @patch('server.app.run_hyperion')
+    def test_runs_are_recorded(self, mock_run_hyperion, client):
+        """Test /hyperion runs show up in the history."""
+        mock_run_hyperion.return_value = {
+            "bulletin_board": [],
+            "timings": {"Setup": 1.0},
+            "raw_output": "",
+        }
+
+        client.post("/hyperion", json={"voters": 7})
+        response = client.get("/history")
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["phases"] == history.PHASES
+        assert [r["params"]["voters"] for r in result["runs"]] == [7]
+        assert result["runs"][0]["regressions"] == []
+
+    @patch('server.app.run_hyperion')
+    def test_runs_without_timings_not_recorded(self, mock_run_hyperion, client):
+        """Test failed runs without a timing table are left out."""
+        mock_run_hyperion.return_value = {"bulletin_board": [], "timings": {}, "raw_output": ""}
+
+        client.post("/hyperion", json={})
+
+        assert client.get("/history").json()["runs"] == []
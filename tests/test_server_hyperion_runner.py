@@ -1,6 +1,7 @@
+import os
 import pytest
 from unittest.mock import patch, MagicMock
-from server.hyperion_runner import run_hyperion, parse_timings, parse_bulletin_board
+from server.hyperion_runner import run_hyperion, parse_timings, parse_bulletin_board, child_env
 
 
 class TestRunHyperion:
@@ -29,9 +30,10 @@ Setup | 1.5 | 2.3 | 0.8
         
         # Verify subprocess was called with correct arguments
         mock_subprocess.assert_called_once_with(
-            ["python3", "hyperion/main.py", "10", "3", "2"],
+            ["python3", "hyperion/main.py", "10", "3", "2", "-maxv", "2"],
             capture_output=True,
-            text=True
+            text=True,
+            env=dict(os.environ, HYPERION_THRESHOLD="2,3")
         )
     
     @patch('subprocess.run')
@@ -43,11 +45,12 @@ Setup | 1.5 | 2.3 | 0.8
         
         result = run_hyperion()
         
-        # Should use default values: voters=50, tellers=3, max_votes=2
+        # Should use default values: voters=50, tellers=3, threshold=2, max_votes=2
         mock_subprocess.assert_called_once_with(
-            ["python3", "hyperion/main.py", "50", "3", "2"],
+            ["python3", "hyperion/main.py", "50", "3", "2", "-maxv", "2"],
             capture_output=True,
-            text=True
+            text=True,
+            env=dict(os.environ, HYPERION_THRESHOLD="2,3")
         )
     
     @patch('subprocess.run')
@@ -60,9 +63,10 @@ Setup | 1.5 | 2.3 | 0.8
         result = run_hyperion(voters=100, tellers=5, max_votes=3)
         
         mock_subprocess.assert_called_once_with(
-            ["python3", "hyperion/main.py", "100", "5", "3"],
+            ["python3", "hyperion/main.py", "100", "5", "2", "-maxv", "3"],
             capture_output=True,
-            text=True
+            text=True,
+            env=dict(os.environ, HYPERION_THRESHOLD="2,5")
         )
     
     @patch('server.hyperion_runner.parse_timings')
@@ -86,6 +90,20 @@ Setup | 1.5 | 2.3 | 0.8
         assert result["bulletin_board"] == [{"vote": "test"}]
 
 
+class TestChildEnv:
+    """Test cases for the subprocess environment."""
+
+    def test_no_settings_inherits_environment(self):
+        """Test that a run without settings inherits the server's environment."""
+        assert child_env() is None
+
+    def test_threshold(self):
+        """Test that the threshold and teller count reach the subprocess."""
+        env = child_env(threshold=(3, 5), cores=2)
+        assert env["HYPERION_THRESHOLD"] == "3,5"
+        assert env["HYPERION_CORES"] == "2"
+
+
 class TestParseTimings:
     """Test cases for parse_timings function."""
     
@@ -198,6 +216,42 @@ class TestParseBulletinBoard:
             assert "vote" in entry
             assert "commitment" in entry
     
+    def test_parse_bulletin_board_structured_rows(self):
+        """Test rows carry the parsed point, curve and board index."""
+        text = """
++---+---+
+| Vote | Commitment |
++---+---+
+| {'x': 123, 'y': 456, 'curve': 'P-256'} | abc123 |
++---+---+
+| {'x': 789, 'y': 12, 'curve': 'P-256'} | def456 |
++---+---+
+"""
+        result = parse_bulletin_board(text)
+
+        assert [(r["index"], r["x"], r["y"], r["curve"]) for r in result] == [
+            (0, 123, 456, "P-256"),
+            (1, 789, 12, "P-256"),
+        ]
+        assert result[1]["commitment"] == "def456"
+
+    def test_parse_bulletin_board_wrapped_coordinates(self):
+        """Test long coordinates wrapped across table lines are joined."""
+        text = """
++---+---+
+| Vote | Commitment |
++---+---+
+| {'x': 12345 | abc |
+| 67890, 'y': 1, | 123 |
+| 'curve': 'P-256'} |  |
++---+---+
+"""
+        result = parse_bulletin_board(text)
+
+        assert result[0]["x"] == 1234567890
+        assert result[0]["y"] == 1
+        assert result[0]["commitment"] == "abc123"
+
     def test_parse_bulletin_board_no_table(self):
         """Test parsing text without bulletin board table."""
         text = "No bulletin board data here"
@@ -0,0 +1,176 @@
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from server.app import app, SCHEDULER
+from server import jobs
+from server.jobs import Job
+from server.hyperion_runner import PHASES, RunCancelled
+
+
+RESULT = {
+    "bulletin_board": [{"vote": "v", "commitment": "c"}],
+    "timings": {"Setup": 1.0},
+    "raw_output": "output",
+    "memory": {},
+}
+
+
+@pytest.fixture
+def live_client():
+    """Test client whose event loop outlives single requests, for background tasks."""
+    with TestClient(app) as c:
+        yield c
+    jobs.JOBS.clear()
+
+
+def wait_for(client, job_id, timeout=5.0):
+    """Poll a job until it leaves the queued/running states."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+class TestJob:
+    """Test cases for Job."""
+
+    def test_progress_follows_phases(self):
+        """Test the latest phase sets progress and repeated reports are ignored."""
+        job = Job({}, MagicMock())
+
+        job.on_event({"phase": PHASES[0], "pid": 1})
+        job.on_event({"phase": PHASES[2], "pid": 2})
+        job.on_event({"phase": PHASES[0], "pid": 3})
+
+        assert job.phase == PHASES[2]
+        assert job.progress == 2 / len(PHASES)
+        assert [e["phase"] for e in job.events] == [PHASES[0], PHASES[2]]
+
+    def test_unknown_phase_ignored(self):
+        """Test events for phases outside the protocol are dropped."""
+        job = Job({}, MagicMock())
+
+        job.on_event({"phase": "main", "pid": 1})
+
+        assert job.phase is None
+        assert job.progress == 0.0
+
+    def test_cancel_only_active_jobs(self):
+        """Test cancel reaches the process only while the job is active."""
+        process = MagicMock()
+        job = Job({}, process)
+        job.status = "done"
+
+        job.cancel()
+
+        process.cancel.assert_not_called()
+
+    def test_add_job_evicts_oldest_finished(self):
+        """Test the job table keeps at most MAX_JOBS entries."""
+        with patch.object(jobs, "MAX_JOBS", 2), patch.dict(jobs.JOBS, clear=True):
+            old = [Job({}, MagicMock()) for _ in range(2)]
+            for job in old:
+                job.finished = time.time()
+                jobs.add_job(job)
+
+            jobs.add_job(Job({}, MagicMock()))
+
+            assert old[0].job_id not in jobs.JOBS
+            assert len(jobs.JOBS) == 2
+
+
+class TestJobEndpoints:
+    """Test cases for the /jobs endpoints."""
+
+    @patch('server.app.HyperionProcess')
+    def test_job_runs_to_completion(self, mock_process, live_client):
+        """Test a job finishes with the same result shape as /hyperion."""
+        mock_process.return_value.run.return_value = RESULT
+
+        response = live_client.post("/jobs", json={"voters": 5})
+
+        assert response.status_code == 200
+        job = wait_for(live_client, response.json()["job_id"])
+        assert job["status"] == "done"
+        assert job["progress"] == 1.0
+        assert job["params"]["voters"] == 5
+        assert job["result"]["tally"] == RESULT["bulletin_board"]
+        assert job["result"]["timings"] == RESULT["timings"]
+        assert live_client.get("/bb").json()["bb"] == RESULT["bulletin_board"]
+
+    @patch('server.app.HyperionProcess')
+    def test_job_failure(self, mock_process, live_client):
+        """Test a failing run is reported on the job and frees the server."""
+        mock_process.return_value.run.side_effect = RuntimeError("boom")
+
+        job_id = live_client.post("/jobs", json={}).json()["job_id"]
+
+        job = wait_for(live_client, job_id)
+        assert job["status"] == "failed"
+        assert job["error"] == "boom"
+        assert "result" not in job
+        assert live_client.post("/jobs", json={}).status_code == 200
+
+    @patch('server.app.HyperionProcess')
+    def test_job_cancel(self, mock_process, live_client):
+        """Test DELETE cancels the run."""
+        process = mock_process.return_value
+
+        def run():
+            time.sleep(0.1)
+            raise RunCancelled()
+        process.run.side_effect = run
+
+        job_id = live_client.post("/jobs", json={}).json()["job_id"]
+        response = live_client.delete(f"/jobs/{job_id}")
+
+        assert response.status_code == 200
+        process.cancel.assert_called_once()
+        assert wait_for(live_client, job_id)["status"] == "cancelled"
+
+    def test_job_conflict(self, client, election):
+        """Test a job cannot start while another run is in progress."""
+        election.running = True
+
+        response = client.post("/jobs", json={})
+
+        assert response.status_code == 409
+
+    def test_unknown_job(self, client):
+        """Test unknown job ids return 404."""
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.delete("/jobs/missing").status_code == 404
+
+
+class TestScheduledJobs:
+    """Test cases for jobs admitted by the server's scheduler."""
+
+    @patch('server.app.HyperionProcess')
+    def test_job_gets_core_allotment(self, mock_process, live_client):
+        """Test a job records its grant and passes the cores to the process."""
+        mock_process.return_value.run.return_value = RESULT
+
+        job_id = live_client.post("/jobs", json={"voters": 5}).json()["job_id"]
+
+        job = wait_for(live_client, job_id)
+        assert job["grant"]["cores"] == 1
+        assert mock_process.return_value.cores == 1
+        assert live_client.get("/scheduler").json()["used_cores"] == 0
+
+    @patch('server.app.HyperionProcess')
+    def test_cancel_queued_job(self, mock_process, live_client):
+        """Test a job waiting for admission can be cancelled without running."""
+        # Budget taken by another run
+        with patch.object(SCHEDULER, "used_cores", SCHEDULER.cores):
+            job_id = live_client.post("/jobs", json={}).json()["job_id"]
+            time.sleep(0.05)
+            assert live_client.get(f"/jobs/{job_id}").json()["status"] == "queued"
+
+            live_client.delete(f"/jobs/{job_id}")
+
+            assert wait_for(live_client, job_id)["status"] == "cancelled"
+        mock_process.return_value.run.assert_not_called()
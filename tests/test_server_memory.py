@@ -0,0 +1,123 @@
+import json
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+from server.memory import MemoryRun, summarize, MB
+from server.hyperion_runner import run_hyperion
+
+
+def write_record(run, pid, phases):
+    """Simulate the memory record a Hyperion process writes on exit."""
+    with open(os.path.join(run.child_dir, f"memory-{pid}.json"), "w") as f:
+        json.dump({"pid": pid, "phases": phases}, f)
+
+
+class TestMemoryRun:
+    """Test cases for MemoryRun."""
+
+    def test_child_env_rss_only(self):
+        """Test tracemalloc is not requested by default."""
+        run = MemoryRun()
+
+        env = run.child_env({})
+
+        assert env["HYPERION_MEMORY_DIR"] == run.child_dir
+        assert "HYPERION_TRACEMALLOC" not in env
+
+    def test_child_env_tracemalloc(self):
+        """Test tracemalloc is requested when enabled."""
+        run = MemoryRun(tracemalloc=True)
+
+        env = run.child_env({})
+
+        assert env["HYPERION_TRACEMALLOC"] == "1"
+
+    def test_collect_reads_records(self):
+        """Test collect combines the records and removes the directory."""
+        run = MemoryRun()
+        write_record(run, 1, {"Setup": {"peak_rss": 100 * MB}})
+
+        result = run.collect()
+
+        assert result["Setup"]["peak_rss_mb"] == 100.0
+        assert not os.path.exists(run.child_dir)
+
+
+class TestSummarize:
+    """Test cases for summarize."""
+
+    def test_rss_across_processes(self):
+        """Test per-phase peak, total and process count across workers."""
+        records = [
+            {"pid": 1, "phases": {"main": {"peak_rss": 50 * MB}}},
+            {"pid": 2, "phases": {"Tallying (Decryption)": {"peak_rss": 120 * MB}}},
+            {"pid": 3, "phases": {"Tallying (Decryption)": {"peak_rss": 80 * MB}}},
+        ]
+
+        result = summarize(records)
+
+        decryption = result["Tallying (Decryption)"]
+        assert decryption["peak_rss_mb"] == 120.0
+        assert decryption["total_rss_mb"] == 200.0
+        assert decryption["processes"] == 2
+        assert "traced_peak_mb" not in decryption
+        assert result["main"]["processes"] == 1
+
+    def test_tracemalloc_from_largest_process(self):
+        """Test top allocators come from the process with the largest traced peak."""
+        records = [
+            {"pid": 1, "phases": {"Setup": {
+                "peak_rss": MB, "traced_peak": 2 * MB,
+                "top": [{"where": "a.py:1", "size": MB, "count": 3}],
+            }}},
+            {"pid": 2, "phases": {"Setup": {
+                "peak_rss": MB, "traced_peak": 5 * MB,
+                "top": [{"where": "b.py:2", "size": 4 * MB, "count": 7}],
+            }}},
+        ]
+
+        result = summarize(records)
+
+        setup = result["Setup"]
+        assert setup["traced_peak_mb"] == 5.0
+        assert setup["top_allocators"] == [{"where": "b.py:2", "size_mb": 4.0, "count": 7}]
+
+    def test_no_records(self):
+        """Test an empty run yields no phases."""
+        assert summarize([]) == {}
+
+
+class TestMemoryInRun:
+    """Test cases for memory figures in Hyperion runs."""
+
+    @patch('subprocess.run')
+    def test_run_hyperion_collects_memory(self, mock_subprocess):
+        """Test run_hyperion passes the memory env and returns the figures."""
+        mock_result = MagicMock()
+        mock_result.stdout = "test output"
+        mock_subprocess.return_value = mock_result
+        run = MemoryRun()
+        write_record(run, 1, {"Setup": {"peak_rss": 10 * MB}})
+
+        result = run_hyperion(memory=run)
+
+        env = mock_subprocess.call_args.kwargs["env"]
+        assert env["HYPERION_MEMORY_DIR"] == run.child_dir
+        assert result["memory"]["Setup"]["peak_rss_mb"] == 10.0
+
+    @patch('server.app.run_hyperion')
+    def test_hyperion_endpoint_returns_memory(self, mock_run_hyperion, client):
+        """Test /hyperion returns memory next to timings."""
+        memory = {"Setup": {"peak_rss_mb": 10.0, "total_rss_mb": 10.0, "processes": 1}}
+        mock_run_hyperion.return_value = {
+            "bulletin_board": [],
+            "timings": {"Setup": 1.0},
+            "raw_output": "",
+            "memory": memory,
+        }
+
+        response = client.post("/hyperion", json={"tracemalloc": True})
+
+        assert response.status_code == 200
+        assert response.json()["memory"] == memory
+        assert mock_run_hyperion.call_args.kwargs["memory"].tracemalloc is True
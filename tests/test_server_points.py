@@ -0,0 +1,54 @@
+import pytest
+from server.points import compress_point, encode_rows
+
+# P-256 base point
+GX = 0x6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296
+GY = 0x4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5
+
+
+class TestCompressPoint:
+    """Test cases for compress_point."""
+
+    def test_odd_y(self):
+        """Test the SEC1 encoding of the P-256 base point."""
+        result = compress_point(GX, GY, "P-256")
+
+        assert result == "03" + format(GX, "064x")
+
+    def test_even_y_and_padding(self):
+        """Test an even y gets prefix 02 and x is padded to the field size."""
+        assert compress_point(5, 2, "P-256") == "02" + "00" * 31 + "05"
+
+    def test_unknown_curve(self):
+        """Test unknown curves use the minimal width of x."""
+        assert compress_point(0x1234, 1, "toy") == "031234"
+
+    def test_missing_coordinate(self):
+        """Test points without y cannot be compressed."""
+        assert compress_point(5, None, "P-256") is None
+
+
+class TestEncodeRows:
+    """Test cases for encode_rows."""
+
+    ROWS = [{"index": 0, "vote": "...", "x": GX, "y": GY, "curve": "P-256", "commitment": "c"}]
+
+    def test_json_unchanged(self):
+        """Test the default encoding returns the rows as stored."""
+        assert encode_rows(self.ROWS) is self.ROWS
+
+    def test_compressed(self):
+        """Test compressed rows carry only the point, curve and commitment."""
+        result = encode_rows(self.ROWS, "compressed")
+
+        assert result == [{
+            "index": 0,
+            "curve": "P-256",
+            "point": compress_point(GX, GY, "P-256"),
+            "commitment": "c",
+        }]
+
+    def test_unknown_encoding(self):
+        """Test unknown encodings are rejected."""
+        with pytest.raises(ValueError):
+            encode_rows(self.ROWS, "der")
@@ -0,0 +1,150 @@
+import cProfile
+import os
+import pstats
+import pytest
+from unittest.mock import patch, MagicMock
+from server import profiling
+from server.hyperion_runner import run_hyperion
+
+
+@pytest.fixture(autouse=True)
+def profile_root(tmp_path, monkeypatch):
+    """Collect profiles into a temporary directory."""
+    monkeypatch.setattr(profiling, "PROFILE_ROOT", str(tmp_path / "profiles"))
+    return tmp_path / "profiles"
+
+
+def write_pstats(path, func):
+    """Profile one call of func and dump it to path."""
+    profile = cProfile.Profile()
+    profile.runcall(func)
+    profile.dump_stats(path)
+
+
+def sample_work():
+    return sum(i * i for i in range(1000))
+
+
+class TestProfileRun:
+    """Test cases for ProfileRun."""
+
+    def test_unknown_mode_rejected(self):
+        """Test an unknown profile mode raises ValueError."""
+        with pytest.raises(ValueError):
+            profiling.ProfileRun("perf")
+
+    def test_child_env(self):
+        """Test the subprocess is told where and how to profile."""
+        run = profiling.ProfileRun("sampling")
+
+        env = run.child_env({"PATH": "/bin"})
+
+        assert env["PATH"] == "/bin"
+        assert env["HYPERION_PROFILE_DIR"] == run.child_dir
+        assert env["HYPERION_PROFILE_MODE"] == "sampling"
+
+    def test_collect_merges_pstats_per_phase(self):
+        """Test worker pstats of the same phase are merged into one file."""
+        run = profiling.ProfileRun("cprofile")
+        write_pstats(os.path.join(run.child_dir, "tallying-decryption.101.pstats"), sample_work)
+        write_pstats(os.path.join(run.child_dir, "tallying-decryption.102.pstats"), sample_work)
+        write_pstats(os.path.join(run.child_dir, "main.100.pstats"), sample_work)
+
+        files = run.collect()
+
+        assert files == {
+            "main": "main.pstats",
+            "tallying-decryption": "tallying-decryption.pstats",
+        }
+        stats = pstats.Stats(os.path.join(run.out_dir, files["tallying-decryption"]))
+        calls = [v[1] for k, v in stats.stats.items() if k[2] == "sample_work"]
+        assert calls == [2]
+        assert not os.path.exists(run.child_dir)
+
+    def test_collect_merges_collapsed_stacks(self):
+        """Test collapsed stacks from several workers are summed."""
+        run = profiling.ProfileRun("sampling")
+        with open(os.path.join(run.child_dir, "setup.1.collapsed"), "w") as f:
+            f.write("main;setup 3\nmain;keys 1\n")
+        with open(os.path.join(run.child_dir, "setup.2.collapsed"), "w") as f:
+            f.write("main;setup 2\n")
+
+        files = run.collect()
+
+        with open(os.path.join(run.out_dir, files["setup"])) as f:
+            assert f.read() == "main;setup 5\nmain;keys 1\n"
+
+
+class TestProfilePath:
+    """Test cases for profile_path."""
+
+    def test_existing_profile(self, profile_root):
+        """Test an existing profile file is found."""
+        os.makedirs(profile_root / "abc")
+        (profile_root / "abc" / "setup.pstats").write_text("")
+
+        assert profiling.profile_path("abc", "setup.pstats") == str(profile_root / "abc" / "setup.pstats")
+
+    def test_missing_profile(self):
+        """Test a missing profile returns None."""
+        assert profiling.profile_path("abc", "setup.pstats") is None
+
+    def test_path_traversal_rejected(self):
+        """Test names that leave the profile directory are rejected."""
+        assert profiling.profile_path("..", "setup.pstats") is None
+        assert profiling.profile_path("abc", "../setup.pstats") is None
+
+
+class TestProfiledRun:
+    """Test cases for profiling a Hyperion run."""
+
+    @patch('subprocess.run')
+    def test_run_hyperion_collects_profiles(self, mock_subprocess):
+        """Test run_hyperion passes the profile env and collects results."""
+        mock_result = MagicMock()
+        mock_result.stdout = "test output"
+        mock_subprocess.return_value = mock_result
+        run = profiling.ProfileRun("cprofile")
+        write_pstats(os.path.join(run.child_dir, "setup.1.pstats"), sample_work)
+
+        result = run_hyperion(profile=run)
+
+        env = mock_subprocess.call_args.kwargs["env"]
+        assert env["HYPERION_PROFILE_DIR"] == run.child_dir
+        assert result["profile"] == {"setup": "setup.pstats"}
+
+    @patch('server.app.run_hyperion')
+    def test_hyperion_endpoint_returns_profile_links(self, mock_run_hyperion, client, profile_root):
+        """Test /hyperion returns download links that serve the profiles."""
+        mock_run_hyperion.return_value = {
+            "bulletin_board": [],
+            "timings": {},
+            "raw_output": "",
+            "profile": {"setup": "setup.pstats"},
+        }
+
+        response = client.post("/hyperion", json={"profile": "cprofile"})
+
+        assert response.status_code == 200
+        profile = response.json()["profile"]
+        assert profile["mode"] == "cprofile"
+        url = profile["files"]["setup"]
+        assert url == f"/profiles/{profile['run_id']}/setup.pstats"
+
+        os.makedirs(profile_root / profile["run_id"])
+        (profile_root / profile["run_id"] / "setup.pstats").write_bytes(b"stats")
+        download = client.get(url)
+        assert download.status_code == 200
+        assert download.content == b"stats"
+
+    def test_hyperion_endpoint_rejects_unknown_mode(self, client):
+        """Test /hyperion validates the profile option."""
+        response = client.post("/hyperion", json={"profile": "perf"})
+
+        assert response.status_code == 422
+
+    def test_get_missing_profile(self, client):
+        """Test downloading a missing profile returns 404."""
+        response = client.get("/profiles/abc/setup.pstats")
+
+        assert response.status_code == 404
@@ -0,0 +1,111 @@
+import asyncio
+import pytest
+from server import scheduler
+from server.scheduler import Scheduler
+
+
+class TestPlan:
+    """Test cases for Scheduler.plan."""
+
+    def test_cores_scale_with_voters(self):
+        """Test the core allotment grows with the voter count up to the budget."""
+        sched = Scheduler(cores=4, memory_mb=0)
+
+        assert sched.plan({"voters": 50}).cores == 1
+        assert sched.plan({"voters": 1000, "tellers": 3}).cores == 2
+        assert sched.plan({"voters": 100 * scheduler.BALLOTS_PER_CORE}).cores == 4
+
+    def test_cores_scale_with_tellers(self):
+        """Test more tellers, each processing every ballot, get more cores."""
+        sched = Scheduler(cores=8, memory_mb=0)
+
+        assert sched.plan({"voters": 1000, "tellers": 3}).cores == 2
+        assert sched.plan({"voters": 1000, "tellers": 6}).cores == 4
+
+    def test_memory_counts_tellers_and_workers(self):
+        """Test the memory estimate grows with tellers and pool workers."""
+        sched = Scheduler(cores=8, memory_mb=0)
+        small = sched.plan({"voters": 1000, "tellers": 3})
+        large = sched.plan({"voters": 1000, "tellers": 6})
+
+        assert large.memory_mb - small.memory_mb == pytest.approx(
+            2 * scheduler.WORKER_MB + 1000 * 3 * scheduler.MB_PER_BALLOT, abs=1
+        )
+
+    def test_default_priority(self):
+        """Test small runs are interactive and large runs batch."""
+        sched = Scheduler(cores=4, memory_mb=0)
+
+        assert sched.plan({"voters": 50}).priority == scheduler.INTERACTIVE
+        assert sched.plan({"voters": 20000}).priority == scheduler.BATCH
+        assert sched.plan({"voters": 20000, "priority": 1}).priority == 1
+
+    def test_memory_capped_at_budget(self):
+        """Test a run larger than the memory budget can still be admitted alone."""
+        sched = Scheduler(cores=4, memory_mb=100)
+
+        assert sched.plan({"voters": 100000, "tellers": 5}).memory_mb == 100
+
+
+class TestAdmission:
+    """Test cases for Scheduler.acquire and release."""
+
+    def test_waits_for_budget(self):
+        """Test a run that does not fit waits until another is released."""
+        async def scenario():
+            sched = Scheduler(cores=2, memory_mb=0)
+            first = await sched.acquire({"voters": 2 * scheduler.BALLOTS_PER_CORE, "tellers": 1})
+            waiting = asyncio.ensure_future(sched.acquire({"voters": 50}))
+            await asyncio.sleep(0)
+            assert not waiting.done()
+
+            sched.release(first)
+            grant = await waiting
+
+            assert grant.cores == 1
+            assert sched.used_cores == 1
+
+        asyncio.run(scenario())
+
+    def test_priority_order(self):
+        """Test a queued interactive run is admitted before an earlier batch run."""
+        async def scenario():
+            sched = Scheduler(cores=1, memory_mb=0)
+            first = await sched.acquire({"voters": 50})
+            admitted = []
+
+            async def run(name, params):
+                grant = await sched.acquire(params)
+                admitted.append(name)
+                sched.release(grant)
+
+            tasks = [
+                asyncio.ensure_future(run("sweep", {"voters": 20000})),
+                asyncio.ensure_future(run("small", {"voters": 50})),
+            ]
+            await asyncio.sleep(0)
+            sched.release(first)
+            await asyncio.gather(*tasks)
+
+            assert admitted == ["small", "sweep"]
+
+        asyncio.run(scenario())
+
+    def test_cancel_leaves_queue(self):
+        """Test cancelling a waiting run removes it from the queue."""
+        async def scenario():
+            sched = Scheduler(cores=1, memory_mb=0)
+            first = await sched.acquire({"voters": 50})
+            waiting = asyncio.ensure_future(sched.acquire({"voters": 50}))
+            await asyncio.sleep(0)
+
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+            sched.release(first)
+
+            assert sched.to_dict()["queued"] == []
+            assert sched.used_cores == 0
+
+        asyncio.run(scenario())
+
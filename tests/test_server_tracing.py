@@ -0,0 +1,159 @@
+import json
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+from server import tracing
+from server.hyperion_runner import run_hyperion
+
+
+@pytest.fixture(autouse=True)
+def trace_root(tmp_path, monkeypatch):
+    """Write exported traces into a temporary directory."""
+    monkeypatch.setattr(tracing, "TRACE_ROOT", str(tmp_path / "traces"))
+    return tmp_path / "traces"
+
+
+def write_child_events(trace, events):
+    """Simulate the events a Hyperion process writes on exit."""
+    path = os.path.join(trace.child_dir, "trace-4242.jsonl")
+    with open(path, "w") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+class TestTrace:
+    """Test cases for the Trace collector."""
+
+    def test_trace_disabled_by_default(self):
+        """Test a new trace does not create a child directory."""
+        trace = tracing.Trace()
+
+        assert not trace.enabled
+        assert trace.child_dir is None
+        assert trace.child_env() is None
+
+    def test_enable_sets_child_env(self):
+        """Test enabling a trace passes its directory to the subprocess."""
+        trace = tracing.Trace()
+        path = trace.enable()
+
+        env = trace.child_env()
+        assert env["HYPERION_TRACE_DIR"] == trace.child_dir
+        assert os.path.isdir(trace.child_dir)
+        assert path.endswith(f"{trace.trace_id}.json")
+
+    def test_span_records_complete_event(self):
+        """Test span records a Chrome 'X' event with its arguments."""
+        trace = tracing.Trace()
+
+        with trace.span("outer", voters=10):
+            with trace.span("inner"):
+                pass
+
+        names = [e["name"] for e in trace.events]
+        assert names == ["inner", "outer"]
+        outer = trace.events[1]
+        assert outer["ph"] == "X"
+        assert outer["args"] == {"voters": 10}
+        assert outer["dur"] >= trace.events[0]["dur"]
+
+    def test_export_merges_child_events(self, trace_root):
+        """Test export merges subprocess events and removes their files."""
+        trace = tracing.Trace()
+        trace.enable()
+        with trace.span("run_hyperion"):
+            pass
+        write_child_events(trace, [
+            {"name": "Teller.mp_raise_h", "ph": "X", "ts": 100, "dur": 50,
+             "pid": 4242, "tid": 1, "args": {"phase": "Tallying (Mixing)"}},
+        ])
+
+        path = trace.export()
+
+        with open(path) as f:
+            data = json.load(f)
+        names = [e["name"] for e in data["traceEvents"]]
+        assert "run_hyperion" in names
+        assert "Teller.mp_raise_h" in names
+        assert os.path.dirname(path) == str(trace_root)
+        assert not os.path.exists(trace.child_dir)
+
+
+class TestPhaseSpans:
+    """Test cases for derived phase spans."""
+
+    def test_phase_spans_cover_tagged_events(self):
+        """Test each phase span covers every event tagged with it."""
+        events = [
+            {"name": "a", "ph": "X", "ts": 100, "dur": 50, "args": {"phase": "Setup"}},
+            {"name": "b", "ph": "X", "ts": 120, "dur": 80, "args": {"phase": "Setup"}},
+            {"name": "c", "ph": "X", "ts": 300, "dur": 10, "args": {"phase": "Notification"}},
+            {"name": "d", "ph": "X", "ts": 0, "dur": 500, "args": {}},
+        ]
+
+        spans = [s for s in tracing.phase_spans(events) if s["ph"] == "X"]
+
+        assert [s["name"] for s in spans] == ["Setup", "Notification"]
+        assert spans[0]["ts"] == 100
+        assert spans[0]["dur"] == 100
+        assert spans[1]["ts"] == 300
+
+    def test_phase_spans_without_phases(self):
+        """Test only the lane metadata is returned when nothing is tagged."""
+        spans = tracing.phase_spans([{"name": "a", "ph": "X", "ts": 0, "dur": 1, "args": {}}])
+
+        assert [s["ph"] for s in spans] == ["M"]
+
+
+class TestTracedRun:
+    """Test cases for tracing a Hyperion run."""
+
+    @patch('subprocess.run')
+    def test_run_hyperion_records_spans(self, mock_subprocess):
+        """Test run_hyperion records its steps and passes the trace env."""
+        mock_result = MagicMock()
+        mock_result.stdout = "test output"
+        mock_subprocess.return_value = mock_result
+        trace = tracing.Trace()
+        trace.enable()
+
+        run_hyperion(voters=10, trace=trace)
+
+        names = [e["name"] for e in trace.events]
+        assert names == ["subprocess", "parse_timings", "parse_bulletin_board", "run_hyperion"]
+        env = mock_subprocess.call_args.kwargs["env"]
+        assert env["HYPERION_TRACE_DIR"] == trace.child_dir
+
+    @patch('server.app.run_hyperion')
+    def test_hyperion_endpoint_exports_trace(self, mock_run_hyperion, client):
+        """Test /hyperion with trace enabled writes a trace file."""
+        mock_run_hyperion.return_value = {
+            "bulletin_board": [],
+            "timings": {},
+            "raw_output": "",
+        }
+
+        response = client.post("/hyperion", json={"voters": 5, "trace": True})
+
+        assert response.status_code == 200
+        path = response.json()["trace"]
+        assert response.headers["X-Trace-Id"] in path
+        with open(path) as f:
+            names = [e["name"] for e in json.load(f)["traceEvents"]]
+        assert "POST /hyperion" in names
+
+    @patch('server.app.run_hyperion')
+    def test_hyperion_endpoint_untraced(self, mock_run_hyperion, client):
+        """Test /hyperion does not trace unless asked to."""
+        mock_run_hyperion.return_value = {
+            "bulletin_board": [],
+            "timings": {},
+            "raw_output": "",
+        }
+
+        response = client.post("/hyperion", json={"voters": 5})
+
+        assert response.status_code == 200
+        assert "trace" not in response.json()
+        assert "X-Trace-Id" not in response.headers
+        assert mock_run_hyperion.call_args.kwargs["trace"] is None
@@ -0,0 +1,151 @@
+import pytest
+from client.voter import VoterKeys
+from server import validation
+from server.storage import ElectionStore
+from server.validation import ValidationPipeline, check_ballot, counts
+
+
+@pytest.fixture
+def keys():
+    """Signing key and trapdoor of the registered voter."""
+    return VoterKeys()
+
+
+@pytest.fixture
+def store(keys):
+    """A store with one registered voter."""
+    store = ElectionStore()
+    store.register_voter("alice", keys.h, keys.pk_voter)
+    return store
+
+
+def cast(store, keys, voter_id="alice", vote="YES", h=None):
+    signed_ballot, proofs = keys.seal(voter_id, vote)
+    return store.cast_ballot(voter_id, h or keys.h, vote, signed_ballot, proofs)
+
+
+class TestCheckBallot:
+    """Test cases for check_ballot."""
+
+    def test_valid(self, store, keys):
+        """Test a signed ballot with a trapdoor proof from a registered voter passes."""
+        row = cast(store, keys)
+
+        assert check_ballot(store, row) is None
+
+    def test_unregistered_voter(self, store, keys):
+        """Test ballots from unknown voters are rejected."""
+        row = cast(store, keys, voter_id="mallory")
+
+        assert check_ballot(store, row) == "voter not registered"
+
+    def test_wrong_commitment(self, store, keys):
+        """Test ballots with another trapdoor commitment are rejected."""
+        row = cast(store, keys, h=VoterKeys().h)
+
+        assert "does not match" in check_ballot(store, row)
+
+    def test_placeholder_signature(self, store, keys):
+        """Test an unsigned ballot is rejected."""
+        row = store.cast_ballot("alice", keys.h, "YES", "sig", "proofs")
+
+        assert check_ballot(store, row) == "invalid signature"
+
+    def test_changed_vote(self, store, keys):
+        """Test the signature covers the vote."""
+        row = cast(store, keys)
+        row["enc_vote"] = "NO"
+
+        assert check_ballot(store, row) == "invalid signature"
+
+    def test_other_voters_key(self, store, keys):
+        """Test a ballot signed with a key other than the registered one is rejected."""
+        other = VoterKeys()
+        other.x, other.h = keys.x, keys.h
+        row = cast(store, other)
+
+        assert check_ballot(store, row) == "invalid signature"
+
+    def test_trapdoor_proof(self, store, keys, monkeypatch):
+        """Test a signed ballot whose proof is for another vote is rejected."""
+        proofs = keys.prove_trapdoor("alice", "NO")
+        monkeypatch.setattr(keys, "prove_trapdoor", lambda voter_id, vote: proofs)
+        row = cast(store, keys)
+
+        assert check_ballot(store, row) == "invalid trapdoor proof"
+
+    def test_trapdoor_proof_needs_x(self, store, keys, monkeypatch):
+        """Test a proof made without the trapdoor's x is rejected."""
+        monkeypatch.setattr(keys, "x", keys.x + 1)
+        row = cast(store, keys)
+
+        assert check_ballot(store, row) == "invalid trapdoor proof"
+
+
+class TestValidationPipeline:
+    """Test cases for ValidationPipeline."""
+
+    def test_marks_rows(self, store, keys):
+        """Test rows go from pending to valid or invalid."""
+        pipeline = ValidationPipeline(workers=2)
+        good = cast(store, keys)
+        bad = cast(store, keys, voter_id="mallory")
+
+        pipeline.submit(store, good)
+        pipeline.submit(store, bad)
+        pipeline.drain(timeout=5)
+
+        assert good["status"] == validation.VALID
+        assert bad["status"] == validation.INVALID
+        assert bad["reason"] == "voter not registered"
+        assert counts(store.BB) == {"pending": 0, "valid": 1, "invalid": 1}
+
+
+class TestCastValidation:
+    """Test cases for validation of ballots cast through the API."""
+
+    def test_cast_is_validated(self, client, keys):
+        """Test /cast queues the ballot and the status shows up on /ballots."""
+        from server.app import VALIDATION
+        client.post("/register", json={
+            "voter_id": "alice", "pk_voter": keys.pk_voter, "h": keys.h, "proof": "zkp",
+        })
+        signed_ballot, proofs = keys.seal("alice", "YES")
+
+        response = client.post("/cast", json={
+            "voter_id": "alice", "signed_ballot": signed_ballot,
+            "enc_vote": "YES", "h": keys.h, "proofs": proofs,
+        })
+        VALIDATION.drain(timeout=5)
+
+        assert response.json()["validation"] == "pending"
+        row = client.get("/ballots").json()["ballots"][0]
+        assert row["status"] == "valid"
+
+    def test_placeholder_ballot_is_invalid(self, client, sample_voter_data, sample_cast_data):
+        """Test a ballot without a real signature ends up invalid."""
+        from server.app import VALIDATION
+        client.post("/register", json=sample_voter_data)
+
+        client.post("/cast", json=sample_cast_data)
+        VALIDATION.drain(timeout=5)
+
+        row = client.get("/ballots").json()["ballots"][0]
+        assert row["status"] == "invalid"
+        assert row["reason"] == "invalid signature"
+
+    def test_tally_waits_for_validation(self, client, monkeypatch):
+        """Test /hyperion drains the validation pipeline before the run starts."""
+        import server.app as app_module
+        calls = []
+        monkeypatch.setattr(app_module.VALIDATION, "drain", lambda timeout=None: calls.append("drain"))
+
+        def run(*args, **kwargs):
+            calls.append("run")
+            raise RuntimeError("stop")
+
+        monkeypatch.setattr(app_module, "run_hyperion", run)
+
+        client.post("/hyperion")
+
+        assert calls == ["drain", "run"]